@@ -0,0 +1,110 @@
+"""
+优先调度模块
+按 新鲜度、来源权重、关键词初筛得分 为待分析新闻打分，用优先队列从最有价值的新闻开始分批取出；
+配合每次运行的时间/调用次数预算，预算有限时最先出现在看板上的是用户最关心的新闻
+"""
+
+import heapq
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from AI分析.关键词规则 import 关键词评分器
+
+
+class 优先调度器:
+    """优先级 = 新鲜度权重 × 新鲜度 + 来源权重 × 来源得分 + 关键词权重 × 关键词得分，三项都归一化到 [0, 1]
+
+    新鲜度按发布时间（没有时用抓取时间）指数衰减，每过 半衰期小时 减半；
+    来源得分为 来源权重表 中的权重除以表中最大权重，未列出的来源取 默认来源权重；
+    关键词得分为关键词评分除以评分器的相关阈值，截断到 [0, 1]。
+    """
+
+    def __init__(self, 评分器: 关键词评分器, 来源权重表: Optional[Dict[str, float]] = None,
+                 半衰期小时: float = 24, 默认来源权重: float = 1.0,
+                 新鲜度权重: float = 0.5, 来源权重: float = 0.2, 关键词权重: float = 0.3):
+        self.评分器 = 评分器
+        self.来源权重表 = 来源权重表 or {}
+        self.半衰期小时 = 半衰期小时
+        self.默认来源权重 = 默认来源权重
+        self.权重 = (新鲜度权重, 来源权重, 关键词权重)
+        self._最大来源权重 = max([默认来源权重, *self.来源权重表.values()]) or 1.0
+
+    @classmethod
+    def 按配置创建(cls, 配置: Dict) -> '优先调度器':
+        """由配置文件的 ai_service.scheduling 段创建（需要完整配置以读取 hr_categories）"""
+        调度配置 = (配置.get('ai_service') or {}).get('scheduling') or {}
+        权重 = 调度配置.get('weights') or {}
+        return cls(
+            关键词评分器(配置.get('hr_categories') or []),
+            来源权重表=调度配置.get('source_weights'),
+            半衰期小时=调度配置.get('recency_half_life_hours', 24),
+            默认来源权重=调度配置.get('default_source_weight', 1.0),
+            新鲜度权重=权重.get('recency', 0.5),
+            来源权重=权重.get('source', 0.2),
+            关键词权重=权重.get('keyword', 0.3),
+        )
+
+    def _新鲜度(self, 新闻: Dict, 现在: datetime) -> float:
+        for 字段 in ('publish_time', 'crawl_time'):
+            try:
+                时间 = datetime.fromisoformat(str(新闻.get(字段) or ''))
+            except ValueError:
+                continue
+            if 时间.tzinfo is not None:
+                时间 = 时间.astimezone().replace(tzinfo=None)
+            年龄小时 = max(0.0, (现在 - 时间).total_seconds() / 3600)
+            return 0.5 ** (年龄小时 / self.半衰期小时)
+        return 0.0
+
+    def 优先级(self, 新闻: Dict, 现在: Optional[datetime] = None) -> float:
+        新鲜度 = self._新鲜度(新闻, 现在 or datetime.now())
+        来源 = self.来源权重表.get(新闻.get('source'), self.默认来源权重) / self._最大来源权重
+        关键词 = self.评分器.评分(新闻.get('title', ''), 新闻.get('abstract', ''))
+        关键词 = min(1.0, max(0.0, 关键词 / self.评分器.相关阈值)) if self.评分器.相关阈值 else 0.0
+        return self.权重[0] * 新鲜度 + self.权重[1] * 来源 + self.权重[2] * 关键词
+
+    def 分批(self, 新闻列表: Iterable[Dict], 批大小: int) -> Iterable[List[Dict]]:
+        """按优先级从高到低分批产出新闻；调用方停止迭代即放弃剩余的低优先级新闻"""
+        现在 = datetime.now()
+        队列 = [(-self.优先级(新闻, 现在), 序号, 新闻) for 序号, 新闻 in enumerate(新闻列表)]
+        heapq.heapify(队列)
+        while 队列:
+            yield [heapq.heappop(队列)[2] for _ in range(min(批大小, len(队列)))]
+
+
+class 运行预算:
+    """每次运行的时间和调用次数上限（ai_service.scheduling 的 time_limit_minutes / max_calls / max_articles）"""
+
+    def __init__(self, 时间上限分钟: Optional[float] = None, 调用上限: Optional[int] = None,
+                 条数上限: Optional[int] = None):
+        self.时间上限秒 = 时间上限分钟 * 60 if 时间上限分钟 else None
+        self.调用上限 = 调用上限
+        self.条数上限 = 条数上限
+        self.开始 = time.monotonic()
+
+    @classmethod
+    def 按配置创建(cls, ai配置: Dict) -> '运行预算':
+        调度配置 = ai配置.get('scheduling') or {}
+        return cls(调度配置.get('time_limit_minutes'), 调度配置.get('max_calls'), 调度配置.get('max_articles'))
+
+    def 剩余条数(self, 已分析: int) -> Optional[int]:
+        return None if self.条数上限 is None else max(0, self.条数上限 - 已分析)
+
+    def 可分析条数(self, 已分析: int, 已调用: int, 每条最多调用数: int) -> Optional[int]:
+        """下一批最多分析几条：不超过剩余条数，且每条按最多调用数计也不超过剩余调用次数；不限时返回 None"""
+        上限 = [self.剩余条数(已分析)]
+        if self.调用上限 is not None:
+            上限.append(max(0, self.调用上限 - 已调用) // max(1, 每条最多调用数))
+        上限 = [值 for 值 in 上限 if 值 is not None]
+        return min(上限) if 上限 else None
+
+    def 已用尽(self, 已分析: int, 已调用: int) -> Optional[str]:
+        """预算用尽时返回原因，否则返回 None"""
+        if self.时间上限秒 and time.monotonic() - self.开始 >= self.时间上限秒:
+            return f"已运行 {self.时间上限秒 / 60:.0f} 分钟"
+        if self.调用上限 is not None and 已调用 >= self.调用上限:
+            return f"已调用模型 {已调用} 次"
+        if self.条数上限 is not None and 已分析 >= self.条数上限:
+            return f"已分析 {已分析} 条"
+        return None
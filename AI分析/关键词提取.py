@@ -0,0 +1,207 @@
+"""
+关键词提取模块
+不调用模型的本地关键词提取：候选词为领域词表（HR关键词、公司关键词、配置中的分类关键词）
+和中文字符2~4元组，按 TF-IDF 打分（标题词频加权），文档频率表在新闻入库时增量更新
+
+用法：
+    python AI分析/关键词提取.py 重建                      # 由存储中的全部新闻重建文档频率表
+    python AI分析/关键词提取.py 提取 "小米汽车启动2026校园招聘" --正文 "..."
+"""
+
+import argparse
+import math
+import os
+import re
+import sys
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AI分析.关键词规则 import HR关键词, 公司关键词
+from 数据存储.文件锁 import 存储协调器
+
+默认文档频率路径 = "数据/文档频率.json"
+
+# 出现在n元组首尾时说明切分位置不对（虚词、量词等）
+_边界停用字 = set('的了是在和与及或等将对为从把被这那其之也都而且但就着过到向于以由个名位项次年月日中上下后前再又')
+_片段 = re.compile(r'[\u4e00-\u9fff]+|[A-Za-z][A-Za-z0-9+#.\-]+')
+_英文停用词 = {'nbsp', 'amp', 'quot', 'http', 'https', 'www', 'com', 'cn', 'html', 'the', 'and', 'of', 'to', 'in', 'for'}
+
+
+class 关键词提取器:
+    """TF-IDF 关键词提取
+
+    文档频率表格式：{"version": 1, "docs": 文档数, "df": {词: 文档频率}}
+    """
+
+    def __init__(self, 文档频率路径: str = 默认文档频率路径, 领域词: Iterable[str] = (),
+                 n元范围=(2, 4), 标题权重: float = 3.0, 领域词加权: float = 1.5, 最大词数: int = 200000):
+        self.文档频率路径 = 文档频率路径
+        self.协调器 = 存储协调器(文档频率路径, 格式='json-compact')
+        self.n元范围 = n元范围
+        self.标题权重 = 标题权重
+        self.领域词加权 = 领域词加权
+        self.最大词数 = 最大词数
+
+        词表 = list(HR关键词) + [词 for 词列表 in 公司关键词.values() for 词 in 词列表] + list(公司关键词)
+        词表 += list(领域词)
+        # 小写 → 原始写法，输出时保留词表中的写法（如 HR、CEO）
+        self.领域词表: Dict[str, str] = {}
+        for 词 in 词表:
+            self.领域词表.setdefault(词.lower(), 词)
+
+        self._文档数: Optional[int] = None
+        self._文档频率: Dict[str, int] = {}
+
+    @classmethod
+    def 按配置创建(cls, 配置: Dict) -> '关键词提取器':
+        """由配置文件的 ai_service.keywords 段创建，hr_categories 中的关键词加入领域词表"""
+        关键词配置 = (配置.get('ai_service') or {}).get('keywords') or {}
+        分类词 = [词 for 分类 in 配置.get('hr_categories') or [] for 词 in 分类.get('keywords', [])]
+        return cls(关键词配置.get('df_path', 默认文档频率路径), 领域词=分类词)
+
+    def _加载(self):
+        if self._文档数 is None:
+            数据 = self.协调器.读取json({'version': 1, 'docs': 0, 'df': {}})
+            self._文档数, self._文档频率 = 数据['docs'], 数据['df']
+
+    def _n元组(self, 文本: str) -> Iterable[str]:
+        for 片段 in _片段.findall(文本):
+            if not '\u4e00' <= 片段[0] <= '\u9fff':
+                片段 = 片段.lower().rstrip('.-')
+                if len(片段) >= 2 and 片段 not in _英文停用词:
+                    yield 片段
+                continue
+            for n in range(self.n元范围[0], self.n元范围[1] + 1):
+                for i in range(len(片段) - n + 1):
+                    词 = 片段[i:i + n]
+                    if 词[0] not in _边界停用字 and 词[-1] not in _边界停用字:
+                        yield 词
+
+    def _领域命中(self, 文本: str) -> set:
+        """中文领域词按子串匹配；英文领域词按整词匹配，避免 HR 命中 Anthropic"""
+        小写 = 文本.lower()
+        英文词 = {片段.lower().rstrip('.-') for 片段 in _片段.findall(文本) if not '\u4e00' <= 片段[0] <= '\u9fff'}
+        return {词 for 词 in self.领域词表 if (词 in 英文词 if 词.isascii() else 词 in 小写)}
+
+    def _文档词集(self, 新闻: Dict) -> set:
+        文本 = f"{新闻.get('title') or ''} {新闻.get('abstract') or ''}"
+        return set(self._n元组(文本)) | self._领域命中(文本)
+
+    def 提取(self, 标题: str, 正文: str = '', 数量: int = 5) -> List[str]:
+        self._加载()
+        标题小写, 正文小写 = (标题 or '').lower(), (正文 or '').lower()
+
+        词频 = Counter()
+        for 词 in self._n元组(标题 or ''):
+            词频[词] += self.标题权重
+        for 词 in self._n元组(正文 or ''):
+            词频[词] += 1
+        领域命中 = self._领域命中(f"{标题 or ''} {正文 or ''}")
+        for 词 in 领域命中:
+            词频[词] = max(1, 标题小写.count(词) * self.标题权重 + 正文小写.count(词))
+
+        文档数 = self._文档数 or 0
+        得分 = []
+        for 词, tf in 词频.items():
+            df = self._文档频率.get(词, 0)
+            if 词 not in 领域命中:
+                # 语料中没有在其他新闻里出现过的n元组多半是跨词的切分碎片；过于常见的词没有区分度。
+                # 文档频率表为空时只输出领域词
+                if df < 2 or (文档数 >= 20 and df > 文档数 * 0.5):
+                    continue
+            idf = math.log((文档数 + 1) / (df + 1)) + 1
+            得分.append((tf * idf * (self.领域词加权 if 词 in 领域命中 else 1.0), len(词), 词))
+        得分.sort(reverse=True)
+
+        结果 = []
+        for _, _, 词 in 得分:
+            if any(_重叠(词, 已选) for 已选 in 结果):
+                continue
+            结果.append(词)
+            if len(结果) >= 数量:
+                break
+        return [self.领域词表.get(词, 词) for 词 in 结果]
+
+    def 更新文档频率(self, 新闻列表: List[Dict]):
+        """新闻入库时调用，把这些新闻计入文档频率表（读-合并-写在文件锁内完成）"""
+        if not 新闻列表:
+            return
+        增量 = Counter()
+        for 新闻 in 新闻列表:
+            增量.update(self._文档词集(新闻))
+
+        def 合并(数据):
+            数据['docs'] += len(新闻列表)
+            文档频率 = 数据['df']
+            for 词, 次数 in 增量.items():
+                文档频率[词] = 文档频率.get(词, 0) + 次数
+            if len(文档频率) > self.最大词数:
+                # 超出上限时淘汰只出现过一次的词，仍然超出则按频率保留前 最大词数 个
+                数据['df'] = 文档频率 = {词: 次数 for 词, 次数 in 文档频率.items() if 次数 > 1}
+                if len(文档频率) > self.最大词数:
+                    数据['df'] = dict(Counter(文档频率).most_common(self.最大词数))
+            return 数据
+
+        数据 = self.协调器.更新json(合并, {'version': 1, 'docs': 0, 'df': {}})
+        self._文档数, self._文档频率 = 数据['docs'], 数据['df']
+
+    def 重建(self, 新闻列表: List[Dict]):
+        """丢弃现有统计，由给定新闻重新计算文档频率表"""
+        self.协调器.写入json({'version': 1, 'docs': 0, 'df': {}})
+        self._文档数 = None
+        self.更新文档频率(新闻列表)
+
+
+def _重叠(甲: str, 乙: str) -> bool:
+    """两个词共享至少两个连续字符（如 校园招聘 与 招聘会）时视为重复"""
+    if 甲 in 乙 or 乙 in 甲:
+        return True
+    return any(甲[i:i + 2] in 乙 for i in range(len(甲) - 1))
+
+
+def 按配置创建提取器(配置文件路径: str = "配置文件.yaml", 存储=None) -> 关键词提取器:
+    """读取配置文件创建提取器（配置文件不存在时使用默认设置）；文档频率表不存在时（如新检出的仓库）
+    先由存储中的全部新闻重建，需在保存本次新闻之前调用，以免重复计入"""
+    from 数据存储.数据库操作 import 按配置创建存储, 读取配置
+
+    提取器 = 关键词提取器.按配置创建(读取配置(配置文件路径))
+    if not os.path.exists(提取器.文档频率路径):
+        新闻列表 = (存储 or 按配置创建存储(配置文件路径)).加载新闻()
+        提取器.重建(新闻列表)
+        print(f"📚 已由 {len(新闻列表)} 条已存储的新闻建立文档频率表 {提取器.文档频率路径}")
+    return 提取器
+
+
+def 主程序():
+    """命令行运行入口"""
+    解析器 = argparse.ArgumentParser(description="本地关键词提取")
+    子命令 = 解析器.add_subparsers(dest='命令', required=True)
+    子命令.add_parser('重建', help="由存储中的全部新闻重建文档频率表")
+    提取命令 = 子命令.add_parser('提取', help="提取一条新闻的关键词")
+    提取命令.add_argument('标题')
+    提取命令.add_argument('--正文', default='')
+    提取命令.add_argument('--数量', type=int, default=5)
+    参数 = 解析器.parse_args()
+
+    if 参数.命令 == '重建':
+        from 数据存储.数据库操作 import 按配置创建存储, 读取配置
+        提取器 = 关键词提取器.按配置创建(读取配置())
+        新闻列表 = 按配置创建存储().加载新闻()
+        提取器.重建(新闻列表)
+        print(f"✅ 已由 {len(新闻列表)} 条新闻重建文档频率表（{len(提取器._文档频率)} 个词）→ {提取器.文档频率路径}")
+
+        if 新闻列表:
+            开始 = time.perf_counter()
+            for 新闻 in 新闻列表:
+                提取器.提取(新闻.get('title', ''), 新闻.get('abstract', ''))
+            每条 = (time.perf_counter() - 开始) / len(新闻列表) * 1e6
+            print(f"⚡ 提取速度：每条约 {每条:.0f} 微秒")
+    else:
+        print(', '.join(按配置创建提取器().提取(参数.标题, 参数.正文, 参数.数量)))
+
+
+if __name__ == "__main__":
+    主程序()
@@ -0,0 +1,207 @@
+"""
+关键词规则模块
+RSS爬虫和AI分析共用的HR关键词、公司关键词、技术词和分类规则，以及基于它们的
+规则分类器（RSS爬虫入库和规则回填使用）和本地相关性评分器：
+得分足够高或足够低的新闻直接给出结论，只有中间地带交给模型判断
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# HR相关关键词
+HR关键词 = [
+    '招聘', '人才', 'offer', '校招', '社招', '猎聘', '内推', '入职',
+    '薪资', '工资', '涨薪', '年终奖', '股票', '期权', '股权激励', '持股', '分红',
+    '培训', '晋升', '发展', '学习', '企业大学', '成长',
+    '组织架构', '裁员', '优化', '调整', '重组', '人事变动', '人员流动',
+    '企业文化', '价值观', '团建', '离职', '员工',
+    '职位', '岗位', '人力资源', 'HR', '人事', '团队', '管理者',
+    '薪酬', '福利', '待遇', '奖金', '激励',
+    '首席人才官', 'CHO', '高管', '管理人员', 'CEO', 'CTO', 'COO'
+]
+
+# 监控的公司及其关键词
+公司关键词 = {
+    '特斯拉': ['特斯拉', 'Tesla', '马斯克'],
+    '小米汽车': ['小米汽车', '小米SU7', '雷军造车', '小米新车'],
+    '问界': ['问界', 'AITO', '华为汽车', '余承东'],
+    '小鹏汽车': ['小鹏', 'XPENG', '何小鹏'],
+    '蔚来汽车': ['蔚来', 'NIO', '李斌'],
+    '理想汽车': ['理想', '理想汽车', '李想'],
+    '比亚迪': ['比亚迪', 'BYD', '王传福']
+}
+
+# 标题中大量出现时说明是技术报道而非HR新闻
+高频技术词 = ['ai', '算法', '模型', '大模型', '技术', '架构', '系统', '开发', '代码', '编程']
+
+# RSS爬虫使用的HR分类规则
+分类规则 = {
+    '招聘与人才': ['招聘', '人才', 'offer', '校招', '社招', '猎聘', 'offer'],
+    '薪酬福利': ['薪资', '工资', '涨薪', '年终奖', '股票', '期权', '股权激励', '持股'],
+    '培训发展': ['培训', '晋升', '发展', '学习', '企业大学', '成长'],
+    '组织变革': ['组织架构', '裁员', '优化', '调整', '重组', '人事变动'],
+    '企业文化': ['企业文化', '价值观', '团建'],
+    '行业报告': ['报告', '研究', '数据', '趋势', '白皮书', '指数'],
+    '高管动态': ['CEO', 'CTO', 'CHO', '首席', '高管', '任命', '离职']
+}
+
+标题权重 = 3
+正文权重 = 1
+
+
+class 关键词评分器:
+    """与 RSS爬虫.判断HR相关 相同的打分方式：标题命中记3分，正文命中记1分，
+    技术报道（标题含2个以上技术词）扣分；关键词为 HR关键词 与配置中 hr_categories 的并集
+    """
+
+    def __init__(self, hr分类: Iterable[Dict] = (), 相关阈值: float = 6, 不相关阈值: float = 0,
+                 技术词扣分: float = 3):
+        关键词 = list(HR关键词)
+        for 分类 in hr分类:
+            关键词.extend(分类.get('keywords', []))
+        self.关键词 = list(dict.fromkeys(k.lower() for k in 关键词))
+
+        self.相关阈值 = 相关阈值
+        self.不相关阈值 = 不相关阈值
+        self.技术词扣分 = 技术词扣分
+
+    @classmethod
+    def 按配置创建(cls, 配置: Dict) -> Optional['关键词评分器']:
+        """由配置文件的 ai_service.cascade 段创建，enabled 为 false 时返回 None"""
+        级联配置 = (配置.get('ai_service') or {}).get('cascade') or {}
+        if not 级联配置.get('enabled', True):
+            return None
+        return cls(
+            配置.get('hr_categories') or [],
+            相关阈值=级联配置.get('yes_threshold', 6),
+            不相关阈值=级联配置.get('no_threshold', 0),
+        )
+
+    def 评分(self, 标题: str, 正文: str = '') -> float:
+        标题 = (标题 or '').lower()
+        正文 = (正文 or '').lower()
+
+        得分 = 0
+        for 关键词 in self.关键词:
+            if 关键词 in 标题:
+                得分 += 标题权重
+            elif 关键词 in 正文:
+                得分 += 正文权重
+
+        技术词匹配 = sum(1 for 词 in 高频技术词 if 词 in 标题)
+        if 技术词匹配 >= 2:
+            得分 -= self.技术词扣分 * (技术词匹配 - 1)
+        return 得分
+
+    def 判定(self, 新闻: Dict) -> Optional[bool]:
+        """高于相关阈值返回 True，不高于不相关阈值返回 False，中间地带返回 None（需要模型判断）"""
+        得分 = self.评分(新闻.get('title', ''), 新闻.get('abstract', ''))
+        if 得分 >= self.相关阈值:
+            return True
+        if 得分 <= self.不相关阈值:
+            return False
+        return None
+
+    def 批量判定(self, 新闻列表: List[Dict]) -> List[Optional[bool]]:
+        return [self.判定(新闻) for 新闻 in 新闻列表]
+
+
+def 命中矩阵(词表: List[str], 文本列表: List[str]):
+    """返回 [词数, 条数] 的NumPy布尔矩阵，元素为 词 是否出现在该文本中（不区分大小写）
+
+    全部文本用 \\0 连接成一个字符串，每个词只做一次整串查找，再按起点偏移把命中位置映射回文本，
+    比对每条文本逐个关键词做 in 判断快得多。
+    """
+    import numpy as np
+
+    小写 = [(文本 or '').lower() for 文本 in 文本列表]
+    矩阵 = np.zeros((len(词表), len(小写)), dtype=bool)
+    if not 小写:
+        return 矩阵
+    起点 = np.cumsum([0] + [len(文本) + 1 for 文本 in 小写[:-1]])
+    全文 = '\0'.join(小写)
+    for 行, 词 in enumerate(词表):
+        位置 = [m.start() for m in re.finditer(re.escape(词.lower()), 全文)]
+        if 位置:
+            矩阵[行, np.searchsorted(起点, 位置, side='right') - 1] = True
+    return 矩阵
+
+
+class 规则分类器:
+    """RSS爬虫的规则分类：HR关键词标题命中记3分、摘要命中记1分，得分≥2或标题有命中即相关，
+    标题含2个以上技术词且得分<3时不相关；分类取 分类规则 中第一个包含命中关键词的分类
+
+    hr分类 为配置文件的 hr_categories：其关键词并入HR关键词，分类追加在 分类规则 之后。
+    批量分类 整批匹配（需要NumPy，见 命中矩阵），供规则回填使用；分类 逐条匹配、不依赖NumPy，
+    供RSS爬虫入库时使用，两者结果一致。
+    """
+
+    def __init__(self, hr分类: Iterable[Dict] = ()):
+        hr分类 = list(hr分类)
+        self.关键词: List[str] = []
+        已有 = set()
+        for 词 in list(HR关键词) + [k for 分类 in hr分类 for k in 分类.get('keywords', [])]:
+            if 词 and 词.lower() not in 已有:
+                已有.add(词.lower())
+                self.关键词.append(词)
+
+        self.分类规则 = dict(分类规则)
+        for 分类 in hr分类:
+            self.分类规则.setdefault(分类['name'], 分类.get('keywords', []))
+        self.分类名 = list(self.分类规则)
+        self._分类成员 = None
+
+    @classmethod
+    def 按配置创建(cls, 配置: Dict) -> '规则分类器':
+        return cls(配置.get('hr_categories') or [])
+
+    def 批量分类(self, 标题列表: List[str], 摘要列表: List[str]):
+        """返回 (是否相关 布尔数组, HR分类列表（不相关为 None）, 命中矩阵 [关键词数, 条数])"""
+        import numpy as np
+
+        if self._分类成员 is None:
+            # [分类数, 关键词数]：关键词（原始写法）是否属于该分类
+            self._分类成员 = np.array([[词 in 列表 for 词 in self.关键词] for 列表 in self.分类规则.values()],
+                                   dtype=np.int32).reshape(len(self.分类名), len(self.关键词))
+        标题命中 = 命中矩阵(self.关键词, 标题列表)
+        摘要命中 = 命中矩阵(self.关键词, 摘要列表) & ~标题命中
+        得分 = 标题命中.sum(0) * 标题权重 + 摘要命中.sum(0) * 正文权重
+
+        相关 = (得分 >= 2) | 标题命中.any(0)
+        技术报道 = 命中矩阵(高频技术词, 标题列表).sum(0) >= 2
+        相关 &= ~(技术报道 & (得分 < 3))
+
+        命中 = 标题命中 | 摘要命中
+        所属 = (self._分类成员 @ 命中.astype(np.int32)) > 0
+        首个 = 所属.argmax(0)
+        有分类 = 所属.any(0)
+        分类 = [(self.分类名[首个[i]] if 有分类[i] else '其他') if 相关[i] else None for i in range(len(标题列表))]
+        return 相关, 分类, 命中
+
+    def 分类(self, 标题: str, 摘要: str = '') -> Tuple[bool, Optional[str], List[str]]:
+        """单条分类，返回 (是否相关, HR分类, 命中的关键词)"""
+        标题 = (标题 or '').lower()
+        摘要 = (摘要 or '').lower()
+
+        得分 = 0
+        匹配的关键词 = []
+        标题命中 = False
+        for 关键词 in self.关键词:
+            if 关键词.lower() in 标题:
+                得分 += 标题权重
+                标题命中 = True
+                匹配的关键词.append(关键词)
+            elif 关键词.lower() in 摘要:
+                得分 += 正文权重
+                匹配的关键词.append(关键词)
+
+        是否相关 = 得分 >= 2 or 标题命中
+        if sum(1 for 词 in 高频技术词 if 词 in 标题) >= 2 and 得分 < 3:
+            是否相关 = False
+        if not 是否相关:
+            return False, None, 匹配的关键词
+
+        for 分类名, 关键词列表 in self.分类规则.items():
+            if any(关键词 in 关键词列表 for 关键词 in 匹配的关键词):
+                return True, 分类名, 匹配的关键词
+        return True, '其他', 匹配的关键词
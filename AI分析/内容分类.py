@@ -3,13 +3,37 @@ AI内容分类和总结模块
 使用智谱AI进行内容的智能分析
 """
 
-import yaml
 import json
-from typing import Dict, List
+import os
+import re
+import sys
+import time
+import yaml
+from typing import Callable, Dict, List, Optional
 from zhipuai import ZhipuAI
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from 数据存储.数据库操作 import 按配置创建存储
+from 数据存储.只读快照 import 按配置发布快照
+from 数据抓取.文章标识 import 按配置创建标识
+from AI分析.并发执行 import 并发执行器
+from AI分析.响应缓存 import 响应缓存
+from AI分析.关键词规则 import 关键词评分器
+from AI分析.本地分类器 import 本地分类器
+from AI分析.分析日志 import 分析日志
+from AI分析.调用监控 import 调用监控
+from AI分析.优先调度 import 优先调度器, 运行预算
+from AI分析.关键词提取 import 按配置创建提取器
+from AI分析.抽取摘要 import 抽取摘要器
+from AI分析.提示词构建 import 提示词构建器, 估算token
+from AI分析.模型路由 import 模型路由
+
 
 class AI分析器:
+    # 修改某个步骤提示词的含义时把版本号加1，该步骤的旧缓存随之失效
+    提示词版本 = {'判断': 1, '分类': 1, '摘要': 1, '关键词': 1, '结构化': 2, '初筛': 1}
+
     def __init__(self, 配置文件路径: str = "配置文件.yaml"):
         """初始化AI分析器"""
         with open(配置文件路径, 'r', encoding='utf-8') as f:
@@ -17,28 +41,73 @@ class AI分析器:
 
         # 初始化智谱AI客户端
         ai配置 = self.配置['ai_service']['zhipu']
-        self.客户端 = ZhipuAI(api_key=ai配置['api_key'])
+        # 重试由 并发执行器 统一负责，关闭SDK自带的重试以免重复重试；base_url 可指向 AI分析/模拟服务.py
+        self.客户端 = ZhipuAI(api_key=ai配置['api_key'], base_url=ai配置.get('base_url'), max_retries=0)
         self.模型 = ai配置['model']
 
+        # 按步骤在快速模型和强模型之间选择，疑难新闻升级到强模型（ai_service.routing）
+        self.路由 = 模型路由.按配置创建(self.配置['ai_service'])
+
+        # structured：一次调用返回全部结果；stepwise：判断、分类、摘要、关键词分四次调用
+        self.分析模式 = self.配置['ai_service'].get('analysis_mode', 'structured')
+
+        # 并发数、每分钟请求数和重试策略（ai_service.concurrency）
+        self.执行器 = 并发执行器.按配置创建(self.配置['ai_service'])
+
+        # 模型回答的磁盘缓存（ai_service.cache），重跑时已问过的内容不再调用API
+        self.缓存 = 响应缓存.按配置创建(self.配置['ai_service'])
+
+        # 每次调用的耗时、token、重试和缓存命中（ai_service.monitoring）
+        self.监控 = 调用监控.按配置创建(self.配置['ai_service'])
+
+        # 关键词级联：本地评分有把握的新闻不再请求模型判断相关性（ai_service.cascade）
+        self.评分器 = 关键词评分器.按配置创建(self.配置)
+
+        # 本地训练的分类器：置信度足够高的新闻不再请求模型判断相关性和分类（ai_service.local_classifier）
+        self.本地分类器 = 本地分类器.按配置加载(self.配置)
+
+        # 关键词默认由本地TF-IDF提取，不调用模型；mode 设为 llm 时仍由模型提取（ai_service.keywords）
+        self.关键词提取器 = 按配置创建提取器(配置文件路径)
+        self.关键词模式 = (self.配置['ai_service'].get('keywords') or {}).get('mode', 'local')
+
+        # 较长的原摘要默认用本地抽取式摘要；mode 设为 llm 时由模型改写（ai_service.summary）
+        self.摘要器 = 抽取摘要器.按配置创建(self.配置, self.关键词提取器)
+        self.摘要模式 = (self.配置['ai_service'].get('summary') or {}).get('mode', 'local')
+
+        # 标题、摘要写入提示词前清理套话并裁剪到token预算内（ai_service.prompt_budget）
+        self.提示词构建器 = 提示词构建器.按配置创建(self.配置, self.摘要器)
+
+        # 相关性批量初筛：一次请求判断多条新闻（ai_service.triage）
+        初筛配置 = self.配置['ai_service'].get('triage') or {}
+        self.批量初筛 = 初筛配置.get('batch', True)
+        self.初筛最大条数 = 初筛配置.get('max_batch_size', 20)
+        self.初筛token预算 = 初筛配置.get('prompt_token_budget', 2000)
+
         self.hr分类 = self.配置['hr_categories']
 
-    def 分析新闻(self, 新闻: Dict) -> Dict:
-        """分析单条新闻，返回分类和摘要"""
+    def 分析新闻(self, 新闻: Dict, 初筛相关: Optional[bool] = None, 本地分类: Optional[str] = None) -> Dict:
+        """分析单条新闻，返回分类和摘要
+
+        初筛相关 为批量初筛的结论：为 False 时不再调用模型，为 True 时跳过相关性判断步骤。
+        本地分类 为本地分类器有把握的HR分类，分步模式下据此跳过分类步骤。
+        """
+        if 初筛相关 is False:
+            return self._不相关结果()
+
         print(f"正在分析: {新闻['title'][:30]}...")
 
+        if self.分析模式 == 'structured':
+            # 级联、本地分类器和批量初筛都没有结论的新闻交给强模型
+            return self._结构化分析(新闻, 困难=初筛相关 is None)
+
         # 1. 判断是否为HR相关
-        是否hr相关 = self._判断是否hr相关(新闻)
+        是否hr相关 = 初筛相关 if 初筛相关 is not None else self._判断是否hr相关(新闻)
 
         if not 是否hr相关:
-            return {
-                'is_hr_related': False,
-                'hr_category': None,
-                'summary': None,
-                'keywords': [],
-            }
+            return self._不相关结果()
 
         # 2. 分类到具体HR模块
-        hr分类 = self._分类hr模块(新闻)
+        hr分类 = 本地分类 or self._分类hr模块(新闻)
 
         # 3. 生成摘要
         摘要 = self._生成摘要(新闻)
@@ -51,15 +120,160 @@ class AI分析器:
             'hr_category': hr分类,
             'summary': 摘要,
             'keywords': 关键词,
+            'label_source': 'ai',
+        }
+
+    def 每条最多调用数(self) -> int:
+        """分析一条新闻最多发出的模型调用数（批量初筛按每条一次计），运行预算据此限制每批条数"""
+        # 批量初筛的回答缺少某条时，该条再单独判断一次（见 _判断一批），最坏情况两次都发生
+        判断 = 2 if self.批量初筛 else 1
+        if self.分析模式 == 'structured':
+            # 结构化模式不单独判断相关性，只有批量初筛时才有判断调用
+            return (判断 if self.批量初筛 else 0) + 1
+        # 其后是分类，摘要和关键词为 llm 模式时各一次
+        return 判断 + 1 + (self.摘要模式 == 'llm') + (self.关键词模式 == 'llm')
+
+    @staticmethod
+    def _不相关结果() -> Dict:
+        return {
+            'is_hr_related': False,
+            'hr_category': None,
+            'summary': None,
+            'keywords': [],
+            'label_source': 'ai',
+        }
+
+    def _调用模型(self, 步骤: str, 提示词: str, temperature: float, 困难: bool = False) -> str:
+        """所有分析步骤统一通过这里调用模型（路由、缓存、限速、限流重试、调用监控），返回回答文本"""
+        开始 = time.perf_counter()
+        模型 = self.路由.模型(步骤, 困难)
+        if self.缓存:
+            键 = self.缓存.生成键(模型, 步骤, self.提示词版本[步骤], temperature, 提示词)
+            回答 = self.缓存.读取(键, 步骤)
+            if 回答 is not None:
+                if self.监控:
+                    self.监控.记录(步骤, 模型, time.perf_counter() - 开始, 缓存命中=True)
+                return 回答
+
+        try:
+            响应 = self.执行器.调用(
+                self.客户端.chat.completions.create,
+                model=模型,
+                messages=[{"role": "user", "content": 提示词}],
+                temperature=temperature,
+            )
+        except Exception:
+            if self.监控:
+                self.监控.记录(步骤, 模型, time.perf_counter() - 开始,
+                              重试次数=self.执行器.最近重试次数, 出错=True)
+            raise
+        if self.监控:
+            self.监控.记录响应(步骤, 模型, 开始, 响应, self.执行器.最近重试次数, 估算token(提示词))
+        回答 = 响应.choices[0].message.content.strip()
+
+        if self.缓存:
+            self.缓存.写入(键, 模型, 步骤, self.提示词版本[步骤], 回答)
+        return 回答
+
+    def _结构化分析(self, 新闻: Dict, 困难: bool = False) -> Dict:
+        """一次调用同时完成相关性判断、分类、摘要和关键词提取"""
+        原摘要 = 新闻.get('abstract', '')
+        标题, 输入摘要 = self.提示词构建器.新闻(新闻)
+        分类列表 = "、".join(cat['name'] for cat in self.hr分类)
+        # 与 _生成摘要 一致：本地摘要模式或原摘要较短时不让模型生成
+        需要摘要 = self.摘要模式 == 'llm' and not (原摘要 and len(原摘要) < 150)
+        字段说明 = ['"is_hr_related": true 或 false', '"hr_category": 最主要的一个分类名称，不相关时为 null']
+        if 需要摘要:
+            字段说明.append('"summary": 50字以内的摘要，突出涉及的公司、发生的HR事件及其影响')
+        # 本地提取关键词时不让模型输出关键词，节省回答token
+        if self.关键词模式 == 'llm':
+            字段说明.append('"keywords": 3-5个关键词组成的数组')
+        字段说明 = ',\n  '.join(字段说明)
+
+        提示词 = f"""
+请分析以下汽车行业新闻。
+
+新闻标题：{标题}
+新闻摘要：{输入摘要}
+
+人力资源相关包括：招聘、薪酬福利、培训发展、组织架构调整、企业文化、员工关系、劳动法规等。
+可选分类：{分类列表}
+
+请只输出一个JSON对象，不要其他解释：
+{{
+  {字段说明}
+}}
+"""
+
+        try:
+            结果 = self._解析json回答(self._调用模型('结构化', 提示词, temperature=0.3, 困难=困难))
+        except Exception as e:
+            print(f"AI结构化分析出错: {e}")
+            结果 = {}
+
+        return self._校验分析结果(结果, 新闻, 需要摘要)
+
+    @staticmethod
+    def _解析json回答(回答: str) -> Dict:
+        """从模型回答中取出JSON对象（兼容 ```json 代码块和前后多余文字）"""
+        匹配 = re.search(r'\{.*\}', 回答, re.S)
+        if not 匹配:
+            raise ValueError(f"回答中没有JSON对象: {回答[:50]}")
+        数据 = json.loads(匹配.group())
+        if not isinstance(数据, dict):
+            raise ValueError("回答不是JSON对象")
+        return 数据
+
+    def _校验分析结果(self, 结果: Dict, 新闻: Dict, 需要摘要: bool) -> Dict:
+        """逐字段校验结构化结果，缺失或不合法的字段使用关键词匹配等后备方案"""
+        是否hr相关 = 结果.get('is_hr_related')
+        if isinstance(是否hr相关, str):
+            是否hr相关 = {'true': True, '是': True, 'false': False, '否': False}.get(是否hr相关.strip().lower())
+        if not isinstance(是否hr相关, bool):
+            是否hr相关 = self._关键词匹配判断(新闻)
+
+        if not 是否hr相关:
+            return self._不相关结果()
+
+        有效分类 = [cat['name'] for cat in self.hr分类]
+        分类结果 = 结果.get('hr_category')
+        hr分类 = None
+        if isinstance(分类结果, str):
+            if 分类结果.strip() in 有效分类:
+                hr分类 = 分类结果.strip()
+            else:
+                hr分类 = next((名 for 名 in 有效分类 if 名 in 分类结果), None)
+        if hr分类 is None:
+            hr分类 = self._关键词匹配分类(新闻)
+
+        摘要 = 结果.get('summary')
+        if not 需要摘要 or not isinstance(摘要, str) or not 摘要.strip():
+            摘要 = self._本地摘要(新闻)
+
+        关键词 = 结果.get('keywords') if self.关键词模式 == 'llm' else None
+        if isinstance(关键词, str):
+            关键词 = 关键词.replace('，', ',').split(',')
+        if isinstance(关键词, list) and any(isinstance(k, str) and k.strip() for k in 关键词):
+            关键词 = [k.strip() for k in 关键词 if isinstance(k, str) and k.strip()][:5]
+        else:
+            关键词 = self._本地关键词(新闻, 摘要)
+
+        return {
+            'is_hr_related': True,
+            'hr_category': hr分类,
+            'summary': 摘要.strip(),
+            'keywords': 关键词,
+            'label_source': 'ai',
         }
 
     def _判断是否hr相关(self, 新闻: Dict) -> bool:
         """判断新闻是否与HR相关"""
+        标题, 摘要 = self.提示词构建器.新闻(新闻)
         提示词 = f"""
 请判断以下新闻是否与人力资源管理相关。
 
-新闻标题：{新闻['title']}
-新闻摘要：{新闻.get('abstract', '')}
+新闻标题：{标题}
+新闻摘要：{摘要}
 
 人力资源相关包括：招聘、薪酬福利、培训发展、组织架构调整、企业文化、员工关系、劳动法规等。
 
@@ -67,13 +281,7 @@ class AI分析器:
 """
 
         try:
-            响应 = self.客户端.chat.completions.create(
-                model=self.模型,
-                messages=[{"role": "user", "content": 提示词}],
-                temperature=0.1,
-            )
-
-            回答 = 响应.choices[0].message.content.strip()
+            回答 = self._调用模型('判断', 提示词, temperature=0.1)
             return "是" in 回答
 
         except Exception as e:
@@ -81,6 +289,83 @@ class AI分析器:
             # 出错时使用关键词匹配作为后备方案
             return self._关键词匹配判断(新闻)
 
+    def 批量判断相关性(self, 新闻列表: List[Dict]) -> List[bool]:
+        """把多条新闻编号后放进同一个提示词判断相关性，返回与输入顺序一致的结论"""
+        批次列表 = self._划分初筛批次(新闻列表)
+        print(f"🔍 相关性初筛：{len(新闻列表)} 条新闻分为 {len(批次列表)} 批")
+        结论 = self.执行器.映射(self._判断一批, 批次列表)
+        return [值 for 批 in 结论 for 值 in 批]
+
+    def _初筛条目(self, 编号: int, 新闻: Dict) -> str:
+        标题, 摘要 = self.提示词构建器.新闻(新闻, self.提示词构建器.初筛正文预算)
+        return f"{编号}. 标题：{标题}\n   摘要：{摘要}"
+
+    def _划分初筛批次(self, 新闻列表: List[Dict]) -> List[List[Dict]]:
+        """按提示词token预算和最大条数贪心装箱，长摘要的新闻自然分到更小的批次"""
+        固定开销 = 估算token(self._初筛提示词([]))
+        批次列表, 当前, 当前token = [], [], 固定开销
+        for 新闻 in 新闻列表:
+            条目token = 估算token(self._初筛条目(len(当前) + 1, 新闻)) + 12  # 每条回答约12个token
+            if 当前 and (len(当前) >= self.初筛最大条数 or 当前token + 条目token > self.初筛token预算):
+                批次列表.append(当前)
+                当前, 当前token = [], 固定开销
+            当前.append(新闻)
+            当前token += 条目token
+        if 当前:
+            批次列表.append(当前)
+        return 批次列表
+
+    def _初筛提示词(self, 批次: List[Dict]) -> str:
+        新闻文本 = "\n".join(self._初筛条目(i, 新闻) for i, 新闻 in enumerate(批次, 1))
+        return f"""
+请逐条判断以下新闻是否与人力资源管理相关。
+
+人力资源相关包括：招聘、薪酬福利、培训发展、组织架构调整、企业文化、员工关系、劳动法规等。
+
+{新闻文本}
+
+请只输出一个JSON数组，每条新闻一项，不要其他解释，例如：
+[{{"编号": 1, "相关": true}}, {{"编号": 2, "相关": false}}]
+"""
+
+    def _判断一批(self, 批次: List[Dict]) -> List[bool]:
+        """批量判断一批新闻，未能解析出结论的新闻逐条判断"""
+        if len(批次) == 1:
+            return [self._判断是否hr相关(批次[0])]
+
+        try:
+            结论 = self._解析批量判断(self._调用模型('初筛', self._初筛提示词(批次), temperature=0.1), len(批次))
+        except Exception as e:
+            print(f"AI批量判断出错: {e}")
+            结论 = {}
+
+        缺失 = len(批次) - len(结论)
+        if 缺失:
+            print(f"⚠️ 批量判断中 {缺失} 条未得到有效结论，改为逐条判断")
+        return [结论[i] if i in 结论 else self._判断是否hr相关(新闻) for i, 新闻 in enumerate(批次)]
+
+    @staticmethod
+    def _解析批量判断(回答: str, 条数: int) -> Dict[int, bool]:
+        """解析 [{"编号": 1, "相关": true}, ...]，返回 下标 → 结论（只包含合法的条目）"""
+        匹配 = re.search(r'\[.*\]', 回答, re.S)
+        if not 匹配:
+            raise ValueError(f"回答中没有JSON数组: {回答[:50]}")
+        数组 = json.loads(匹配.group())
+
+        结论 = {}
+        for 位置, 项 in enumerate(数组):
+            if isinstance(项, bool):
+                编号, 相关 = 位置 + 1, 项
+            elif isinstance(项, dict):
+                编号, 相关 = 项.get('编号'), 项.get('相关')
+            else:
+                continue
+            if isinstance(相关, str):
+                相关 = {'true': True, '是': True, 'false': False, '否': False}.get(相关.strip().lower())
+            if isinstance(编号, int) and 1 <= 编号 <= 条数 and isinstance(相关, bool):
+                结论[编号 - 1] = 相关
+        return 结论
+
     def _关键词匹配判断(self, 新闻: Dict) -> bool:
         """使用关键词匹配判断（后备方案）"""
         文本 = 新闻['title'] + " " + 新闻.get('abstract', '')
@@ -95,12 +380,13 @@ class AI分析器:
     def _分类hr模块(self, 新闻: Dict) -> str:
         """将新闻分类到具体的HR模块"""
         分类列表 = "\n".join([f"{i+1}. {cat['name']}" for i, cat in enumerate(self.hr分类)])
+        标题, 摘要 = self.提示词构建器.新闻(新闻)
 
         提示词 = f"""
 请将以下新闻分类到最合适的人力资源模块中。
 
-新闻标题：{新闻['title']}
-新闻摘要：{新闻.get('abstract', '')}
+新闻标题：{标题}
+新闻摘要：{摘要}
 
 可选分类：
 {分类列表}
@@ -109,13 +395,7 @@ class AI分析器:
 """
 
         try:
-            响应 = self.客户端.chat.completions.create(
-                model=self.模型,
-                messages=[{"role": "user", "content": 提示词}],
-                temperature=0.1,
-            )
-
-            分类结果 = 响应.choices[0].message.content.strip()
+            分类结果 = self._调用模型('分类', 提示词, temperature=0.1)
 
             # 验证分类是否有效
             有效分类 = [cat['name'] for cat in self.hr分类]
@@ -150,12 +430,21 @@ class AI分析器:
 
         return "其他"
 
-    def _生成摘要(self, 新闻: Dict) -> str:
-        """生成新闻摘要"""
-        # 如果已有摘要且较短，直接使用
+    def _本地摘要(self, 新闻: Dict) -> str:
+        """原摘要较短时直接使用，否则抽取其中最重要的句子"""
         原摘要 = 新闻.get('abstract', '')
-        if 原摘要 and len(原摘要) < 150:
+        if not 原摘要:
+            return "暂无摘要"
+        if len(原摘要) < 150:
             return 原摘要
+        return self.摘要器.摘要(新闻['title'], 原摘要) or 原摘要
+
+    def _生成摘要(self, 新闻: Dict) -> str:
+        """生成新闻摘要（摘要模式为 llm 且原摘要较长时调用模型）"""
+        原摘要 = 新闻.get('abstract', '')
+        if self.摘要模式 != 'llm' or len(原摘要) < 150:
+            return self._本地摘要(新闻)
+        标题, 输入摘要 = self.提示词构建器.新闻(新闻)
 
         提示词 = f"""
 请为以下汽车行业HR新闻生成一个简洁的摘要（50字以内），重点突出：
@@ -163,63 +452,99 @@ class AI分析器:
 2. 发生了什么HR相关的事情
 3. 对行业的影响或意义
 
-新闻标题：{新闻['title']}
-原始摘要：{原摘要}
+新闻标题：{标题}
+原始摘要：{输入摘要}
 
 请直接输出摘要，不要前缀说明。
 """
 
         try:
-            响应 = self.客户端.chat.completions.create(
-                model=self.模型,
-                messages=[{"role": "user", "content": 提示词}],
-                temperature=0.7,
-            )
-
-            return 响应.choices[0].message.content.strip()
+            return self._调用模型('摘要', 提示词, temperature=0.7)
 
         except Exception as e:
             print(f"生成摘要出错: {e}")
-            return 原摘要 if 原摘要 else "暂无摘要"
+            return self._本地摘要(新闻)
+
+    def _本地关键词(self, 新闻: Dict, 摘要: str) -> List[str]:
+        """本地TF-IDF提取，正文取原摘要（没有时用生成的摘要）"""
+        return self.关键词提取器.提取(新闻['title'], 新闻.get('abstract') or 摘要) or 新闻.get('keywords', [])
 
     def _提取关键词(self, 新闻: Dict, 摘要: str) -> List[str]:
-        """提取关键词"""
+        """提取关键词（关键词模式为 llm 时调用模型）"""
+        if self.关键词模式 != 'llm':
+            return self._本地关键词(新闻, 摘要)
+
         提示词 = f"""
 请从以下新闻中提取3-5个关键词。
 
-标题：{新闻['title']}
-摘要：{摘要}
+标题：{self.提示词构建器.标题(新闻['title'])}
+摘要：{self.提示词构建器.正文(新闻['title'], 摘要)}
 
 请只输出关键词，用逗号分隔，不要其他解释。
 例如：招聘,高薪,人才竞争
 """
 
         try:
-            响应 = self.客户端.chat.completions.create(
-                model=self.模型,
-                messages=[{"role": "user", "content": 提示词}],
-                temperature=0.5,
-            )
-
-            关键词文本 = 响应.choices[0].message.content.strip()
+            关键词文本 = self._调用模型('关键词', 提示词, temperature=0.5)
             return [k.strip() for k in 关键词文本.split(',')]
 
         except Exception as e:
             print(f"提取关键词出错: {e}")
-            return 新闻.get('keywords', [])
-
-    def 批量分析(self, 新闻列表: List[Dict]) -> List[Dict]:
-        """批量分析新闻列表"""
-        结果列表 = []
-
-        for i, 新闻 in enumerate(新闻列表, 1):
-            print(f"\n进度: {i}/{len(新闻列表)}")
-
-            分析结果 = self.分析新闻(新闻)
-
+            return self._本地关键词(新闻, 摘要)
+
+    def 批量分析(self, 新闻列表: List[Dict], 结果回调: Optional[Callable[[Dict], None]] = None,
+                 输出统计: bool = True) -> List[Dict]:
+        """批量分析新闻列表（按 ai_service.concurrency 并发请求，结果顺序不变）
+
+        结果回调(新闻) 在每条新闻分析完成时调用（可能来自工作线程），用于及时保存结果。
+        分多批调用时传 输出统计=False，全部完成后再调用 输出运行统计()。
+        """
+        # 1. 关键词级联：得分明显高或低的新闻直接定论
+        if self.评分器:
+            初筛结论 = self.评分器.批量判定(新闻列表)
+            确定相关 = sum(1 for v in 初筛结论 if v is True)
+            确定不相关 = sum(1 for v in 初筛结论 if v is False)
+            if 新闻列表:
+                print(f"🔑 关键词级联：确定相关 {确定相关} 条，确定不相关 {确定不相关} 条，"
+                      f"{len(新闻列表) - 确定相关 - 确定不相关} 条需模型判断"
+                      f"（免去 {(确定相关 + 确定不相关) / len(新闻列表) * 100:.0f}% 的相关性判断调用）")
+        else:
+            初筛结论 = [None] * len(新闻列表)
+
+        # 2. 本地分类器：置信度足够高的新闻直接定论，分类也不再请求模型
+        本地分类 = [None] * len(新闻列表)
+        if self.本地分类器 and 新闻列表:
+            有效分类 = {cat['name'] for cat in self.hr分类}
+            相关结论, 分类结论 = self.本地分类器.有把握的判定(新闻列表)
+            本地定论 = 0
+            for i, (相关, 分类) in enumerate(zip(相关结论, 分类结论)):
+                if 初筛结论[i] is None and 相关 is not None:
+                    初筛结论[i] = 相关
+                    本地定论 += 1
+                if 分类 in 有效分类:
+                    本地分类[i] = 分类
+            print(f"🧮 本地分类器：又确定 {本地定论} 条的相关性，"
+                  f"{sum(1 for v in 本地分类 if v)} 条的HR分类（置信度 ≥ {self.本地分类器.最低置信度}）")
+
+        # 3. 其余新闻批量初筛相关性，不相关的新闻不再逐条调用模型
+        待判断 = [i for i, v in enumerate(初筛结论) if v is None]
+        if self.批量初筛 and len(待判断) > 1:
+            for i, 结论 in zip(待判断, self.批量判断相关性([新闻列表[i] for i in 待判断])):
+                初筛结论[i] = 结论
+            print(f"初筛判定HR相关: {sum(1 for v in 初筛结论 if v)} / {len(新闻列表)} 条")
+
+        def 分析并合并(参数):
+            新闻, 初筛相关, 分类 = 参数
             # 合并分析结果到新闻数据中
-            新闻.update(分析结果)
-            结果列表.append(新闻)
+            新闻.update(self.分析新闻(新闻, 初筛相关, 分类))
+            if 结果回调:
+                结果回调(新闻)
+            return 新闻
+
+        结果列表 = self.执行器.映射(
+            分析并合并, list(zip(新闻列表, 初筛结论, 本地分类)),
+            完成回调=lambda 已完成, 总数: print(f"\n进度: {已完成}/{总数}")
+        )
 
         # 统计
         hr相关数量 = sum(1 for n in 结果列表 if n['is_hr_related'])
@@ -227,15 +552,29 @@ class AI分析器:
         print(f"总计: {len(结果列表)} 条")
         print(f"HR相关: {hr相关数量} 条")
         print(f"不相关: {len(结果列表) - hr相关数量} 条")
+        if 输出统计:
+            self.输出运行统计()
 
         return 结果列表
 
+    def 输出运行统计(self):
+        """打印缓存命中和调用统计，并导出调用统计"""
+        if self.缓存:
+            self.缓存.打印统计()
+        if self.监控:
+            self.监控.打印汇总()
+            self.监控.导出()
+
 
 def 主程序():
-    """命令行运行入口"""
-    # 加载未分析的新闻数据
-    with open('数据/新闻数据.json', 'r', encoding='utf-8') as f:
-        新闻列表 = json.load(f)
+    """命令行运行入口
+
+    每条结果先写入分析日志，每 ai_service.checkpoint.batch_size 条合并写入存储一次；
+    随时可以中断，下次运行从日志和存储中已有的结果继续。
+    """
+    # 加载未分析的新闻数据（读取快照，分析期间不占用写锁）
+    存储 = 按配置创建存储()
+    新闻列表 = 存储.加载新闻()
 
     # 筛选未分析的
     未分析列表 = [n for n in 新闻列表 if 'is_hr_related' not in n]
@@ -246,22 +585,83 @@ def 主程序():
 
     print(f"发现 {len(未分析列表)} 条未分析的新闻")
 
-    # 进行分析
-    分析器 = AI分析器()
-    分析结果 = 分析器.批量分析(未分析列表)
-
-    # 更新原数据
-    新闻字典 = {n['id']: n for n in 新闻列表}
-    for 新闻 in 分析结果:
-        新闻字典[新闻['id']] = 新闻
+    # 同一篇文章（不同爬虫、不同ID）只分析一次，其余复用已有结果
+    标识 = 按配置创建标识(存储=存储)
+    同篇新闻 = {}
+    for 新闻 in 未分析列表:
+        同篇新闻.setdefault(标识.新闻规范ID(新闻), []).append(新闻)
+
+    分析字段 = ('is_hr_related', 'hr_category', 'summary', 'keywords', 'label_source')
+
+    def 写入存储(记录列表):
+        """把 [(规范ID, 分析字段)] 应用到该文章的所有未分析记录，按ID合并回最新文件"""
+        分析结果 = []
+        for 规范ID, 字段 in 记录列表:
+            for 新闻 in 同篇新闻.get(规范ID, []):
+                新闻.update(字段)
+                分析结果.append(新闻)
+        if 分析结果:
+            存储.更新新闻(分析结果)
+            print(f"💾 已保存 {len(分析结果)} 条分析结果")
 
-    # 保存
-    所有新闻 = list(新闻字典.values())
-    with open('数据/新闻数据.json', 'w', encoding='utf-8') as f:
-        json.dump(所有新闻, f, ensure_ascii=False, indent=2)
+    分析器 = AI分析器()
+    日志 = 分析日志.按配置创建(分析器.配置['ai_service'], 写入存储)
+
+    # 存储中已分析过的同篇文章直接复用
+    已分析 = {标识.新闻规范ID(n): {k: n[k] for k in 分析字段 if k in n}
+              for n in 新闻列表 if 'is_hr_related' in n}
+    复用 = [(规范ID, 已分析[规范ID]) for 规范ID in 同篇新闻 if 规范ID in 已分析]
+
+    # 上次运行中断前已分析、尚未写入存储的结果
+    恢复 = [(规范ID, 字段) for 规范ID, 字段 in 日志.恢复().items() if 规范ID in 同篇新闻]
+    if 恢复:
+        print(f"♻️ 从分析日志恢复 {len(恢复)} 篇上次中断前的分析结果")
+    日志.提交(复用 + 恢复)
+
+    已完成 = {规范ID for 规范ID, _ in 复用 + 恢复}
+    待分析 = [新闻组[0] for 规范ID, 新闻组 in 同篇新闻.items() if 规范ID not in 已完成]
+    if len(待分析) < len(未分析列表):
+        print(f"其中 {len(未分析列表) - len(待分析)} 条是重复文章或已有结果，无需再次分析")
+
+    # 按优先级（新鲜度、来源权重、关键词得分）分批分析，每条结果完成时记入日志；
+    # 达到本次运行的时间/调用预算时停止，剩余的低优先级新闻留到下次
+    调度器 = 优先调度器.按配置创建(分析器.配置)
+    预算 = 运行预算.按配置创建(分析器.配置['ai_service'])
+    批大小 = (分析器.配置['ai_service'].get('scheduling') or {}).get('batch_size', 50)
+    已分析数 = 0
+    停止原因 = None
+    # 调用次数由并发执行器计数，关闭调用监控时 max_calls 同样生效
+    每条调用数 = 分析器.每条最多调用数()
+    try:
+        for 批次 in 调度器.分批(待分析, 批大小):
+            while 批次 and not 停止原因:
+                停止原因 = 预算.已用尽(已分析数, 分析器.执行器.已调用次数)
+                if 停止原因:
+                    break
+                # 每条按最多调用数计，本批用完也不会超出 max_calls；放不下的留在本批下一轮再分析
+                可分析 = 预算.可分析条数(已分析数, 分析器.执行器.已调用次数, 每条调用数)
+                if 可分析 == 0:
+                    停止原因 = f"剩余调用次数不足以再分析一条（每条最多 {每条调用数} 次）"
+                    break
+                本批, 批次 = (批次[:可分析], 批次[可分析:]) if 可分析 is not None else (批次, [])
+                分析器.批量分析(本批, 结果回调=lambda 新闻: 日志.记录(
+                    标识.新闻规范ID(新闻), {k: 新闻[k] for k in 分析字段 if k in 新闻}), 输出统计=False)
+                已分析数 += len(本批)
+            if 停止原因:
+                break
+    except KeyboardInterrupt:
+        print("\n⏹️ 已中断，保存已完成的结果，下次运行将从这里继续")
+    finally:
+        日志.提交()
+
+    if 停止原因:
+        print(f"\n⏸️ {停止原因}，达到本次运行预算；剩余 {len(待分析) - 已分析数} 条优先级较低的新闻留到下次运行")
+    分析器.输出运行统计()
 
     print(f"\n✅ 分析结果已保存！")
 
+    按配置发布快照(存储)
+
 
 if __name__ == "__main__":
     主程序()
@@ -0,0 +1,76 @@
+"""
+分析日志模块
+每条新闻分析完成后立即追加到旁路日志（JSONL），每攒够一批再合并写入存储并清空日志；
+分析中途被中断（崩溃、Ctrl+C、Actions超时）时，下次运行先恢复日志中的结果，已付费的API调用不会丢失
+"""
+
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Tuple
+
+
+class 分析日志:
+    """线程安全的分析结果日志
+
+    日志每行一条：{"id": 规范ID, "fields": 分析字段}。
+    提交函数(记录列表) 负责把 [(规范ID, 分析字段)] 写入存储，成功返回后日志才被清空。
+    """
+
+    def __init__(self, 路径: str, 提交函数: Callable[[List[Tuple[str, Dict]]], None], 批大小: int = 20):
+        self.路径 = 路径
+        self.提交函数 = 提交函数
+        self.批大小 = max(1, 批大小)
+
+        self._锁 = threading.Lock()
+        self._待提交: List[Tuple[str, Dict]] = []
+        os.makedirs(os.path.dirname(路径) or '.', exist_ok=True)
+
+    @classmethod
+    def 按配置创建(cls, ai配置: dict, 提交函数: Callable) -> '分析日志':
+        """由配置文件的 ai_service.checkpoint 段创建"""
+        检查点配置 = ai配置.get('checkpoint') or {}
+        return cls(
+            检查点配置.get('journal_path', '数据/分析日志.jsonl'),
+            提交函数,
+            批大小=检查点配置.get('batch_size', 20),
+        )
+
+    def 恢复(self) -> Dict[str, Dict]:
+        """读取上次运行未提交的结果；最后一行可能在写入时被中断，无法解析的行直接跳过"""
+        if not os.path.exists(self.路径):
+            return {}
+        结果 = {}
+        with open(self.路径, 'r', encoding='utf-8') as f:
+            for 行 in f:
+                try:
+                    记录 = json.loads(行)
+                    结果[记录['id']] = 记录['fields']
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    continue
+        return 结果
+
+    def 记录(self, 规范ID: str, 字段: Dict):
+        """追加一条结果并刷到磁盘，攒够一批时提交"""
+        with self._锁:
+            with open(self.路径, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'id': 规范ID, 'fields': 字段}, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._待提交.append((规范ID, 字段))
+            if len(self._待提交) >= self.批大小:
+                self._提交()
+
+    def 提交(self, 额外记录: List[Tuple[str, Dict]] = ()):
+        """立即提交所有待提交结果（含从日志恢复的 额外记录）"""
+        with self._锁:
+            self._待提交.extend(额外记录)
+            self._提交()
+
+    def _提交(self):
+        if self._待提交:
+            self.提交函数(self._待提交)
+            self._待提交 = []
+        # 结果已进入存储，日志中的内容不再需要
+        if os.path.exists(self.路径):
+            os.remove(self.路径)
@@ -4,14 +4,28 @@ AI周报生成模块
 """
 
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional
 import json
+import time
+
+from AI分析.提示词构建 import 提示词构建器, 估算token
+from 数据存储.只读快照 import 快照视图
 
 
 class 周报生成器:
-    def __init__(self, ai客户端=None):
-        """初始化周报生成器"""
+    def __init__(self, ai客户端=None, 监控=None, 构建器: Optional[提示词构建器] = None,
+                 模型: str = "glm-4-flash"):
+        """初始化周报生成器
+
+        周报中的条数和公司/分类统计都由传入的新闻列表计算，同一份周报内的数字相互一致。
+        传入监控（AI分析.调用监控）时记录周报生成调用的耗时和token。
+        构建器（AI分析.提示词构建）决定每条新闻和整个新闻列表的token预算，不传时使用默认预算。
+        模型 通常取 AI分析器.路由.模型('周报')，即 ai_service.routing 中的强模型。
+        """
         self.ai客户端 = ai客户端
+        self.监控 = 监控
+        self.构建器 = 构建器 or 提示词构建器()
+        self.模型 = 模型
 
     def 生成本周大事记(self, 新闻列表: List[Dict]) -> Dict:
         """生成本周大事记总结"""
@@ -40,6 +54,10 @@ class 周报生成器:
         本周开始 = 现在 - timedelta(days=现在.weekday())  # 本周一
         本周开始 = 本周开始.replace(hour=0, minute=0, second=0, microsecond=0)
 
+        if isinstance(新闻列表, 快照视图):
+            # 快照按抓取时间倒序，二分查找本周一的边界，不逐条解码
+            return 新闻列表.子集(开始时间=本周开始.strftime('%Y-%m-%d'))
+
         本周新闻 = []
         for 新闻 in 新闻列表:
             try:
@@ -104,11 +122,14 @@ class 周报生成器:
 
     def _ai生成总结(self, 本周新闻: List[Dict]) -> Dict:
         """使用AI生成总结"""
-        # 准备新闻内容
-        新闻文本 = ""
-        for i, 新闻 in enumerate(本周新闻[:20], 1):  # 最多分析20条
-            新闻文本 += f"{i}. 【{新闻['company']}】{新闻['title']}\n"
-            新闻文本 += f"   {新闻.get('summary', '')}\n\n"
+        # 准备新闻内容：最多20条，每条摘要和整个列表都裁剪到token预算内
+        条目列表 = []
+        for i, 新闻 in enumerate(本周新闻[:20], 1):
+            摘要 = self.构建器.正文(新闻['title'], 新闻.get('summary') or '', self.构建器.周报每条预算)
+            条目列表.append(f"{i}. 【{新闻['company']}】{self.构建器.标题(新闻['title'])}\n   {摘要}\n\n")
+        新闻文本, 条数 = self.构建器.拼接(条目列表)
+        if 条数 < len(条目列表):
+            print(f"✂️ 周报提示词超出预算，只放入前 {条数} 条新闻")
 
         提示词 = f"""
 请分析以下本周汽车行业HR新闻，生成一份简洁的大事记总结。
@@ -134,11 +155,19 @@ class 周报生成器:
 """
 
         try:
-            响应 = self.ai客户端.chat.completions.create(
-                model="glm-4-flash",
-                messages=[{"role": "user", "content": 提示词}],
-                temperature=0.7,
-            )
+            开始 = time.perf_counter()
+            try:
+                响应 = self.ai客户端.chat.completions.create(
+                    model=self.模型,
+                    messages=[{"role": "user", "content": 提示词}],
+                    temperature=0.7,
+                )
+            except Exception:
+                if self.监控:
+                    self.监控.记录('周报', self.模型, time.perf_counter() - 开始, 出错=True)
+                raise
+            if self.监控:
+                self.监控.记录响应('周报', self.模型, 开始, 响应, 估算提示token=估算token(提示词))
 
             结果文本 = 响应.choices[0].message.content.strip()
 
@@ -157,7 +186,7 @@ class 周报生成器:
             return self._规则生成总结(本周新闻)
 
 
-def 生成本周大事记(新闻列表: List[Dict], ai客户端=None) -> Dict:
+def 生成本周大事记(新闻列表: List[Dict], ai客户端=None, 监控=None, 模型: str = "glm-4-flash") -> Dict:
     """快捷函数：生成本周大事记"""
-    生成器 = 周报生成器(ai客户端)
+    生成器 = 周报生成器(ai客户端, 监控, 模型=模型)
     return 生成器.生成本周大事记(新闻列表)
@@ -0,0 +1,168 @@
+"""
+模型响应缓存模块
+把模型回答持久化到SQLite，键为 (模型, 提示词模板版本, 规范化提示词哈希)，
+崩溃后重跑或转载文章内容相同的新闻不再重复调用API；支持过期时间和按最近使用淘汰
+
+查看统计 / 清理：
+    python AI分析/响应缓存.py
+    python AI分析/响应缓存.py --清理
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+
+class 响应缓存:
+    """线程安全的磁盘缓存，多个分析进程可共享同一个数据库文件"""
+
+    def __init__(self, 路径: str = "数据/AI缓存.db", 有效期天数: float = 30, 最大条数: int = 50000):
+        self.路径 = 路径
+        self.有效期秒数 = 有效期天数 * 86400 if 有效期天数 else None
+        self.最大条数 = 最大条数
+
+        self._锁 = threading.Lock()
+        self._写入次数 = 0
+        # 本次运行的命中统计：步骤 → [命中, 未命中]
+        self._本次统计 = defaultdict(lambda: [0, 0])
+
+        os.makedirs(os.path.dirname(路径) or '.', exist_ok=True)
+        self._连接 = sqlite3.connect(路径, check_same_thread=False, timeout=30)
+        self._连接.execute("PRAGMA journal_mode=WAL")
+        self._连接.execute("""
+            CREATE TABLE IF NOT EXISTS 响应表 (
+                cache_key TEXT PRIMARY KEY,
+                model TEXT,
+                step TEXT,
+                template_version INTEGER,
+                response TEXT,
+                created_at REAL,
+                last_used_at REAL
+            )
+        """)
+        self._连接.execute("CREATE INDEX IF NOT EXISTS 响应表_最近使用 ON 响应表(last_used_at)")
+        self._连接.execute("""
+            CREATE TABLE IF NOT EXISTS 命中统计 (
+                step TEXT PRIMARY KEY,
+                hits INTEGER DEFAULT 0,
+                misses INTEGER DEFAULT 0
+            )
+        """)
+        self._连接.commit()
+
+    @classmethod
+    def 按配置创建(cls, ai配置: dict) -> Optional['响应缓存']:
+        """由配置文件的 ai_service.cache 段创建，enabled 为 false 时返回 None"""
+        缓存配置 = ai配置.get('cache') or {}
+        if not 缓存配置.get('enabled', True):
+            return None
+        return cls(
+            缓存配置.get('path', '数据/AI缓存.db'),
+            有效期天数=缓存配置.get('ttl_days', 30),
+            最大条数=缓存配置.get('max_entries', 50000),
+        )
+
+    @staticmethod
+    def 生成键(模型: str, 步骤: str, 模板版本: int, temperature: float, 提示词: str) -> str:
+        """提示词只做空白规范化（合并连续空白、去掉首尾空白）后参与哈希"""
+        规范化 = re.sub(r'\s+', ' ', 提示词).strip()
+        内容 = f"{模型}\x00{步骤}\x00{模板版本}\x00{temperature}\x00{规范化}"
+        return hashlib.sha256(内容.encode('utf-8')).hexdigest()
+
+    def 读取(self, 键: str, 步骤: str) -> Optional[str]:
+        """命中且未过期时返回缓存的回答"""
+        现在 = time.time()
+        with self._锁:
+            行 = self._连接.execute(
+                "SELECT response, created_at FROM 响应表 WHERE cache_key = ?", (键,)
+            ).fetchone()
+            if 行 and self.有效期秒数 and 现在 - 行[1] > self.有效期秒数:
+                self._连接.execute("DELETE FROM 响应表 WHERE cache_key = ?", (键,))
+                行 = None
+
+            命中 = 行 is not None
+            if 命中:
+                self._连接.execute("UPDATE 响应表 SET last_used_at = ? WHERE cache_key = ?", (现在, 键))
+            self._本次统计[步骤][0 if 命中 else 1] += 1
+            self._连接.execute(f"""
+                INSERT INTO 命中统计 (step, {'hits' if 命中 else 'misses'}) VALUES (?, 1)
+                ON CONFLICT(step) DO UPDATE SET {'hits = hits' if 命中 else 'misses = misses'} + 1
+            """, (步骤,))
+            self._连接.commit()
+            return 行[0] if 命中 else None
+
+    def 写入(self, 键: str, 模型: str, 步骤: str, 模板版本: int, 回答: str):
+        现在 = time.time()
+        with self._锁:
+            self._连接.execute(
+                "INSERT OR REPLACE INTO 响应表 VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (键, 模型, 步骤, 模板版本, 回答, 现在, 现在)
+            )
+            self._连接.commit()
+            self._写入次数 += 1
+            需要清理 = self._写入次数 % 500 == 0
+        if 需要清理:
+            self.清理()
+
+    def 清理(self) -> int:
+        """删除过期条目，并按最近使用时间淘汰超出上限的条目，返回删除数量"""
+        with self._锁:
+            删除 = 0
+            if self.有效期秒数:
+                删除 += self._连接.execute(
+                    "DELETE FROM 响应表 WHERE created_at < ?", (time.time() - self.有效期秒数,)
+                ).rowcount
+            if self.最大条数:
+                删除 += self._连接.execute("""
+                    DELETE FROM 响应表 WHERE cache_key IN (
+                        SELECT cache_key FROM 响应表 ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.最大条数,)).rowcount
+            self._连接.commit()
+            return 删除
+
+    def 统计(self) -> Dict:
+        """本次运行和历史累计的命中情况"""
+        with self._锁:
+            条数 = self._连接.execute("SELECT COUNT(*) FROM 响应表").fetchone()[0]
+            累计 = {步骤: {'hits': 命中, 'misses': 未命中}
+                    for 步骤, 命中, 未命中 in self._连接.execute("SELECT step, hits, misses FROM 命中统计")}
+        本次 = {步骤: {'hits': 值[0], 'misses': 值[1]} for 步骤, 值 in self._本次统计.items()}
+        return {'entries': 条数, 'session': 本次, 'total': 累计}
+
+    def 打印统计(self, 仅本次: bool = True):
+        统计 = self.统计()
+        print(f"\n💾 响应缓存（{self.路径}，{统计['entries']} 条）")
+        for 标题, 数据 in (('本次', 统计['session']),) + (() if 仅本次 else (('累计', 统计['total']),)):
+            for 步骤, 值 in sorted(数据.items()):
+                总数 = 值['hits'] + 值['misses']
+                命中率 = 值['hits'] / 总数 * 100 if 总数 else 0
+                print(f"  {标题} {步骤}: 命中 {值['hits']} / {总数}（{命中率:.0f}%）")
+
+    def 关闭(self):
+        with self._锁:
+            self._连接.close()
+
+
+def 主程序():
+    """命令行运行入口"""
+    解析器 = argparse.ArgumentParser(description="查看或清理模型响应缓存")
+    解析器.add_argument('--路径', default="数据/AI缓存.db")
+    解析器.add_argument('--清理', action='store_true', help="删除过期和超出上限的条目")
+    参数 = 解析器.parse_args()
+
+    缓存 = 响应缓存(参数.路径)
+    if 参数.清理:
+        print(f"🧹 已删除 {缓存.清理()} 条缓存")
+    缓存.打印统计(仅本次=False)
+    缓存.关闭()
+
+
+if __name__ == "__main__":
+    主程序()
@@ -0,0 +1,145 @@
+"""
+并发执行模块
+限制同时进行的模型请求数和每分钟请求数，遇到限流（429）和服务端错误（5xx）时按指数退避加随机抖动重试，
+批量任务并发执行但结果保持输入顺序
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional
+
+
+class 速率限制器:
+    """把请求均匀分布在时间上，保证任意一分钟内不超过 每分钟请求数"""
+
+    def __init__(self, 每分钟请求数: Optional[float] = None):
+        self.间隔 = 60.0 / 每分钟请求数 if 每分钟请求数 else 0.0
+        self._下次可用 = 0.0
+        self._锁 = threading.Lock()
+
+    def 等待(self):
+        if not self.间隔:
+            return
+        with self._锁:
+            现在 = time.monotonic()
+            开始 = max(现在, self._下次可用)
+            self._下次可用 = 开始 + self.间隔
+        if 开始 > 现在:
+            time.sleep(开始 - 现在)
+
+
+def 可重试(异常: Exception) -> bool:
+    """限流、服务端错误、超时和连接错误可以重试；参数错误、鉴权失败等不重试"""
+    状态码 = getattr(异常, 'status_code', None)
+    if 状态码 is None and getattr(异常, 'response', None) is not None:
+        状态码 = getattr(异常.response, 'status_code', None)
+    if isinstance(状态码, int):
+        return 状态码 == 429 or 状态码 >= 500
+
+    类名 = type(异常).__name__
+    return any(词 in 类名 for 词 in ('Timeout', 'Connection', 'RateLimit', 'ServerError'))
+
+
+def _建议等待秒数(异常: Exception) -> Optional[float]:
+    """读取响应头中的 Retry-After"""
+    响应 = getattr(异常, 'response', None)
+    头 = getattr(响应, 'headers', None) or {}
+    try:
+        return float(头.get('Retry-After') or 头.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+class 并发执行器:
+    """模型请求的并发执行器
+
+    调用()  包装单次模型请求：并发数限制 + 速率限制 + 重试
+    映射()  用线程池并发处理一批任务，返回与输入顺序一致的结果
+    已调用次数  调用() 的累计次数（重试不另计），不依赖调用监控是否启用，用于运行预算
+    """
+
+    def __init__(self, 最大并发: int = 4, 每分钟请求数: Optional[float] = None,
+                 最大重试: int = 5, 基础退避秒数: float = 1.0, 最大退避秒数: float = 60.0):
+        self.最大并发 = max(1, 最大并发)
+        self.最大重试 = 最大重试
+        self.基础退避秒数 = 基础退避秒数
+        self.最大退避秒数 = 最大退避秒数
+        self.限速 = 速率限制器(每分钟请求数)
+        self._在途 = threading.BoundedSemaphore(self.最大并发)
+        self._线程状态 = threading.local()
+        self._计数锁 = threading.Lock()
+        self.已调用次数 = 0
+
+    @classmethod
+    def 按配置创建(cls, ai配置: dict) -> '并发执行器':
+        """由配置文件的 ai_service.concurrency 段创建"""
+        并发配置 = ai配置.get('concurrency') or {}
+        return cls(
+            最大并发=并发配置.get('max_in_flight', 4),
+            每分钟请求数=并发配置.get('requests_per_minute'),
+            最大重试=并发配置.get('max_retries', 5),
+        )
+
+    def 调用(self, 函数: Callable, *参数, **关键字参数) -> Any:
+        """执行一次请求，可重试的错误按指数退避重试，重试用尽后抛出最后一次的异常"""
+        with self._计数锁:
+            self.已调用次数 += 1
+        for 次数 in range(self.最大重试 + 1):
+            self._线程状态.重试次数 = 次数
+            self.限速.等待()
+            try:
+                with self._在途:
+                    return 函数(*参数, **关键字参数)
+            except Exception as e:
+                if 次数 >= self.最大重试 or not 可重试(e):
+                    raise
+                等待 = _建议等待秒数(e)
+                if 等待 is None:
+                    # 全抖动：在 [0, 基础 * 2^次数] 内随机，避免大量线程同时重试
+                    等待 = random.uniform(0, min(self.最大退避秒数, self.基础退避秒数 * 2 ** 次数))
+                print(f"⏳ 请求失败（{type(e).__name__}），{等待:.1f} 秒后第 {次数 + 1} 次重试")
+                time.sleep(等待)
+
+    @property
+    def 最近重试次数(self) -> int:
+        """当前线程上一次 调用() 的重试次数"""
+        return getattr(self._线程状态, '重试次数', 0)
+
+    def 映射(self, 函数: Callable, 任务列表: Iterable, 完成回调: Optional[Callable] = None) -> List:
+        """并发执行 函数(任务)，结果顺序与任务顺序一致
+
+        完成回调(已完成数, 总数) 在每个任务完成时调用，用于打印进度。
+        """
+        任务列表 = list(任务列表)
+        if self.最大并发 == 1 or len(任务列表) <= 1:
+            结果 = []
+            for i, 任务 in enumerate(任务列表, 1):
+                结果.append(函数(任务))
+                if 完成回调:
+                    完成回调(i, len(任务列表))
+            return 结果
+
+        已完成 = 0
+        计数锁 = threading.Lock()
+
+        def 执行(任务):
+            nonlocal 已完成
+            值 = 函数(任务)
+            with 计数锁:
+                已完成 += 1
+                if 完成回调:
+                    完成回调(已完成, len(任务列表))
+            return 值
+
+        with ThreadPoolExecutor(max_workers=self.最大并发) as 线程池:
+            任务 = [线程池.submit(执行, 项) for 项 in 任务列表]
+            try:
+                return [f.result() for f in 任务]
+            except BaseException:
+                # 中断（Ctrl+C）或出错时取消排队中的任务，只等待已在进行的请求结束
+                # （shutdown 的 cancel_futures 参数需要 Python 3.9）
+                for f in 任务:
+                    f.cancel()
+                raise
@@ -0,0 +1,149 @@
+"""
+抽取式摘要模块
+不调用模型：按中文标点分句，按 关键词密度、句子位置、与标题的重合度 给句子打分，
+取得分最高的句子按原文顺序拼成摘要，长度不超过 最大长度
+
+用法：
+    python AI分析/抽取摘要.py                 # 对存储中摘要最长的几条新闻演示并测速
+    python AI分析/抽取摘要.py --数量 20
+"""
+
+import argparse
+import html
+import os
+import re
+import sys
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AI分析.关键词提取 import 关键词提取器
+
+# 句末标点（保留在句子末尾），换行也视为句子边界
+_分句 = re.compile(r'[^。！？!?；;\n]+[。！？!?；;]*')
+# 句内可以截断的位置
+_逗号 = re.compile(r'[，,、：:]')
+# 摘要中不需要的套话，只在句首或行首（可带括号）出现时才算，正文中提到这些词的句子保留
+_套话 = re.compile(r'^[\s（(【\[]*(点击查看|查看原文|阅读原文|责任编辑|图片来源|本文来自|转载请|声明[：:]|原标题)')
+# 署名行，如 “文｜周鑫雨”“编辑｜苏建勋”
+_署名 = re.compile(r'^(出品|作者|文|编辑|责编|访谈整理|整理|采访|撰文|来源|图|头图)\s*[｜|:：]')
+_句末 = re.compile(r'[。！？!?；;]$')
+
+
+def 分句(文本: str, 最短: int = 6) -> List[str]:
+    """清理HTML实体和多余空白后按句末标点分句，短于 最短 个字的片段丢弃"""
+    文本 = re.sub(r'[ \t　\xa0]+', ' ', html.unescape(文本 or ''))
+    return [句.strip() for 句 in _分句.findall(文本) if len(句.strip()) >= 最短]
+
+
+def 有效句子(文本: str, 最短: int = 6) -> List[str]:
+    """分句并去掉署名行和“点击查看原文”之类的套话"""
+    return [句 for 句 in 分句(文本, 最短) if not _套话.match(句) and not _署名.match(句)]
+
+
+def _二元组(文本: str) -> set:
+    文本 = re.sub(r'\s+', '', 文本.lower())
+    return {文本[i:i + 2] for i in range(len(文本) - 1)}
+
+
+class 抽取摘要器:
+    """句子得分 = 关键词权重 × 关键词密度 + 位置权重 / (序号 + 1) + 标题权重 × 标题重合度
+
+    关键词密度为句中出现的关键词字数除以句长的平方根（长句不至于只因为长而得分高），
+    按全文最大值归一化；标题重合度为句子覆盖的标题字符二元组比例。
+    """
+
+    def __init__(self, 关键词提取器: Optional[关键词提取器] = None, 最大长度: int = 100,
+                 关键词权重: float = 1.0, 位置权重: float = 0.6, 标题权重: float = 0.8):
+        self.关键词提取器 = 关键词提取器
+        self.最大长度 = 最大长度
+        self.关键词权重 = 关键词权重
+        self.位置权重 = 位置权重
+        self.标题权重 = 标题权重
+
+    @classmethod
+    def 按配置创建(cls, 配置: Dict, 关键词提取器: Optional[关键词提取器] = None) -> '抽取摘要器':
+        """由配置文件的 ai_service.summary 段创建"""
+        摘要配置 = (配置.get('ai_service') or {}).get('summary') or {}
+        return cls(关键词提取器, 最大长度=摘要配置.get('max_length', 100))
+
+    def _关键词(self, 标题: str, 正文: str) -> List[str]:
+        if self.关键词提取器:
+            return [词.lower() for 词 in self.关键词提取器.提取(标题, 正文, 数量=10)]
+        return []
+
+    def 摘要(self, 标题: str, 正文: str, 最大长度: Optional[int] = None) -> str:
+        """正文不超过 最大长度 时原样返回（仅清理空白）"""
+        最大长度 = 最大长度 or self.最大长度
+        句子列表 = 有效句子(正文)
+        # 正文在抓取时被截断的，最后半句不完整
+        if len(句子列表) > 1 and not _句末.search(句子列表[-1]):
+            句子列表.pop()
+        if not 句子列表:
+            return (正文 or '').strip()[:最大长度]
+        if sum(len(句) for 句 in 句子列表) <= 最大长度:
+            return ''.join(句子列表)
+
+        关键词 = self._关键词(标题, 正文)
+        标题二元组 = _二元组(标题 or '')
+        密度 = []
+        for 句 in 句子列表:
+            小写 = 句.lower()
+            密度.append(sum(len(词) * 小写.count(词) for 词 in 关键词) / len(句) ** 0.5)
+        最大密度 = max(密度) or 1.0
+
+        得分 = []
+        for 序号, 句 in enumerate(句子列表):
+            重合 = len(标题二元组 & _二元组(句)) / len(标题二元组) if 标题二元组 else 0.0
+            得分.append(self.关键词权重 * 密度[序号] / 最大密度 + self.位置权重 / (序号 + 1) + self.标题权重 * 重合)
+
+        # 按得分从高到低选句，放不下的和得分不到最高分三成的跳过，最后按原文顺序输出
+        已选, 长度 = [], 0
+        最高分 = max(得分)
+        for 序号 in sorted(range(len(句子列表)), key=lambda i: -得分[i]):
+            if 得分[序号] >= 最高分 * 0.3 and 长度 + len(句子列表[序号]) <= 最大长度:
+                已选.append(序号)
+                长度 += len(句子列表[序号])
+        if not 已选:
+            return self._截断(句子列表[max(range(len(句子列表)), key=lambda i: 得分[i])], 最大长度)
+        return ''.join(句子列表[i] for i in sorted(已选))
+
+    @staticmethod
+    def _截断(句: str, 最大长度: int) -> str:
+        """单句就超长时在最后一个逗号处截断，没有合适的逗号时硬截断"""
+        片段 = 句[:最大长度]
+        位置 = [m.start() for m in _逗号.finditer(片段) if m.start() >= 最大长度 // 2]
+        return (片段[:位置[-1]] if 位置 else 片段[:最大长度 - 1]) + '…'
+
+
+def 主程序():
+    """命令行运行入口"""
+    解析器 = argparse.ArgumentParser(description="抽取式摘要演示")
+    解析器.add_argument('--数量', type=int, default=5, help="演示摘要最长的前几条新闻")
+    解析器.add_argument('--最大长度', type=int, default=100)
+    参数 = 解析器.parse_args()
+
+    from AI分析.关键词提取 import 按配置创建提取器
+    from 数据存储.数据库操作 import 按配置创建存储
+
+    新闻列表 = 按配置创建存储().加载新闻()
+    if not 新闻列表:
+        print("存储中没有新闻")
+        return
+    摘要器 = 抽取摘要器(按配置创建提取器(), 最大长度=参数.最大长度)
+
+    开始 = time.perf_counter()
+    for 新闻 in 新闻列表:
+        摘要器.摘要(新闻.get('title', ''), 新闻.get('abstract', ''))
+    每条 = (time.perf_counter() - 开始) / len(新闻列表) * 1e6
+
+    for 新闻 in sorted(新闻列表, key=lambda n: -len(n.get('abstract') or ''))[:参数.数量]:
+        print(f"\n📰 {新闻.get('title', '')}")
+        print(f"   原文（{len(新闻.get('abstract') or '')} 字）: {新闻.get('abstract', '')}")
+        print(f"   摘要: {摘要器.摘要(新闻.get('title', ''), 新闻.get('abstract', ''))}")
+    print(f"\n⚡ 共 {len(新闻列表)} 条，每条约 {每条:.0f} 微秒")
+
+
+if __name__ == "__main__":
+    主程序()
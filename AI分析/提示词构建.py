@@ -0,0 +1,122 @@
+"""
+提示词构建模块
+本地估算中文及中英混合文本的token数；把标题、摘要等输入去掉HTML（摘要还去掉署名和套话）后，裁剪或压缩到每次调用的token预算内，
+超长的输入不再拖慢响应、增加费用或在模型端被截断
+"""
+
+import html
+import re
+from typing import Dict, List, Optional, Tuple
+
+from AI分析.抽取摘要 import 抽取摘要器, 有效句子
+
+_中文 = re.compile(r'[\u3400-\u9fff\uf900-\ufaff]')
+_英文词 = re.compile(r'[A-Za-z]+')
+_数字 = re.compile(r'\d+')
+_其他字符 = re.compile(r'[^\sA-Za-z\d\u3400-\u9fff\uf900-\ufaff]')
+_标签 = re.compile(r'<[^<>]+>')
+_空白 = re.compile(r'[\s\xa0　]+')
+# 截断时优先停在这些位置之后
+_断点 = re.compile(r'[。！？!?；;，,、\s]')
+
+
+def 估算token(文本: str) -> int:
+    """粗略估算：中文每字约1个token，英文单词每4个字母约1个，数字每3位约1个，标点等其他字符各1个
+
+    实际用量（调用监控中的 prompt_tokens）与估算的比值见调用统计的“估算比”。
+    """
+    if not 文本:
+        return 0
+    return (len(_中文.findall(文本))
+            + sum((len(词) + 3) // 4 for 词 in _英文词.findall(文本))
+            + sum((len(数) + 2) // 3 for 数 in _数字.findall(文本))
+            + len(_其他字符.findall(文本)))
+
+
+def 清理标题(文本: str) -> str:
+    """只去掉HTML标签和实体、合并空白，标题中的“声明：”等字样保留"""
+    if not 文本:
+        return ''
+    return _空白.sub(' ', html.unescape(_标签.sub('', 文本))).strip()
+
+
+def 清理(文本: str) -> str:
+    """去掉HTML标签和实体、署名行和句首的套话，合并多余空白"""
+    if not 文本:
+        return ''
+    文本 = html.unescape(_标签.sub('', 文本))
+    return ''.join(有效句子(文本, 最短=1))
+
+
+def 截断(文本: str, 预算: int) -> str:
+    """估算token超出预算时截到预算以内，尽量停在句末或逗号处"""
+    if 估算token(文本) <= 预算:
+        return 文本
+    # 二分查找不超过预算的最长前缀（留一个token给省略号）
+    低, 高 = 0, len(文本)
+    while 低 < 高:
+        中 = (低 + 高 + 1) // 2
+        if 估算token(文本[:中]) <= 预算 - 1:
+            低 = 中
+        else:
+            高 = 中 - 1
+    片段 = 文本[:低]
+    断点 = [m.end() for m in _断点.finditer(片段) if m.end() >= 低 * 0.7]
+    return (片段[:断点[-1]] if 断点 else 片段).rstrip('，,、 ') + '…'
+
+
+class 提示词构建器:
+    """按字段预算准备提示词输入，预算单位为估算token（ai_service.prompt_budget）"""
+
+    def __init__(self, 摘要器: Optional[抽取摘要器] = None, 标题预算: int = 60, 正文预算: int = 300,
+                 初筛正文预算: int = 150, 周报预算: int = 3000, 周报每条预算: int = 120):
+        self.摘要器 = 摘要器
+        self.标题预算 = 标题预算
+        self.正文预算 = 正文预算
+        self.初筛正文预算 = 初筛正文预算
+        self.周报预算 = 周报预算
+        self.周报每条预算 = 周报每条预算
+
+    @classmethod
+    def 按配置创建(cls, 配置: Dict, 摘要器: Optional[抽取摘要器] = None) -> '提示词构建器':
+        预算配置 = (配置.get('ai_service') or {}).get('prompt_budget') or {}
+        return cls(
+            摘要器,
+            标题预算=预算配置.get('title_tokens', 60),
+            正文预算=预算配置.get('abstract_tokens', 300),
+            初筛正文预算=预算配置.get('triage_abstract_tokens', 150),
+            周报预算=预算配置.get('weekly_tokens', 3000),
+            周报每条预算=预算配置.get('weekly_item_tokens', 120),
+        )
+
+    def 标题(self, 文本: str) -> str:
+        return 截断(清理标题(文本), self.标题预算)
+
+    def 正文(self, 标题: str, 文本: str, 预算: Optional[int] = None) -> str:
+        """超出预算时先用抽取式摘要压缩（保留最重要的句子），仍超出再截断"""
+        预算 = 预算 or self.正文预算
+        文本 = 清理(文本)
+        if 估算token(文本) <= 预算:
+            return 文本
+        if self.摘要器:
+            # 按本文的 token/字 比例换算摘要字数
+            字数 = int(len(文本) * 预算 / 估算token(文本))
+            文本 = self.摘要器.摘要(标题, 文本, 最大长度=max(字数, 1))
+        return 截断(文本, 预算)
+
+    def 新闻(self, 新闻: Dict, 预算: Optional[int] = None) -> Tuple[str, str]:
+        """返回裁剪后的 (标题, 摘要)"""
+        标题 = 新闻.get('title') or ''
+        return self.标题(标题), self.正文(标题, 新闻.get('abstract') or '', 预算)
+
+    def 拼接(self, 条目列表: List[str], 预算: Optional[int] = None) -> Tuple[str, int]:
+        """按顺序拼接条目直到总预算用完，返回 (文本, 放入的条数)"""
+        预算 = 预算 or self.周报预算
+        已用, 放入 = 0, []
+        for 条目 in 条目列表:
+            条目token = 估算token(条目)
+            if 放入 and 已用 + 条目token > 预算:
+                break
+            放入.append(条目)
+            已用 += 条目token
+        return ''.join(放入), len(放入)
@@ -0,0 +1,344 @@
+"""
+本地分类器模块
+用已有新闻的 is_hr_related / hr_category 标注离线训练字符n元组 TF-IDF + 线性模型（NumPy实现），
+CPU上每秒可分类数千条新闻；置信度足够高的新闻不再请求模型判断相关性和分类
+
+用法：
+    python AI分析/本地分类器.py 训练 [--数据 数据/新闻数据.json ...]
+    python AI分析/本地分类器.py 评估 [--数据 ...]
+    python AI分析/本地分类器.py 预测 "小米汽车启动2026校园招聘" [--摘要 ...]
+未指定 --数据 时使用当前配置的存储中的全部新闻。
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from 数据存储.数据库操作 import 按配置创建存储
+
+默认模型路径 = "数据/本地分类器.npz"
+
+
+class 稀疏矩阵:
+    """CSR格式的特征矩阵；第0列为恒为1的偏置项，保证每行至少有一个非零元素"""
+
+    def __init__(self, 行指针: np.ndarray, 列号: np.ndarray, 值: np.ndarray, 列数: int):
+        self.行指针 = 行指针
+        self.列号 = 列号
+        self.值 = 值
+        self.列数 = 列数
+        self.行数 = len(行指针) - 1
+        self._行号 = np.repeat(np.arange(self.行数), np.diff(行指针))
+
+    def 乘(self, 权重: np.ndarray) -> np.ndarray:
+        """X @ W"""
+        return np.add.reduceat(self.值[:, None] * np.take(权重, self.列号, axis=0), self.行指针[:-1], axis=0)
+
+    def 转置乘(self, 矩阵: np.ndarray) -> np.ndarray:
+        """X.T @ M"""
+        加权 = self.值[:, None] * np.take(矩阵, self._行号, axis=0)
+        return np.stack([np.bincount(self.列号, weights=加权[:, k], minlength=self.列数)
+                         for k in range(矩阵.shape[1])], axis=1)
+
+    def 取行(self, 行号: Sequence[int]) -> '稀疏矩阵':
+        行指针, 列号, 值 = [0], [], []
+        for i in 行号:
+            开始, 结束 = self.行指针[i], self.行指针[i + 1]
+            列号.append(self.列号[开始:结束])
+            值.append(self.值[开始:结束])
+            行指针.append(行指针[-1] + 结束 - 开始)
+        return 稀疏矩阵(np.array(行指针), np.concatenate(列号), np.concatenate(值), self.列数)
+
+
+class 文本特征:
+    """字符n元组 TF-IDF（次线性词频 + L2归一化）"""
+
+    def __init__(self, n元范围: Tuple[int, int] = (1, 3), 最大特征数: int = 50000, 最小文档频率: int = 2):
+        self.n元范围 = n元范围
+        self.最大特征数 = 最大特征数
+        self.最小文档频率 = 最小文档频率
+        self.词表: Dict[str, int] = {}
+        self.idf = np.zeros(0)
+
+    def _切分(self, 文本: str) -> Counter:
+        文本 = re.sub(r'\s+', ' ', 文本.lower()).strip()
+        计数 = Counter()
+        for n in range(self.n元范围[0], self.n元范围[1] + 1):
+            计数.update(文本[i:i + n] for i in range(len(文本) - n + 1))
+        return 计数
+
+    def 拟合(self, 文本列表: List[str]):
+        文档频率 = Counter()
+        for 文本 in 文本列表:
+            文档频率.update(self._切分(文本).keys())
+
+        候选 = [(频率, 词) for 词, 频率 in 文档频率.items() if 频率 >= self.最小文档频率]
+        候选.sort(key=lambda x: (-x[0], x[1]))
+        # 第0列留给偏置项
+        self.词表 = {词: i + 1 for i, (_, 词) in enumerate(候选[:self.最大特征数])}
+
+        文档数 = len(文本列表)
+        self.idf = np.ones(len(self.词表) + 1)
+        for 词, 列 in self.词表.items():
+            self.idf[列] = math.log((1 + 文档数) / (1 + 文档频率[词])) + 1
+
+    def 转换(self, 文本列表: List[str]) -> 稀疏矩阵:
+        行指针, 列号, 值 = [0], [], []
+        for 文本 in 文本列表:
+            列值 = {}
+            for 词, 次数 in self._切分(文本).items():
+                列 = self.词表.get(词)
+                if 列 is not None:
+                    列值[列] = (1 + math.log(次数)) * self.idf[列]
+            范数 = math.sqrt(sum(v * v for v in 列值.values())) or 1.0
+
+            列号.append(0)
+            值.append(1.0)
+            for 列, v in 列值.items():
+                列号.append(列)
+                值.append(v / 范数)
+            行指针.append(len(列号))
+
+        return 稀疏矩阵(np.array(行指针), np.array(列号, dtype=np.int64), np.array(值, dtype=np.float32),
+                        len(self.词表) + 1)
+
+
+def _softmax(分数: np.ndarray) -> np.ndarray:
+    分数 = 分数 - 分数.max(axis=1, keepdims=True)
+    指数 = np.exp(分数)
+    return 指数 / 指数.sum(axis=1, keepdims=True)
+
+
+def _训练线性模型(X: 稀疏矩阵, 标签: np.ndarray, 类别数: int, 轮数: int = 200,
+                  学习率: float = 0.1, 正则: float = 1e-4) -> np.ndarray:
+    """多分类逻辑回归（softmax），全批量 Adam 优化，类别按频率反比加权；特征和权重用 float32 减少内存带宽"""
+    目标 = np.eye(类别数)[标签]
+    频数 = np.bincount(标签, minlength=类别数).astype(float)
+    样本权重 = (len(标签) / (类别数 * np.maximum(频数, 1)))[标签][:, None]
+
+    权重 = np.zeros((X.列数, 类别数), dtype=np.float32)
+    一阶, 二阶 = np.zeros_like(权重), np.zeros_like(权重)
+    for 步 in range(1, 轮数 + 1):
+        误差 = ((_softmax(X.乘(权重)) - 目标) * 样本权重 / len(标签)).astype(np.float32)
+        梯度 = X.转置乘(误差) + 正则 * 权重
+        一阶 = 0.9 * 一阶 + 0.1 * 梯度
+        二阶 = 0.999 * 二阶 + 0.001 * 梯度 ** 2
+        权重 -= 学习率 * (一阶 / (1 - 0.9 ** 步)) / (np.sqrt(二阶 / (1 - 0.999 ** 步)) + 1e-8)
+    return 权重
+
+
+class 本地分类器:
+    """相关性（二分类）+ HR分类（多分类）两个线性模型，共用一套特征"""
+
+    def __init__(self, 特征: Optional[文本特征] = None):
+        self.特征 = 特征 or 文本特征()
+        self.相关性权重: Optional[np.ndarray] = None
+        self.分类权重: Optional[np.ndarray] = None
+        self.分类列表: List[str] = []
+        self.最低置信度 = 0.9
+
+    @staticmethod
+    def 新闻文本(新闻: Dict) -> str:
+        # 标题信息量更大，重复一次提高权重
+        标题 = 新闻.get('title') or ''
+        return f"{标题} {标题} {新闻.get('abstract') or ''}"
+
+    def 训练(self, 新闻列表: List[Dict], 轮数: int = 200):
+        已标注 = [n for n in 新闻列表 if isinstance(n.get('is_hr_related'), bool)]
+        if not 已标注:
+            raise ValueError("没有带 is_hr_related 标注的新闻，无法训练")
+
+        文本 = [self.新闻文本(n) for n in 已标注]
+        self.特征.拟合(文本)
+        X = self.特征.转换(文本)
+
+        标签 = np.array([int(n['is_hr_related']) for n in 已标注])
+        if len(set(标签)) < 2:
+            print(f"⚠️ 训练数据中只有{'相关' if 标签[0] else '不相关'}的新闻，跳过相关性模型")
+            self.相关性权重 = None
+        else:
+            self.相关性权重 = _训练线性模型(X, 标签, 2, 轮数)
+
+        相关行 = [i for i, n in enumerate(已标注) if n['is_hr_related'] and n.get('hr_category')]
+        self.分类列表 = sorted({已标注[i]['hr_category'] for i in 相关行})
+        if len(self.分类列表) >= 2:
+            分类编号 = {名: i for i, 名 in enumerate(self.分类列表)}
+            分类标签 = np.array([分类编号[已标注[i]['hr_category']] for i in 相关行])
+            self.分类权重 = _训练线性模型(X.取行(相关行), 分类标签, len(self.分类列表), 轮数)
+        else:
+            self.分类权重 = None
+
+        print(f"✅ 训练完成：{len(已标注)} 条新闻，{X.列数 - 1} 个特征，"
+              f"{len(相关行)} 条用于训练 {len(self.分类列表)} 个HR分类")
+
+    def 预测(self, 新闻列表: List[Dict]) -> List[Dict]:
+        """返回每条新闻的 {is_hr_related, relevance_prob, hr_category, category_prob}，
+        对应模型未训练时相关字段为 None
+        """
+        if not 新闻列表:
+            return []
+        X = self.特征.转换([self.新闻文本(n) for n in 新闻列表])
+
+        相关概率 = _softmax(X.乘(self.相关性权重))[:, 1] if self.相关性权重 is not None else None
+        if self.分类权重 is not None:
+            分类概率 = _softmax(X.乘(self.分类权重))
+            分类下标 = 分类概率.argmax(axis=1)
+
+        结果 = []
+        for i in range(len(新闻列表)):
+            项 = {'is_hr_related': None, 'relevance_prob': None, 'hr_category': None, 'category_prob': None}
+            if 相关概率 is not None:
+                项['relevance_prob'] = float(相关概率[i])
+                项['is_hr_related'] = bool(相关概率[i] >= 0.5)
+            if self.分类权重 is not None:
+                项['hr_category'] = self.分类列表[分类下标[i]]
+                项['category_prob'] = float(分类概率[i, 分类下标[i]])
+            结果.append(项)
+        return 结果
+
+    def 保存(self, 路径: str = 默认模型路径):
+        os.makedirs(os.path.dirname(路径) or '.', exist_ok=True)
+        词表 = sorted(self.特征.词表, key=self.特征.词表.get)
+        np.savez_compressed(
+            路径,
+            词表=np.array(词表, dtype=object),
+            idf=self.特征.idf,
+            相关性权重=self.相关性权重 if self.相关性权重 is not None else np.zeros(0),
+            分类权重=self.分类权重 if self.分类权重 is not None else np.zeros(0),
+            分类列表=np.array(self.分类列表, dtype=object),
+            参数=np.array(json.dumps({'n元范围': self.特征.n元范围, '最大特征数': self.特征.最大特征数,
+                                      '最小文档频率': self.特征.最小文档频率})),
+        )
+        print(f"💾 模型已保存到 {路径}")
+
+    @classmethod
+    def 加载(cls, 路径: str = 默认模型路径) -> '本地分类器':
+        数据 = np.load(路径, allow_pickle=True)
+        参数 = json.loads(str(数据['参数']))
+        特征 = 文本特征(tuple(参数['n元范围']), 参数['最大特征数'], 参数['最小文档频率'])
+        特征.词表 = {词: i + 1 for i, 词 in enumerate(数据['词表'].tolist())}
+        特征.idf = 数据['idf']
+
+        分类器 = cls(特征)
+        分类器.相关性权重 = 数据['相关性权重'] if 数据['相关性权重'].size else None
+        分类器.分类权重 = 数据['分类权重'] if 数据['分类权重'].size else None
+        分类器.分类列表 = 数据['分类列表'].tolist()
+        return 分类器
+
+    @classmethod
+    def 按配置加载(cls, 配置: Dict) -> Optional['本地分类器']:
+        """由配置文件的 ai_service.local_classifier 段加载，未启用或模型文件不存在时返回 None"""
+        分类器配置 = (配置.get('ai_service') or {}).get('local_classifier') or {}
+        路径 = 分类器配置.get('model_path', 默认模型路径)
+        if not 分类器配置.get('enabled', True) or not os.path.exists(路径):
+            return None
+        分类器 = cls.加载(路径)
+        分类器.最低置信度 = 分类器配置.get('min_confidence', 0.9)
+        return 分类器
+
+    def 有把握的判定(self, 新闻列表: List[Dict]) -> Tuple[List[Optional[bool]], List[Optional[str]]]:
+        """只返回置信度达到 最低置信度 的相关性和分类结论，其余为 None"""
+        相关结论, 分类结论 = [], []
+        for 项 in self.预测(新闻列表):
+            概率 = 项['relevance_prob']
+            if 概率 is not None and max(概率, 1 - 概率) >= self.最低置信度:
+                相关结论.append(项['is_hr_related'])
+            else:
+                相关结论.append(None)
+            有把握 = 项['category_prob'] is not None and 项['category_prob'] >= self.最低置信度
+            分类结论.append(项['hr_category'] if 有把握 else None)
+        return 相关结论, 分类结论
+
+
+def _加载训练数据(数据文件: List[str]) -> List[Dict]:
+    if not 数据文件:
+        return 按配置创建存储().加载新闻()
+    新闻列表 = []
+    for 路径 in 数据文件:
+        with open(路径, 'r', encoding='utf-8') as f:
+            新闻列表.extend(json.load(f))
+    return 新闻列表
+
+
+def 评估(新闻列表: List[Dict], 测试比例: float = 0.2, 最低置信度: float = 0.9, 种子: int = 0):
+    """按比例留出测试集，报告准确率、高置信覆盖率和分类速度"""
+    已标注 = [n for n in 新闻列表 if isinstance(n.get('is_hr_related'), bool)]
+    random.Random(种子).shuffle(已标注)
+    切分 = max(1, int(len(已标注) * 测试比例))
+    测试集, 训练集 = 已标注[:切分], 已标注[切分:]
+
+    分类器 = 本地分类器()
+    分类器.训练(训练集)
+
+    开始 = time.perf_counter()
+    预测 = 分类器.预测(测试集)
+    耗时 = time.perf_counter() - 开始
+
+    print(f"\n📊 评估结果（训练 {len(训练集)} 条，测试 {len(测试集)} 条）")
+    if 分类器.相关性权重 is not None:
+        正确 = [p['is_hr_related'] == n['is_hr_related'] for p, n in zip(预测, 测试集)]
+        有把握 = [i for i, p in enumerate(预测) if max(p['relevance_prob'], 1 - p['relevance_prob']) >= 最低置信度]
+        print(f"  相关性准确率: {sum(正确) / len(正确) * 100:.1f}%")
+        if 有把握:
+            print(f"  置信度≥{最低置信度}: 覆盖 {len(有把握) / len(测试集) * 100:.0f}%，"
+                  f"准确率 {sum(正确[i] for i in 有把握) / len(有把握) * 100:.1f}%")
+
+    if 分类器.分类权重 is not None:
+        行 = [i for i, n in enumerate(测试集) if n['is_hr_related'] and n.get('hr_category') in 分类器.分类列表]
+        if 行:
+            正确 = [预测[i]['hr_category'] == 测试集[i]['hr_category'] for i in 行]
+            有把握 = [j for j, i in enumerate(行) if 预测[i]['category_prob'] >= 最低置信度]
+            print(f"  HR分类准确率: {sum(正确) / len(正确) * 100:.1f}%")
+            if 有把握:
+                print(f"  置信度≥{最低置信度}: 覆盖 {len(有把握) / len(行) * 100:.0f}%，"
+                      f"准确率 {sum(正确[j] for j in 有把握) / len(有把握) * 100:.1f}%")
+
+    print(f"  分类速度: {len(测试集) / 耗时:.0f} 条/秒")
+
+
+def 主程序():
+    """命令行运行入口"""
+    解析器 = argparse.ArgumentParser(description="训练、评估本地新闻分类器或用它预测")
+    子命令 = 解析器.add_subparsers(dest='命令', required=True)
+
+    训练命令 = 子命令.add_parser('训练', help="用已标注新闻训练并保存模型")
+    训练命令.add_argument('--数据', nargs='*', default=[], help="JSON新闻文件，默认使用存储中的全部新闻")
+    训练命令.add_argument('--模型', default=默认模型路径)
+    训练命令.add_argument('--轮数', type=int, default=200)
+
+    评估命令 = 子命令.add_parser('评估', help="留出测试集评估准确率和速度")
+    评估命令.add_argument('--数据', nargs='*', default=[])
+    评估命令.add_argument('--测试比例', type=float, default=0.2)
+    评估命令.add_argument('--置信度', type=float, default=0.9)
+
+    预测命令 = 子命令.add_parser('预测', help="预测一条新闻")
+    预测命令.add_argument('标题')
+    预测命令.add_argument('--摘要', default='')
+    预测命令.add_argument('--模型', default=默认模型路径)
+
+    参数 = 解析器.parse_args()
+
+    if 参数.命令 == '训练':
+        分类器 = 本地分类器()
+        分类器.训练(_加载训练数据(参数.数据), 参数.轮数)
+        分类器.保存(参数.模型)
+    elif 参数.命令 == '评估':
+        评估(_加载训练数据(参数.数据), 参数.测试比例, 参数.置信度)
+    else:
+        结果 = 本地分类器.加载(参数.模型).预测([{'title': 参数.标题, 'abstract': 参数.摘要}])[0]
+        print(json.dumps(结果, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    主程序()
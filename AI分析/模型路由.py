@@ -0,0 +1,143 @@
+"""
+模型路由模块
+按分析步骤选择模型：初筛、关键词等量大而简单的任务交给快速模型（fast），
+本地规则和批量初筛都没有结论的疑难新闻、周报汇总交给强模型（strong）
+
+在标注样本上对比各路由的准确率和耗时：
+    python AI分析/模型路由.py 评估 --数据 数据/标注样本.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterable, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 步骤 → 路由名；未列出的步骤走 fast
+默认步骤路由 = {
+    '初筛': 'fast',
+    '关键词': 'fast',
+    '摘要': 'fast',
+    '分类': 'fast',
+    '结构化': 'fast',
+    # 只有级联、本地分类器和批量初筛都没有结论时才会单独判断相关性，本身就是疑难新闻
+    '判断': 'strong',
+    '周报': 'strong',
+}
+
+
+class 模型路由:
+    """路由名（fast / strong）→ 模型名；困难的新闻走 困难路由，不论步骤默认走哪条路由"""
+
+    def __init__(self, 模型表: Dict[str, str], 步骤路由: Optional[Dict[str, str]] = None,
+                 困难路由: Optional[str] = 'strong'):
+        self.模型表 = dict(模型表)
+        self.步骤路由 = {**默认步骤路由, **(步骤路由 or {})}
+        self.困难路由 = 困难路由
+
+    @classmethod
+    def 按配置创建(cls, ai配置: Dict) -> '模型路由':
+        """由配置文件的 ai_service.routing 段创建；没有配置 strong 模型时两条路由都是 zhipu.model"""
+        路由配置 = ai配置.get('routing') or {}
+        默认模型 = ai配置['zhipu']['model']
+        模型表 = {'fast': 默认模型, 'strong': 默认模型, **(路由配置.get('models') or {})}
+        return cls(模型表, 路由配置.get('steps'), 路由配置.get('escalate_hard', 'strong'))
+
+    def 路由(self, 步骤: str, 困难: bool = False) -> str:
+        if 困难 and self.困难路由:
+            return self.困难路由
+        return self.步骤路由.get(步骤, 'fast')
+
+    def 模型(self, 步骤: str, 困难: bool = False) -> str:
+        路由 = self.路由(步骤, 困难)
+        return self.模型表.get(路由, self.模型表['fast'])
+
+    def 固定(self, 路由: str) -> '模型路由':
+        """所有步骤都走同一条路由，评估时用于逐条路由对比"""
+        return 模型路由(self.模型表, {步骤: 路由 for 步骤 in self.步骤路由}, 困难路由=None)
+
+
+def 评估(样本: List[Dict], 配置文件路径: str = "配置文件.yaml",
+         路由列表: Iterable[str] = ('fast', 'strong', '路由')) -> List[Dict]:
+    """每条路由各用 批量分析 完整跑一遍样本（不使用缓存），对比相关性/分类准确率、耗时和token
+
+    fast / strong 表示所有步骤都用该路由的模型，'路由' 表示按配置的步骤路由混合使用；
+    样本的 is_hr_related / hr_category 为人工标注。
+    """
+    from AI分析.内容分类 import AI分析器
+    from AI分析.调用监控 import 调用监控, _百分位
+
+    结果列表 = []
+    for 路由名 in 路由列表:
+        分析器 = AI分析器(配置文件路径)
+        分析器.缓存 = None
+        分析器.监控 = 调用监控()
+        if 路由名 != '路由':
+            分析器.路由 = 分析器.路由.固定(路由名)
+
+        print(f"\n🔀 路由 {路由名}：分析 {len(样本)} 条标注样本...")
+        开始 = time.perf_counter()
+        预测 = 分析器.批量分析([dict(新闻) for 新闻 in 样本], 输出统计=False)
+        墙钟 = time.perf_counter() - 开始
+
+        相关正确 = sum(1 for 新闻, 结果 in zip(样本, 预测) if 结果['is_hr_related'] == 新闻['is_hr_related'])
+        分类样本 = [(新闻, 结果) for 新闻, 结果 in zip(样本, 预测) if 新闻['is_hr_related'] and 新闻.get('hr_category')]
+        分类正确 = sum(1 for 新闻, 结果 in 分类样本 if 结果['hr_category'] == 新闻['hr_category'])
+        汇总 = 分析器.监控.汇总()
+        耗时 = sorted(r['latency'] for r in 汇总['calls'] if not r['error'])
+        结果列表.append({
+            'route': 路由名,
+            'models': sorted({r['model'] for r in 汇总['calls']}),
+            'relevance_accuracy': 相关正确 / len(样本),
+            'category_accuracy': 分类正确 / len(分类样本) if 分类样本 else None,
+            'calls': 汇总['total']['calls'],
+            'latency_p50': _百分位(耗时, 50),
+            'latency_p90': _百分位(耗时, 90),
+            'wall_time': 墙钟,
+            'tokens': 汇总['total']['prompt_tokens'] + 汇总['total']['completion_tokens'],
+            'cost': 汇总['total']['cost'],
+        })
+
+    print(f"\n📊 标注样本 {len(样本)} 条")
+    print(f"{'路由':<8}{'模型':<28}{'相关准确率':>10}{'分类准确率':>10}{'调用':>6}{'p50(s)':>8}{'p90(s)':>8}{'总耗时(s)':>10}{'token':>8}")
+    for 行 in 结果列表:
+        分类 = f"{行['category_accuracy'] * 100:.1f}%" if 行['category_accuracy'] is not None else '-'
+        print(f"{行['route']:<8}{'/'.join(行['models']):<28}{行['relevance_accuracy'] * 100:>9.1f}%{分类:>10}"
+              f"{行['calls']:>6}{行['latency_p50']:>8.2f}{行['latency_p90']:>8.2f}{行['wall_time']:>10.1f}{行['tokens']:>8}")
+    return 结果列表
+
+
+def 主程序():
+    """命令行运行入口"""
+    解析器 = argparse.ArgumentParser(description="模型路由评估")
+    子命令 = 解析器.add_subparsers(dest='命令', required=True)
+    评估命令 = 子命令.add_parser('评估', help="在标注样本上对比 fast、strong 和按配置路由的准确率与耗时")
+    评估命令.add_argument('--数据', nargs='+', default=['数据/标注样本.json'],
+                      help="带人工标注 is_hr_related / hr_category 的JSON新闻文件")
+    评估命令.add_argument('--路由', nargs='+', default=['fast', 'strong', '路由'])
+    评估命令.add_argument('--导出', help="把对比结果写入JSON文件")
+    参数 = 解析器.parse_args()
+
+    样本 = []
+    for 路径 in 参数.数据:
+        if not os.path.exists(路径):
+            print(f"❌ 找不到标注样本 {路径}")
+            return
+        with open(路径, 'r', encoding='utf-8') as f:
+            样本.extend(n for n in json.load(f) if isinstance(n.get('is_hr_related'), bool))
+    if not 样本:
+        print("❌ 样本中没有带 is_hr_related 标注的新闻")
+        return
+
+    结果 = 评估(样本, 路由列表=参数.路由)
+    if 参数.导出:
+        with open(参数.导出, 'w', encoding='utf-8') as f:
+            json.dump(结果, f, ensure_ascii=False, indent=2)
+        print(f"✅ 对比结果已导出到 {参数.导出}")
+
+
+if __name__ == "__main__":
+    主程序()
@@ -0,0 +1,321 @@
+"""
+模拟模型服务模块
+本地启动一个兼容 chat/completions 协议的模拟服务（延迟分布、429/5xx错误率可配置，按规则生成回答），
+不需要真实的智谱服务和付费Key，即可对 AI分析器.批量分析 和周报生成做压测
+
+启动模拟服务（配置文件中 ai_service.zhipu.base_url 指向它即可联调）：
+    python AI分析/模拟服务.py 服务 --端口 8765 --延迟 0.8 --限流率 0.05
+在不同并发数下测试吞吐：
+    python AI分析/模拟服务.py 压测 --并发 1 2 4 8 16 --条数 200
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import math
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AI分析.关键词规则 import 关键词评分器, 分类规则
+from AI分析.提示词构建 import 估算token
+
+# 没有配置文件时使用 RSS爬虫 的分类规则作为HR分类
+默认hr分类 = [{'name': 名称, 'keywords': 关键词} for 名称, 关键词 in 分类规则.items()]
+
+
+class 模拟回答器:
+    """按提示词的特征识别分析步骤，用关键词规则生成格式正确的回答"""
+
+    def __init__(self, hr分类: Iterable[Dict] = ()):
+        self.hr分类 = list(hr分类) or 默认hr分类
+        self.评分器 = 关键词评分器(self.hr分类)
+
+    @staticmethod
+    def _提取(提示词: str, *标签: str) -> str:
+        for 标签名 in 标签:
+            匹配 = re.search(rf'^{标签名}：(.*)$', 提示词, re.M)
+            if 匹配:
+                return 匹配.group(1).strip()
+        return ''
+
+    def _相关(self, 标题: str, 摘要: str) -> bool:
+        return self.评分器.评分(标题, 摘要) > 0
+
+    def _分类(self, 标题: str, 摘要: str) -> str:
+        文本 = f"{标题} {摘要}".lower()
+        得分 = [(sum(1 for 词 in 分类.get('keywords', []) if 词.lower() in 文本), 分类['name'])
+                for 分类 in self.hr分类]
+        return max(得分, key=lambda x: x[0])[1]
+
+    def _关键词(self, 标题: str, 摘要: str) -> List[str]:
+        文本 = f"{标题} {摘要}".lower()
+        命中 = [词 for 词 in self.评分器.关键词 if 词 in 文本]
+        return (命中 or [标题[:4] or '新闻'])[:5]
+
+    def 回答(self, 提示词: str) -> str:
+        标题 = self._提取(提示词, '新闻标题', '标题')
+        摘要 = self._提取(提示词, '新闻摘要', '原始摘要', '摘要')
+
+        if '请逐条判断' in 提示词:
+            条目 = re.findall(r'^(\d+)\. 标题：(.*)\n\s*摘要：(.*)$', 提示词, re.M)
+            return json.dumps([{'编号': int(编号), '相关': self._相关(t, a)} for 编号, t, a in 条目],
+                              ensure_ascii=False)
+        if '"is_hr_related"' in 提示词:
+            相关 = self._相关(标题, 摘要)
+            结果 = {'is_hr_related': 相关, 'hr_category': self._分类(标题, 摘要) if 相关 else None,
+                    'keywords': self._关键词(标题, 摘要)}
+            if '"summary"' in 提示词:
+                结果['summary'] = f"{标题}。{摘要}"[:50]
+            return json.dumps(结果, ensure_ascii=False)
+        if '大事记' in 提示词:
+            return json.dumps({'summary': '本周HR动态平稳', 'top_events': [], 'trends': ['招聘', '薪酬', '组织调整'],
+                               'insight': '关注人才竞争'}, ensure_ascii=False)
+        if '是否与人力资源管理相关' in 提示词:
+            return '是' if self._相关(标题, 摘要) else '否'
+        if '可选分类' in 提示词:
+            return self._分类(标题, 摘要)
+        if '摘要' in 提示词 and '50字以内' in 提示词:
+            return f"{标题}。{摘要}"[:50]
+        if '关键词' in 提示词:
+            return ','.join(self._关键词(标题, 摘要))
+        return '好的'
+
+
+class 模拟服务:
+    """后台线程中运行的 chat/completions 模拟服务
+
+    延迟服从对数正态分布（中位数 延迟中位数 秒）；每个请求以 限流率 的概率返回429、
+    以 错误率 的概率返回500，其余按 模拟回答器 的规则返回回答和 usage。
+    模型延迟倍数 按请求中的 model 放大延迟，用于模拟模型路由中较慢的强模型。
+    """
+
+    def __init__(self, 端口: int = 0, 延迟中位数: float = 0.8, 延迟离散度: float = 0.5,
+                 错误率: float = 0.0, 限流率: float = 0.0, 重试等待秒数: Optional[float] = None,
+                 hr分类: Iterable[Dict] = (), 种子: Optional[int] = None,
+                 模型延迟倍数: Optional[Dict[str, float]] = None):
+        self.端口 = 端口
+        self.延迟中位数 = 延迟中位数
+        self.延迟离散度 = 延迟离散度
+        self.错误率 = 错误率
+        self.限流率 = 限流率
+        self.重试等待秒数 = 重试等待秒数
+        self.模型延迟倍数 = 模型延迟倍数 or {}
+        self.回答器 = 模拟回答器(hr分类)
+        self.请求数 = 0
+
+        self._随机 = random.Random(种子)
+        self._锁 = threading.Lock()
+        self._服务器: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def 基础地址(self) -> str:
+        return f"http://127.0.0.1:{self.端口}/api/paas/v4"
+
+    def _抽样(self):
+        """返回 (延迟秒数, 错误状态码或None)"""
+        with self._锁:
+            self.请求数 += 1
+            延迟 = self.延迟中位数 * math.exp(self._随机.gauss(0, self.延迟离散度)) if self.延迟中位数 else 0.0
+            骰子 = self._随机.random()
+        if 骰子 < self.限流率:
+            return 延迟 * 0.1, 429
+        if 骰子 < self.限流率 + self.错误率:
+            return 延迟, 500
+        return 延迟, None
+
+    def _处理(self, 请求体: Dict):
+        """返回 (状态码, 响应体, 额外响应头)"""
+        延迟, 错误 = self._抽样()
+        time.sleep(延迟 * self.模型延迟倍数.get(请求体.get('model'), 1.0))
+        if 错误 == 429:
+            头 = {'Retry-After': str(self.重试等待秒数)} if self.重试等待秒数 is not None else {}
+            return 429, {'error': {'code': '1302', 'message': '模拟限流：请求过于频繁'}}, 头
+        if 错误 == 500:
+            return 500, {'error': {'code': '500', 'message': '模拟服务端错误'}}, {}
+
+        提示词 = "\n".join(str(m.get('content', '')) for m in 请求体.get('messages', []))
+        回答 = self.回答器.回答(提示词)
+        提示token, 回答token = 估算token(提示词), 估算token(回答)
+        return 200, {
+            'id': uuid.uuid4().hex,
+            'created': int(time.time()),
+            'model': 请求体.get('model', ''),
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': 回答}}],
+            'usage': {'prompt_tokens': 提示token, 'completion_tokens': 回答token,
+                      'total_tokens': 提示token + 回答token},
+        }, {}
+
+    def 启动(self) -> str:
+        """在后台线程启动服务，返回可填入 base_url 的地址"""
+        服务 = self
+
+        class 处理器(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if not self.path.rstrip('/').endswith('/chat/completions'):
+                    self.send_error(404)
+                    return
+                长度 = int(self.headers.get('Content-Length') or 0)
+                try:
+                    请求体 = json.loads(self.rfile.read(长度) or b'{}')
+                except json.JSONDecodeError:
+                    self.send_error(400)
+                    return
+                状态码, 响应体, 头 = 服务._处理(请求体)
+                内容 = json.dumps(响应体, ensure_ascii=False).encode('utf-8')
+                self.send_response(状态码)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(内容)))
+                for 键, 值 in 头.items():
+                    self.send_header(键, 值)
+                self.end_headers()
+                self.wfile.write(内容)
+
+            def log_message(self, *参数):
+                pass
+
+        self._服务器 = ThreadingHTTPServer(('127.0.0.1', self.端口), 处理器)
+        self._服务器.daemon_threads = True
+        self.端口 = self._服务器.server_address[1]
+        threading.Thread(target=self._服务器.serve_forever, daemon=True).start()
+        return self.基础地址
+
+    def 停止(self):
+        if self._服务器:
+            self._服务器.shutdown()
+            self._服务器.server_close()
+            self._服务器 = None
+
+    def __enter__(self):
+        self.启动()
+        return self
+
+    def __exit__(self, *异常):
+        self.停止()
+
+
+def _压测配置(基础配置: Dict, 基础地址: str, 并发: int, 统计目录: str) -> Dict:
+    """在现有配置上改为连接模拟服务，关闭缓存（否则第二轮全部命中），调用统计写到临时目录"""
+    配置 = copy.deepcopy(基础配置)
+    配置.setdefault('hr_categories', 默认hr分类)
+    ai配置 = 配置.setdefault('ai_service', {})
+    ai配置['zhipu'] = {**(ai配置.get('zhipu') or {}), 'api_key': 'mock-key', 'base_url': 基础地址,
+                       'model': (ai配置.get('zhipu') or {}).get('model', 'glm-4-flash')}
+    ai配置['concurrency'] = {**(ai配置.get('concurrency') or {}), 'max_in_flight': 并发}
+    ai配置['cache'] = {'enabled': False}
+    ai配置['monitoring'] = {'enabled': True, 'export_dir': 统计目录}
+    return 配置
+
+
+def _合并百分位(记录: List[Dict], 百分比: float) -> float:
+    耗时 = sorted(r['latency'] for r in 记录 if not r['cache_hit'] and not r['error'])
+    if not 耗时:
+        return 0.0
+    return 耗时[min(len(耗时) - 1, int(len(耗时) * 百分比 / 100))]
+
+
+def 压测(并发级别: Iterable[int] = (1, 2, 4, 8), 条数: int = 100, 配置文件路径: str = "配置文件.yaml",
+         **模拟参数) -> List[Dict]:
+    """在每个并发级别下用合成新闻跑一遍 批量分析 和周报生成，返回并打印每级的吞吐和延迟"""
+    from AI分析.内容分类 import AI分析器
+    from AI分析.周报生成 import 周报生成器
+    from 数据存储.样例数据 import 合成新闻
+
+    基础配置 = {}
+    if os.path.exists(配置文件路径):
+        with open(配置文件路径, 'r', encoding='utf-8') as f:
+            基础配置 = yaml.safe_load(f) or {}
+
+    分析字段 = ('is_hr_related', 'hr_category', 'summary', 'keywords')
+    结果 = []
+    with 模拟服务(hr分类=基础配置.get('hr_categories') or (), 种子=0, **模拟参数) as 服务, \
+            tempfile.TemporaryDirectory() as 临时目录:
+        for 并发 in 并发级别:
+            配置路径 = os.path.join(临时目录, f'配置{并发}.yaml')
+            with open(配置路径, 'w', encoding='utf-8') as f:
+                yaml.safe_dump(_压测配置(基础配置, 服务.基础地址, 并发, 临时目录), f, allow_unicode=True)
+
+            新闻列表 = 合成新闻(条数, 种子=并发)
+            for 新闻 in 新闻列表:
+                for 字段 in 分析字段:
+                    新闻.pop(字段, None)
+
+            print(f"⏱️ 并发 {并发}：分析 {条数} 条新闻...")
+            with contextlib.redirect_stdout(io.StringIO()):
+                分析器 = AI分析器(配置路径)
+                开始 = time.perf_counter()
+                分析器.批量分析(新闻列表)
+                分析耗时 = time.perf_counter() - 开始
+                周报生成器(分析器.客户端, 监控=分析器.监控, 构建器=分析器.提示词构建器,
+                      模型=分析器.路由.模型('周报'))._ai生成总结(新闻列表[:20])
+
+            汇总 = 分析器.监控.汇总()
+            调用数 = 汇总['total']['calls']
+            重试数 = sum(s['retries'] for s in 汇总['steps'].values())
+            结果.append({
+                'concurrency': 并发,
+                'articles_per_min': round(条数 / 分析耗时 * 60, 1),
+                'calls': 调用数,
+                'p50': round(_合并百分位(汇总['calls'], 50), 3),
+                'p99': round(_合并百分位(汇总['calls'], 99), 3),
+                'retries': 重试数,
+                'retry_overhead': round(重试数 / 调用数, 3) if 调用数 else 0.0,
+                'weekly_latency': 汇总['steps'].get('周报', {}).get('latency_mean', 0.0),
+            })
+
+    print(f"\n{'并发':>4} {'条/分钟':>9} {'调用数':>6} {'p50(s)':>7} {'p99(s)':>7} {'重试':>5} {'重试占比':>8} {'周报(s)':>7}")
+    for 行 in 结果:
+        print(f"{行['concurrency']:>4} {行['articles_per_min']:>10} {行['calls']:>8} {行['p50']:>8} {行['p99']:>8}"
+              f" {行['retries']:>6} {行['retry_overhead'] * 100:>9.1f}% {行['weekly_latency']:>8.2f}")
+    return 结果
+
+
+def 主程序():
+    """命令行运行入口"""
+    解析器 = argparse.ArgumentParser(description="本地模拟模型服务和AI分析吞吐压测")
+    子命令 = 解析器.add_subparsers(dest='命令', required=True)
+
+    for 名称, 说明 in (('服务', "启动模拟服务，Ctrl+C 停止"), ('压测', "在不同并发数下压测 批量分析")):
+        命令 = 子命令.add_parser(名称, help=说明)
+        命令.add_argument('--延迟', type=float, default=0.8, help="延迟中位数（秒）")
+        命令.add_argument('--离散度', type=float, default=0.5, help="对数正态分布的sigma，越大长尾越明显")
+        命令.add_argument('--错误率', type=float, default=0.0, help="返回500的概率")
+        命令.add_argument('--限流率', type=float, default=0.0, help="返回429的概率")
+        命令.add_argument('--重试等待', type=float, default=None, help="429响应中的 Retry-After 秒数")
+    子命令.choices['服务'].add_argument('--端口', type=int, default=8765)
+    子命令.choices['压测'].add_argument('--并发', type=int, nargs='+', default=[1, 2, 4, 8])
+    子命令.choices['压测'].add_argument('--条数', type=int, default=100)
+
+    参数 = 解析器.parse_args()
+    模拟参数 = dict(延迟中位数=参数.延迟, 延迟离散度=参数.离散度, 错误率=参数.错误率,
+                    限流率=参数.限流率, 重试等待秒数=参数.重试等待)
+
+    if 参数.命令 == '服务':
+        服务 = 模拟服务(端口=参数.端口, **模拟参数)
+        print(f"🧪 模拟服务已启动：{服务.启动()}")
+        print("   在配置文件中设置 ai_service.zhipu.base_url 为该地址即可使用")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            服务.停止()
+    else:
+        压测(参数.并发, 参数.条数, **模拟参数)
+
+
+if __name__ == "__main__":
+    主程序()
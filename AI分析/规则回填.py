@@ -0,0 +1,169 @@
+"""
+规则回填模块
+修改关键词规则（AI分析/关键词规则.py 或配置文件的 hr_categories）后，用新规则重新分类全部历史新闻：
+按块分给多个进程并行，块内整批匹配（见 规则分类器.批量分类），只写回标签有变化的新闻，并输出变化汇总
+
+只重新分类规则得出的标签（label_source 为 rules）：AI分析得出的标签和没有 label_source、无法确定来源的
+旧数据默认保留，加 --包含AI结果 时一并重新分类；尚未分析过的新闻（没有 is_hr_related）不处理，留给AI分析。
+
+用法：
+    python AI分析/规则回填.py                          # 重新分类并写回
+    python AI分析/规则回填.py --试运行                  # 只输出变化汇总，不写回
+    python AI分析/规则回填.py --进程数 8 --块大小 20000 --包含AI结果
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AI分析.关键词规则 import 规则分类器
+from 数据存储.数据库操作 import 按配置创建存储, 读取配置
+from 数据存储.只读快照 import 按配置发布快照
+
+# 工作进程内的分类器，由 _初始化进程 创建
+_分类器: Optional[规则分类器] = None
+
+
+def _初始化进程(hr分类: List[Dict]):
+    global _分类器
+    _分类器 = 规则分类器(hr分类)
+
+
+def _分类块(块: Tuple[List[int], List[str], List[str], List[Tuple]]) -> List[Tuple[int, bool, Optional[str]]]:
+    """块为 (序号列表, 标题列表, 摘要列表, 旧标签列表)，只返回标签变化的 [(序号, 是否相关, HR分类)]"""
+    序号列表, 标题列表, 摘要列表, 旧标签列表 = 块
+    相关, 分类, _ = _分类器.批量分类(标题列表, 摘要列表)
+    return [(序号, bool(相关[i]), 分类[i])
+            for i, 序号 in enumerate(序号列表) if (bool(相关[i]), 分类[i]) != 旧标签列表[i]]
+
+
+def _标签(是否相关: bool, 分类: Optional[str]) -> str:
+    return (分类 or '其他') if 是否相关 else '不相关'
+
+
+def 回填(存储, hr分类: List[Dict], 进程数: Optional[int] = None, 块大小: int = 20000,
+         包含AI结果: bool = False, 试运行: bool = False) -> Dict:
+    """重新分类存储中的新闻并写回变化，返回汇总"""
+    开始 = time.perf_counter()
+    新闻列表 = 存储.加载新闻()
+    加载耗时 = time.perf_counter() - 开始
+
+    已分析 = [i for i, 新闻 in enumerate(新闻列表) if 'is_hr_related' in 新闻]
+    待分类 = [i for i in 已分析 if 包含AI结果 or 新闻列表[i].get('label_source') == 'rules']
+    跳过AI = len(已分析) - len(待分类)
+    未分析 = len(新闻列表) - len(已分析)
+
+    块列表 = []
+    for 起点 in range(0, len(待分类), 块大小):
+        序号列表 = 待分类[起点:起点 + 块大小]
+        新闻块 = [新闻列表[i] for i in 序号列表]
+        块列表.append((
+            序号列表,
+            [新闻.get('title') or '' for 新闻 in 新闻块],
+            # 与 RSS爬虫.判断HR相关 一致，abstract 和 summary 都参与匹配
+            [f"{新闻.get('abstract') or ''} {新闻.get('summary') or ''}" for 新闻 in 新闻块],
+            [(bool(新闻['is_hr_related']), 新闻.get('hr_category') if 新闻['is_hr_related'] else None)
+             for 新闻 in 新闻块],
+        ))
+
+    进程数 = 进程数 or os.cpu_count() or 1
+    进程数 = min(进程数, len(块列表)) or 1
+    print(f"🔁 用 {进程数} 个进程重新分类 {len(待分类)} 条新闻（{len(块列表)} 块）...")
+    开始 = time.perf_counter()
+    if 进程数 == 1:
+        _初始化进程(hr分类)
+        块结果 = [_分类块(块) for 块 in 块列表]
+    else:
+        with ProcessPoolExecutor(进程数, initializer=_初始化进程, initargs=(hr分类,)) as 执行器:
+            块结果 = list(执行器.map(_分类块, 块列表))
+    分类耗时 = time.perf_counter() - 开始
+
+    变化 = [行 for 结果 in 块结果 for 行 in 结果]
+    转移 = Counter()
+    示例 = defaultdict(list)
+    更新列表 = []
+    for 序号, 是否相关, 分类 in 变化:
+        新闻 = 新闻列表[序号]
+        键 = (_标签(新闻['is_hr_related'], 新闻.get('hr_category')), _标签(是否相关, 分类))
+        转移[键] += 1
+        if len(示例[键]) < 2:
+            示例[键].append(新闻.get('title') or '')
+
+        字段 = {'is_hr_related': 是否相关, 'hr_category': 分类, 'label_source': 'rules'}
+        # sqlite 按整行替换，其他存储按ID合并，只需写入变化的字段
+        更新列表.append({**新闻, **字段} if 存储.存储类型 == 'sqlite' else {'id': 新闻['id'], **字段})
+
+    写回耗时 = 0.0
+    if 更新列表 and not 试运行:
+        开始 = time.perf_counter()
+        存储.更新新闻(更新列表)
+        写回耗时 = time.perf_counter() - 开始
+
+    汇总 = {
+        'total': len(新闻列表),
+        'classified': len(待分类),
+        'skipped_ai': 跳过AI,
+        'skipped_unanalysed': 未分析,
+        'changed': len(变化),
+        'became_related': sum(n for (旧, 新), n in 转移.items() if 旧 == '不相关'),
+        'became_unrelated': sum(n for (旧, 新), n in 转移.items() if 新 == '不相关'),
+        'transitions': 转移,
+        'examples': 示例,
+        'load_seconds': 加载耗时,
+        'classify_seconds': 分类耗时,
+        'write_seconds': 写回耗时,
+    }
+    打印汇总(汇总, 试运行)
+    return 汇总
+
+
+def 打印汇总(汇总: Dict, 试运行: bool = False):
+    print(f"\n📊 共 {汇总['total']} 条新闻，重新分类 {汇总['classified']} 条"
+          f"（跳过AI或来源未知的标注 {汇总['skipped_ai']} 条、未分析 {汇总['skipped_unanalysed']} 条）")
+    速度 = 汇总['classified'] / 汇总['classify_seconds'] if 汇总['classify_seconds'] else 0
+    print(f"⚡ 加载 {汇总['load_seconds']:.1f}s，分类 {汇总['classify_seconds']:.1f}s（{速度:,.0f} 条/秒），"
+          f"写回 {汇总['write_seconds']:.1f}s")
+
+    if not 汇总['changed']:
+        print("✅ 没有标签发生变化")
+        return
+    print(f"\n🔀 标签变化 {汇总['changed']} 条：不相关→相关 {汇总['became_related']}，"
+          f"相关→不相关 {汇总['became_unrelated']}，"
+          f"分类变化 {汇总['changed'] - 汇总['became_related'] - 汇总['became_unrelated']}")
+    for (旧, 新), 数量 in 汇总['transitions'].most_common(10):
+        print(f"  {旧} → {新}: {数量}")
+        for 标题 in 汇总['examples'][(旧, 新)]:
+            print(f"      · {标题[:40]}")
+    if len(汇总['transitions']) > 10:
+        print(f"  ……其余 {len(汇总['transitions']) - 10} 种变化")
+    if 试运行:
+        print("\n🧪 试运行，未写回存储")
+    else:
+        print(f"\n💾 已写回 {汇总['changed']} 条新闻")
+
+
+def 主程序():
+    """命令行运行入口"""
+    解析器 = argparse.ArgumentParser(description="关键词规则修改后重新分类历史新闻")
+    解析器.add_argument('--进程数', type=int, help="默认为CPU核数")
+    解析器.add_argument('--块大小', type=int, default=20000, help="每个进程任务包含的新闻条数")
+    解析器.add_argument('--包含AI结果', action='store_true',
+                     help="AI分析得出的和没有 label_source 的旧标签也用规则重新分类")
+    解析器.add_argument('--试运行', action='store_true', help="只输出变化汇总，不写回存储")
+    参数 = 解析器.parse_args()
+
+    存储 = 按配置创建存储()
+    汇总 = 回填(存储, 读取配置().get('hr_categories') or [], 参数.进程数, 参数.块大小,
+              参数.包含AI结果, 参数.试运行)
+    if 汇总['changed'] and not 参数.试运行:
+        按配置发布快照(存储)
+
+
+if __name__ == "__main__":
+    主程序()
@@ -0,0 +1,189 @@
+"""
+调用监控模块
+按步骤（初筛、判断、分类、摘要、关键词、结构化、周报）记录每次模型调用的耗时、提示词/回答token数、
+重试次数和缓存命中，运行结束时打印汇总并导出JSON，用于调整提示词和并发参数
+
+查看最近一次运行的统计：
+    python AI分析/调用监控.py
+    python AI分析/调用监控.py 数据/调用统计/20250101-080000.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+def 令牌用量(响应) -> Tuple[int, int]:
+    """从 chat.completions 响应的 usage 中取 (提示词token, 回答token)，没有时返回 (0, 0)"""
+    用量 = getattr(响应, 'usage', None)
+    return (getattr(用量, 'prompt_tokens', 0) or 0, getattr(用量, 'completion_tokens', 0) or 0)
+
+
+def _百分位(有序值: List[float], 百分比: float) -> float:
+    """线性插值百分位数"""
+    if not 有序值:
+        return 0.0
+    位置 = (len(有序值) - 1) * 百分比 / 100
+    下, 上 = int(位置), min(int(位置) + 1, len(有序值) - 1)
+    return 有序值[下] + (有序值[上] - 有序值[下]) * (位置 - 下)
+
+
+class 调用监控:
+    """线程安全的调用记录器，一次运行一个实例"""
+
+    def __init__(self, 导出目录: str = "数据/调用统计", 每千token价格: Optional[Dict[str, float]] = None):
+        self.导出目录 = 导出目录
+        self.每千token价格 = 每千token价格 or {}
+        self.开始时间 = datetime.now()
+        self._记录: List[Dict] = []
+        self._锁 = threading.Lock()
+
+    @classmethod
+    def 按配置创建(cls, ai配置: dict) -> Optional['调用监控']:
+        """由配置文件的 ai_service.monitoring 段创建，enabled 为 false 时返回 None"""
+        监控配置 = ai配置.get('monitoring') or {}
+        if not 监控配置.get('enabled', True):
+            return None
+        return cls(
+            监控配置.get('export_dir', '数据/调用统计'),
+            每千token价格=监控配置.get('price_per_1k_tokens'),
+        )
+
+    def 记录(self, 步骤: str, 模型: str, 耗时: float, 提示token: int = 0, 回答token: int = 0,
+             重试次数: int = 0, 缓存命中: bool = False, 出错: bool = False, 估算提示token: int = 0):
+        """耗时为整次调用的墙钟时间（含限速等待和重试退避）；估算提示token 为发送前本地估算的提示词token数"""
+        with self._锁:
+            self._记录.append({
+                'step': 步骤, 'model': 模型, 'latency': round(耗时, 4),
+                'prompt_tokens': 提示token, 'completion_tokens': 回答token,
+                'prompt_tokens_estimated': 估算提示token,
+                'retries': 重试次数, 'cache_hit': 缓存命中, 'error': 出错,
+            })
+
+    def 记录响应(self, 步骤: str, 模型: str, 开始: float, 响应, 重试次数: int = 0, 估算提示token: int = 0):
+        """记录一次成功的API调用，开始 为 time.perf_counter() 的取值"""
+        self.记录(步骤, 模型, time.perf_counter() - 开始, *令牌用量(响应), 重试次数=重试次数,
+                估算提示token=估算提示token)
+
+    def 调用次数(self) -> int:
+        """实际发出的API调用次数（不含缓存命中）"""
+        with self._锁:
+            return sum(1 for r in self._记录 if not r['cache_hit'])
+
+    def 汇总(self) -> Dict:
+        with self._锁:
+            记录 = list(self._记录)
+
+        各步骤 = {}
+        for 步骤 in dict.fromkeys(r['step'] for r in 记录):
+            本步 = [r for r in 记录 if r['step'] == 步骤]
+            调用 = [r for r in 本步 if not r['cache_hit']]
+            耗时 = sorted(r['latency'] for r in 调用 if not r['error'])
+            提示 = sum(r['prompt_tokens'] for r in 调用)
+            回答 = sum(r['completion_tokens'] for r in 调用)
+            # 同时有估算值和实际值的调用，实际/估算 的比值用于校准 提示词构建.估算token
+            可比 = [r for r in 调用 if r.get('prompt_tokens_estimated') and r['prompt_tokens']]
+            估算 = sum(r['prompt_tokens_estimated'] for r in 可比)
+            费用 = sum((r['prompt_tokens'] + r['completion_tokens']) / 1000 * self.每千token价格.get(r['model'], 0)
+                       for r in 调用)
+            各步骤[步骤] = {
+                'calls': len(调用),
+                'cache_hits': len(本步) - len(调用),
+                'errors': sum(1 for r in 调用 if r['error']),
+                'retries': sum(r['retries'] for r in 调用),
+                'latency_mean': round(sum(耗时) / len(耗时), 4) if 耗时 else 0.0,
+                'latency_p50': round(_百分位(耗时, 50), 4),
+                'latency_p90': round(_百分位(耗时, 90), 4),
+                'latency_p99': round(_百分位(耗时, 99), 4),
+                'latency_max': 耗时[-1] if 耗时 else 0.0,
+                'prompt_tokens': 提示,
+                'completion_tokens': 回答,
+                'prompt_tokens_mean': round(提示 / len(调用), 1) if 调用 else 0.0,
+                'prompt_tokens_estimated': sum(r.get('prompt_tokens_estimated', 0) for r in 调用),
+                'estimate_ratio': round(sum(r['prompt_tokens'] for r in 可比) / 估算, 3) if 估算 else None,
+                'cost': round(费用, 6),
+            }
+
+        # 按模型汇总，用于比较模型路由中 fast / strong 两条路由的耗时和用量
+        各模型 = {}
+        for 模型 in dict.fromkeys(r['model'] for r in 记录 if not r['cache_hit']):
+            调用 = [r for r in 记录 if r['model'] == 模型 and not r['cache_hit']]
+            耗时 = sorted(r['latency'] for r in 调用 if not r['error'])
+            各模型[模型] = {
+                'calls': len(调用),
+                'steps': sorted({r['step'] for r in 调用}),
+                'latency_p50': round(_百分位(耗时, 50), 4),
+                'latency_p90': round(_百分位(耗时, 90), 4),
+                'prompt_tokens': sum(r['prompt_tokens'] for r in 调用),
+                'completion_tokens': sum(r['completion_tokens'] for r in 调用),
+            }
+
+        return {
+            'started_at': self.开始时间.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'steps': 各步骤,
+            'models': 各模型,
+            'total': {
+                'calls': sum(s['calls'] for s in 各步骤.values()),
+                'cache_hits': sum(s['cache_hits'] for s in 各步骤.values()),
+                'prompt_tokens': sum(s['prompt_tokens'] for s in 各步骤.values()),
+                'completion_tokens': sum(s['completion_tokens'] for s in 各步骤.values()),
+                'cost': round(sum(s['cost'] for s in 各步骤.values()), 6),
+            },
+            'calls': 记录,
+        }
+
+    def 打印汇总(self):
+        打印统计(self.汇总())
+
+    def 导出(self) -> Optional[str]:
+        """把本次运行的汇总和逐次记录写入 导出目录/<开始时间>.json，没有记录时不导出"""
+        if not self._记录:
+            return None
+        os.makedirs(self.导出目录, exist_ok=True)
+        路径 = os.path.join(self.导出目录, self.开始时间.strftime('%Y%m%d-%H%M%S') + '.json')
+        with open(路径, 'w', encoding='utf-8') as f:
+            json.dump(self.汇总(), f, ensure_ascii=False, indent=2)
+        print(f"📈 调用统计已导出到 {路径}")
+        return 路径
+
+
+def 打印统计(汇总: Dict):
+    print(f"\n📈 模型调用统计（{汇总['started_at']} 起）")
+    for 步骤, 值 in 汇总['steps'].items():
+        print(f"  {步骤}: 调用 {值['calls']} 次，缓存命中 {值['cache_hits']}，重试 {值['retries']}，出错 {值['errors']}"
+              f" | 耗时 p50 {值['latency_p50']:.2f}s p90 {值['latency_p90']:.2f}s p99 {值['latency_p99']:.2f}s"
+              f" | token 提示 {值['prompt_tokens']}（平均 {值['prompt_tokens_mean']:.0f}）回答 {值['completion_tokens']}"
+              + (f" | 实际/估算 {值['estimate_ratio']:.2f}" if 值.get('estimate_ratio') else ''))
+    if len(汇总.get('models') or {}) > 1:
+        for 模型, 值 in 汇总['models'].items():
+            print(f"  模型 {模型}（{'、'.join(值['steps'])}）: 调用 {值['calls']} 次"
+                  f" | 耗时 p50 {值['latency_p50']:.2f}s p90 {值['latency_p90']:.2f}s"
+                  f" | token {值['prompt_tokens'] + 值['completion_tokens']}")
+    总计 = 汇总['total']
+    print(f"  合计: 调用 {总计['calls']} 次，token {总计['prompt_tokens'] + 总计['completion_tokens']}，"
+          f"费用约 {总计['cost']:.4f} 元")
+
+
+def 主程序():
+    """命令行运行入口"""
+    解析器 = argparse.ArgumentParser(description="查看导出的模型调用统计")
+    解析器.add_argument('文件', nargs='?', help="统计文件，默认为导出目录中最新的一个")
+    解析器.add_argument('--目录', default="数据/调用统计")
+    参数 = 解析器.parse_args()
+
+    路径 = 参数.文件 or max(glob.glob(os.path.join(参数.目录, '*.json')), default=None)
+    if not 路径:
+        print(f"{参数.目录} 中还没有调用统计")
+        return
+    with open(路径, 'r', encoding='utf-8') as f:
+        打印统计(json.load(f))
+
+
+if __name__ == "__main__":
+    主程序()
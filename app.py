@@ -3,12 +3,15 @@
 """
 
 import streamlit as st
-import json
 import pandas as pd
 from datetime import datetime, timedelta
 from collections import Counter
 import os
 
+from 数据存储.数据库操作 import 按配置创建存储
+from 数据存储.紧凑记录 import 压缩新闻列表
+from 数据存储.只读快照 import 只读快照, 快照路径
+
 # 导入用户认证模块
 try:
     from 用户认证 import 用户管理
@@ -253,15 +256,31 @@ def 管理员后台():
             st.info("暂无访问记录")
 
 
-@st.cache_data(ttl=600)
 def 加载数据():
-    """加载新闻数据"""
-    try:
-        with open('数据/新闻数据.json', 'r', encoding='utf-8') as f:
-            数据 = json.load(f)
-        return [n for n in 数据 if n.get('is_hr_related', False)]
-    except FileNotFoundError:
-        return []
+    """加载HR相关新闻：优先使用爬虫发布的只读快照（mmap，各进程共享页缓存），没有快照时从存储加载"""
+    路径 = 快照路径()
+    if 路径 and os.path.exists(路径):
+        return _打开快照(路径, os.stat(路径).st_mtime_ns).子集(仅hr相关=True)
+    return _从存储加载数据()
+
+
+@st.cache_resource(max_entries=2)
+def _打开快照(路径: str, 修改时间: int):
+    """每个进程只映射一次；快照被替换后修改时间变化，下次加载时打开新文件"""
+    return 只读快照(路径)
+
+
+@st.cache_data(ttl=600)
+def _从存储加载数据():
+    """从存储加载新闻数据（紧凑记录，每个会话持有一份副本时内存约减半）"""
+    数据 = 按配置创建存储().加载新闻()
+    return 压缩新闻列表(n for n in 数据 if n.get('is_hr_related', False))
+
+
+@st.cache_data(ttl=600)
+def 加载统计汇总():
+    """读取 (日期, 公司, HR分类) → 新闻数 的汇总，顶部统计卡片由它计算"""
+    return 按配置创建存储().统计计数(('crawl_day', 'company', 'hr_category'), 仅hr相关=True)
 
 
 def 渲染侧边栏筛选():
@@ -314,19 +333,21 @@ def 渲染新闻内容():
     新闻列表 = st.session_state.get('新闻列表', [])
 
     if 新闻列表:
+        汇总 = 加载统计汇总()
+        近7天起始 = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
+
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
             st.markdown(f"""
             <div class="stat-card">
                 <div class="stat-label">总新闻数</div>
-                <div class="stat-number">{len(新闻列表)}</div>
+                <div class="stat-number">{sum(汇总.values())}</div>
             </div>
             """, unsafe_allow_html=True)
 
         with col2:
-            最近7天 = sum(1 for n in 新闻列表
-                         if (datetime.now() - datetime.fromisoformat(n['crawl_time'])).days <= 7)
+            最近7天 = sum(数量 for (日期, _, _), 数量 in 汇总.items() if 日期 >= 近7天起始)
             st.markdown(f"""
             <div class="stat-card">
                 <div class="stat-label">近7天新增</div>
@@ -335,7 +356,7 @@ def 渲染新闻内容():
             """, unsafe_allow_html=True)
 
         with col3:
-            公司数 = len(set(n['company'] for n in 新闻列表))
+            公司数 = len({公司 for (_, 公司, _) in 汇总})
             st.markdown(f"""
             <div class="stat-card">
                 <div class="stat-label">监控公司</div>
@@ -344,7 +365,7 @@ def 渲染新闻内容():
             """, unsafe_allow_html=True)
 
         with col4:
-            分类数 = len(set(n.get('hr_category', '未分类') for n in 新闻列表))
+            分类数 = len({分类 for (_, _, 分类) in 汇总})
             st.markdown(f"""
             <div class="stat-card">
                 <div class="stat-label">HR分类</div>
@@ -4,12 +4,16 @@
 """
 
 import streamlit as st
-import json
 import pandas as pd
 from datetime import datetime, timedelta
 from collections import Counter
+import os
 import yaml
 
+from 数据存储.数据库操作 import 按配置创建存储
+from 数据存储.紧凑记录 import 压缩新闻列表
+from 数据存储.只读快照 import 只读快照, 快照路径
+
 
 # 页面配置
 st.set_page_config(
@@ -100,15 +104,45 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-@st.cache_data(ttl=600)  # 缓存10分钟
 def 加载数据():
-    """加载新闻数据"""
-    try:
-        with open('数据/新闻数据.json', 'r', encoding='utf-8') as f:
-            数据 = json.load(f)
-        return [n for n in 数据 if n.get('is_hr_related', False)]
-    except FileNotFoundError:
-        return []
+    """加载HR相关新闻：优先使用爬虫发布的只读快照（mmap，各进程共享页缓存），没有快照时从存储加载"""
+    路径 = 快照路径()
+    if 路径 and os.path.exists(路径):
+        return _打开快照(路径, os.stat(路径).st_mtime_ns).子集(仅hr相关=True)
+    return _从存储加载数据()
+
+
+@st.cache_resource(max_entries=2)
+def _打开快照(路径: str, 修改时间: int):
+    """每个进程只映射一次；快照被替换后修改时间变化，下次加载时打开新文件"""
+    return 只读快照(路径)
+
+
+@st.cache_data(ttl=600)  # 缓存10分钟
+def _从存储加载数据():
+    """从存储加载新闻数据（紧凑记录，每个会话持有一份副本时内存约减半）"""
+    数据 = 按配置创建存储().加载新闻()
+    return 压缩新闻列表(n for n in 数据 if n.get('is_hr_related', False))
+
+
+@st.cache_data(ttl=600)
+def 加载统计汇总():
+    """读取 (日期, 公司, HR分类) → 新闻数 的汇总，统计卡片和图表都由它计算"""
+    return 按配置创建存储().统计计数(('crawl_day', 'company', 'hr_category'), 仅hr相关=True)
+
+
+@st.cache_data(ttl=600)
+def 加载热门关键词(公司: str, 时间范围: str):
+    """按公司和时间范围统计热门关键词（SQLite存储走倒排表索引）"""
+    天数 = {'最近7天': 7, '最近30天': 30}.get(时间范围)
+    开始日期 = (datetime.now() - timedelta(days=天数)).strftime('%Y-%m-%d') if 天数 else None
+
+    return 按配置创建存储().关键词统计(
+        数量=15,
+        公司=None if 公司 == '全部' else 公司,
+        开始日期=开始日期,
+        仅hr相关=True
+    )
 
 
 @st.cache_data
@@ -129,19 +163,21 @@ def 渲染顶部统计():
         st.warning("暂无数据，请先运行数据抓取脚本")
         return
 
+    汇总 = 加载统计汇总()
+    近7天起始 = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
+
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
         st.markdown(f"""
         <div class="stat-card">
             <div class="stat-label">总新闻数</div>
-            <div class="stat-number">{len(新闻列表)}</div>
+            <div class="stat-number">{sum(汇总.values())}</div>
         </div>
         """, unsafe_allow_html=True)
 
     with col2:
-        最近7天 = sum(1 for n in 新闻列表
-                     if (datetime.now() - datetime.fromisoformat(n['crawl_time'])).days <= 7)
+        最近7天 = sum(数量 for (日期, _, _), 数量 in 汇总.items() if 日期 >= 近7天起始)
         st.markdown(f"""
         <div class="stat-card">
             <div class="stat-label">近7天新增</div>
@@ -150,7 +186,7 @@ def 渲染顶部统计():
         """, unsafe_allow_html=True)
 
     with col3:
-        公司数 = len(set(n['company'] for n in 新闻列表))
+        公司数 = len({公司 for (_, 公司, _) in 汇总})
         st.markdown(f"""
         <div class="stat-card">
             <div class="stat-label">监控公司</div>
@@ -159,7 +195,7 @@ def 渲染顶部统计():
         """, unsafe_allow_html=True)
 
     with col4:
-        分类数 = len(set(n.get('hr_category', '未分类') for n in 新闻列表))
+        分类数 = len({分类 for (_, _, 分类) in 汇总})
         st.markdown(f"""
         <div class="stat-card">
             <div class="stat-label">HR分类</div>
@@ -344,18 +380,24 @@ def 渲染统计分析页面():
         st.warning("暂无数据")
         return
 
+    汇总 = 加载统计汇总()
+
     col1, col2 = st.columns(2)
 
     with col1:
         st.markdown("### 📈 各公司新闻数量")
-        公司统计 = Counter(n['company'] for n in 新闻列表)
+        公司统计 = Counter()
+        for (_, 公司, _), 数量 in 汇总.items():
+            公司统计[公司] += 数量
         df_公司 = pd.DataFrame(list(公司统计.items()), columns=['公司', '数量'])
         df_公司 = df_公司.sort_values('数量', ascending=False)
         st.bar_chart(df_公司.set_index('公司'))
 
     with col2:
         st.markdown("### 📋 HR模块分布")
-        分类统计 = Counter(n.get('hr_category', '未分类') for n in 新闻列表)
+        分类统计 = Counter()
+        for (_, _, 分类), 数量 in 汇总.items():
+            分类统计[分类 or '未分类'] += 数量
         df_分类 = pd.DataFrame(list(分类统计.items()), columns=['分类', '数量'])
         df_分类 = df_分类.sort_values('数量', ascending=False)
         st.bar_chart(df_分类.set_index('分类'))
@@ -363,18 +405,30 @@ def 渲染统计分析页面():
     # 趋势分析
     st.markdown("### 📅 时间趋势")
     日期统计 = Counter()
-    for 新闻 in 新闻列表:
-        try:
-            日期 = datetime.fromisoformat(新闻['crawl_time']).date()
-            日期统计[日期] += 1
-        except:
-            pass
+    for (日期, _, _), 数量 in 汇总.items():
+        if 日期:
+            日期统计[日期] += 数量
 
     if 日期统计:
         df_趋势 = pd.DataFrame(list(日期统计.items()), columns=['日期', '数量'])
         df_趋势 = df_趋势.sort_values('日期')
         st.line_chart(df_趋势.set_index('日期'))
 
+    # 热门关键词
+    st.markdown("### 🏷️ 热门关键词")
+    col1, col2 = st.columns(2)
+    with col1:
+        关键词公司 = st.selectbox("公司", ['全部'] + sorted(set(n['company'] for n in 新闻列表)), key='关键词公司')
+    with col2:
+        关键词时间 = st.selectbox("时间范围", ['最近7天', '最近30天', '全部'], key='关键词时间')
+
+    热门关键词 = 加载热门关键词(关键词公司, 关键词时间)
+    if 热门关键词:
+        df_关键词 = pd.DataFrame(热门关键词, columns=['关键词', '数量'])
+        st.bar_chart(df_关键词.set_index('关键词'))
+    else:
+        st.info("暂无关键词数据")
+
 
 def 主函数():
     """主函数"""
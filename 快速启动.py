@@ -84,6 +84,26 @@ def 运行ai分析():
         return False
 
 
+def 运行流式管道():
+    """抓取和AI分析在同一进程内流式进行，文章抓到即分析入库"""
+    print("\n🌊 开始流式抓取和分析...")
+    try:
+        result = subprocess.run(
+            [sys.executable, '流式管道.py'],
+            capture_output=True,
+            text=True,
+            encoding='utf-8'
+        )
+        print(result.stdout)
+        if result.returncode != 0:
+            print(f"❌ 流式管道出错: {result.stderr}")
+            return False
+        return True
+    except Exception as e:
+        print(f"❌ 运行流式管道失败: {e}")
+        return False
+
+
 def 启动web界面():
     """启动Streamlit Web界面"""
     print("\n🌐 启动Web界面...")
@@ -110,10 +130,11 @@ def 主菜单():
     print("2. 仅抓取新闻")
     print("3. 仅AI分析")
     print("4. 仅启动Web界面")
-    print("5. 退出")
+    print("5. 流式运行（抓取与分析同时进行，文章抓到即入库）")
+    print("6. 退出")
     print()
 
-    选择 = input("请输入选项 (1-5): ").strip()
+    选择 = input("请输入选项 (1-6): ").strip()
     return 选择
 
 
@@ -150,6 +171,10 @@ def 主程序():
             break
 
         elif 选择 == '5':
+            # 流式抓取和分析
+            运行流式管道()
+
+        elif 选择 == '6':
             print("\n👋 再见！")
             break
 
@@ -0,0 +1,304 @@
+"""
+分区存储模块
+按抓取月份把新闻拆分到多个文件：当月为活跃分区接收写入，往月自动冻结（可选gzip压缩），
+清单记录每个分区的时间范围和按 (日期, 公司, HR分类, 来源, 是否相关) 汇总的新闻数：
+按时间窗口查询时只打开涉及的分区，统计计数只读清单
+
+目录结构：
+    数据/分区/清单.json        分区清单（同时作为整个目录的写锁）
+    数据/分区/ID索引.tsv       只追加的 "新闻ID<TAB>月份" 索引，用于跨分区去重
+    数据/分区/2026-02.json     活跃分区
+    数据/分区/2026-01.json.gz  冻结分区
+
+分区文件的序列化格式由 格式 参数决定（见 编解码.py），清单始终为可读的JSON。
+"""
+
+import gzip
+import os
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from 数据存储.文件锁 import 存储协调器, 原子写入
+from 数据存储.编解码 import 编码, 解码, 获取编解码器
+
+
+def 在时间窗口内(时间: str, 开始时间: Optional[str], 结束时间: Optional[str]) -> bool:
+    """按前缀比较ISO时间，使 结束时间=2026-02-10 包含当天全部时刻"""
+    if 开始时间 and 时间[:len(开始时间)] < 开始时间:
+        return False
+    if 结束时间 and 时间[:len(结束时间)] > 结束时间:
+        return False
+    return True
+
+
+class 分区存储:
+    """按月分区、保留全部历史的新闻存储"""
+
+    def __init__(self, 目录: str = "数据/分区", 旧数据路径: Optional[str] = "数据/新闻数据.json",
+                 压缩冻结分区: bool = True, 格式: str = 'json'):
+        获取编解码器(格式)  # 尽早报告不可用的格式
+        self.目录 = 目录
+        self.清单路径 = os.path.join(目录, '清单.json')
+        self.索引路径 = os.path.join(目录, 'ID索引.tsv')
+        self.协调器 = 存储协调器(self.清单路径)
+        self.压缩冻结分区 = 压缩冻结分区
+        self.格式 = 格式
+
+        # 首次使用时把单文件JSON数据导入分区
+        if 旧数据路径 and not os.path.exists(self.清单路径) and os.path.exists(旧数据路径):
+            self._导入旧数据(旧数据路径)
+
+    def 保存新闻(self, 新闻列表: List[Dict]) -> int:
+        """追加新闻（已存在的ID跳过），返回新增数量"""
+        with self.协调器.写锁():
+            return self._保存(新闻列表)
+
+    def 更新新闻(self, 新闻列表: List[Dict]):
+        """按ID更新已有新闻，不存在的新闻直接追加"""
+        with self.协调器.写锁():
+            清单 = self._读取清单()
+            索引 = self._读取ID索引()
+
+            按月 = defaultdict(list)
+            新增 = []
+            for 新闻 in 新闻列表:
+                if 新闻['id'] in 索引:
+                    按月[索引[新闻['id']]].append(新闻)
+                else:
+                    新增.append(新闻)
+
+            for 月份, 更新列表 in 按月.items():
+                信息 = 清单['partitions'].get(月份)
+                现有 = self._读取分区(信息)
+                位置 = {n['id']: i for i, n in enumerate(现有)}
+                for 新闻 in 更新列表:
+                    if 新闻['id'] in 位置:
+                        现有[位置[新闻['id']]].update(新闻)
+                    else:
+                        现有.append(新闻)
+                清单['partitions'][月份] = self._写入分区(月份, 现有, 冻结=bool(信息 and 信息['frozen']))
+
+            self.协调器.锁内写入(清单)
+            self._删除旧文件(清单, 按月)
+
+            if 新增:
+                self._保存(新增)
+
+    def 加载新闻(self, 开始时间: Optional[str] = None, 结束时间: Optional[str] = None) -> List[Dict]:
+        """加载时间窗口内的新闻（按抓取时间倒序）
+
+        时间为ISO格式前缀（如 2026-02 或 2026-02-10），闭区间；只读取与窗口有交集的分区。
+        """
+        结果 = []
+        with self.协调器.读锁():
+            清单 = self._读取清单()
+            for 月份, 信息 in sorted(清单['partitions'].items(), reverse=True):
+                if not self._区间相交(信息, 开始时间, 结束时间):
+                    continue
+                for 新闻 in self._读取分区(信息):
+                    if 在时间窗口内(新闻.get('crawl_time') or '', 开始时间, 结束时间):
+                        结果.append(新闻)
+
+        结果.sort(key=lambda x: x.get('crawl_time') or '', reverse=True)
+        return 结果
+
+    def 已存储ID(self) -> set:
+        """从ID索引读取全部已存储的新闻ID，不需要解码分区文件"""
+        with self.协调器.读锁():
+            return set(self._读取ID索引())
+
+    def 统计计数(self, 维度列表: Tuple[str, ...], 公司: Optional[str] = None, 分类: Optional[str] = None,
+                来源: Optional[str] = None, 开始时间: Optional[str] = None, 结束时间: Optional[str] = None,
+                仅hr相关: bool = False) -> Counter:
+        """由清单中各分区的汇总计数按维度求和，不读取分区文件；维度取 crawl_day / company / hr_category / source"""
+        with self.协调器.读锁():
+            分区 = self._读取清单()['partitions']
+        if any('counts' not in 信息 for 信息 in 分区.values()):
+            分区 = self._补充计数()
+
+        位置 = [self._计数字段.index(名称) for 名称 in 维度列表]
+        结果 = Counter()
+        for 信息 in 分区.values():
+            if not self._区间相交(信息, 开始时间, 结束时间):
+                continue
+            for 行 in 信息['counts']:
+                日期, 行公司, 行分类, 行来源, 是否相关, 数量 = 行
+                if ((公司 and 行公司 != 公司) or (分类 and 行分类 != 分类) or (来源 and 行来源 != 来源)
+                        or (仅hr相关 and not 是否相关) or not 在时间窗口内(日期, 开始时间, 结束时间)):
+                    continue
+                结果[tuple(行[i] for i in 位置)] += 数量
+        return 结果
+
+    def 冻结旧分区(self, 保留活跃月数: int = 1) -> List[str]:
+        """把早于最近N个月的活跃分区转为冻结分区，返回本次冻结的月份"""
+        with self.协调器.写锁():
+            return self._冻结(保留活跃月数)
+
+    def 分区概况(self) -> Dict:
+        """返回清单中各分区的信息"""
+        with self.协调器.读锁():
+            return self._读取清单()['partitions']
+
+    def _保存(self, 新闻列表: List[Dict]) -> int:
+        """调用方需持有写锁"""
+        清单 = self._读取清单()
+        索引 = self._读取ID索引()
+
+        按月 = defaultdict(list)
+        新增条目 = []
+        for 新闻 in 新闻列表:
+            if 新闻['id'] in 索引:
+                continue
+            月份 = self._月份(新闻)
+            索引[新闻['id']] = 月份
+            按月[月份].append(新闻)
+            新增条目.append((新闻['id'], 月份))
+
+        for 月份, 新增列表 in 按月.items():
+            # 往冻结分区写入（如导入历史数据）会把它重新激活，之后由 _冻结 再次冻结
+            现有 = self._读取分区(清单['partitions'].get(月份))
+            # 上次在写入清单后、追加ID索引前中断时，分区里已有这些新闻
+            已在分区 = {n['id'] for n in 现有}
+            清单['partitions'][月份] = self._写入分区(
+                月份, 现有 + [n for n in 新增列表 if n['id'] not in 已在分区], 冻结=False)
+
+        # 先写清单再追加ID索引：中断时索引不会记录清单中没有的新闻
+        self.协调器.锁内写入(清单)
+        self._删除旧文件(清单, 按月)
+        if 新增条目:
+            self._追加ID索引(新增条目)
+        self._冻结(保留活跃月数=1)
+
+        return len(新增条目)
+
+    def _冻结(self, 保留活跃月数: int) -> List[str]:
+        清单 = self._读取清单()
+        现在 = datetime.now()
+        月序号 = 现在.year * 12 + 现在.month - 1 - (保留活跃月数 - 1)
+        截止月份 = f"{月序号 // 12:04d}-{月序号 % 12 + 1:02d}"
+
+        冻结月份 = []
+        for 月份, 信息 in sorted(清单['partitions'].items()):
+            if 月份 < 截止月份 and not 信息['frozen']:
+                清单['partitions'][月份] = self._写入分区(月份, self._读取分区(信息), 冻结=True)
+                冻结月份.append(月份)
+
+        if 冻结月份:
+            self.协调器.锁内写入(清单)
+            self._删除旧文件(清单, 冻结月份)
+            print(f"🧊 已冻结分区: {', '.join(冻结月份)}")
+
+        return 冻结月份
+
+    def _补充计数(self) -> Dict:
+        """旧清单升级：为没有汇总计数的分区读取一次分区文件补上，返回更新后的分区信息"""
+        with self.协调器.写锁():
+            清单 = self._读取清单()
+            for 信息 in 清单['partitions'].values():
+                if 'counts' not in 信息:
+                    信息['counts'] = self._汇总计数(self._读取分区(信息))
+            self.协调器.锁内写入(清单)
+            return 清单['partitions']
+
+    def _导入旧数据(self, 旧数据路径: str):
+        with self.协调器.写锁():
+            if os.path.exists(self.清单路径):
+                return
+            旧数据 = 存储协调器(旧数据路径).读取json(默认值=[])
+            新增 = self._保存(旧数据)
+            print(f"✅ 已将 {旧数据路径} 中的 {新增} 条新闻导入分区存储 {self.目录}")
+
+    def _读取清单(self) -> Dict:
+        return self.协调器.锁内读取({'version': 1, 'partitions': {}})
+
+    def _读取分区(self, 信息: Optional[Dict]) -> List[Dict]:
+        if not 信息:
+            return []
+        # 清单列出的文件缺失说明数据已丢失，直接报错，不能当作空分区（ID索引仍记录着这些新闻）
+        路径 = os.path.join(self.目录, 信息['file'])
+        with open(路径, 'rb') as f:
+            内容 = f.read()
+        if 路径.endswith('.gz'):
+            内容 = gzip.decompress(内容)
+        return 解码(内容)
+
+    def _写入分区(self, 月份: str, 新闻列表: List[Dict], 冻结: bool) -> Dict:
+        """原子写入分区文件并返回其清单信息；其他格式的旧文件由调用方在清单写入后用 _删除旧文件 删除"""
+        新闻列表.sort(key=lambda x: x.get('crawl_time') or '', reverse=True)
+
+        压缩 = 冻结 and self.压缩冻结分区
+        格式 = self.格式
+        if 冻结 and 格式 == 'json':
+            # 冻结分区不再改动，没必要保留缩进
+            格式 = 'json-compact'
+        文件名 = 月份 + 获取编解码器(格式).扩展名 + ('.gz' if 压缩 else '')
+
+        内容 = 编码(新闻列表, 格式)
+        if 压缩:
+            # 固定mtime，内容相同则文件字节相同
+            内容 = gzip.compress(内容, mtime=0)
+        原子写入(os.path.join(self.目录, 文件名), 内容)
+
+        抓取时间 = [n.get('crawl_time') or '' for n in 新闻列表]
+        return {
+            'file': 文件名,
+            'frozen': 冻结,
+            'count': len(新闻列表),
+            'min_crawl_time': min(抓取时间) if 抓取时间 else '',
+            'max_crawl_time': max(抓取时间) if 抓取时间 else '',
+            'counts': self._汇总计数(新闻列表),
+        }
+
+    def _删除旧文件(self, 清单: Dict, 月份列表):
+        """清单写入后删除这些月份中清单不再指向的其他格式文件；清单写入前崩溃时旧文件仍可读"""
+        for 月份 in 月份列表:
+            当前 = 清单['partitions'][月份]['file']
+            for 扩展名 in ('.json', '.msgpack'):
+                for 旧文件名 in (月份 + 扩展名, 月份 + 扩展名 + '.gz'):
+                    if 旧文件名 != 当前 and os.path.exists(os.path.join(self.目录, 旧文件名)):
+                        os.remove(os.path.join(self.目录, 旧文件名))
+
+    # 清单 counts 中每行的字段，最后一列为新闻数
+    _计数字段 = ('crawl_day', 'company', 'hr_category', 'source', 'is_hr_related')
+
+    @staticmethod
+    def _汇总计数(新闻列表: List[Dict]) -> List[list]:
+        """[[日期, 公司, HR分类, 来源, 是否相关(0/1), 新闻数], ...]，缺失的字段记为空字符串"""
+        计数 = Counter(
+            ((n.get('crawl_time') or '')[:10], n.get('company') or '', n.get('hr_category') or '',
+             n.get('source') or '', 1 if n.get('is_hr_related') else 0)
+            for n in 新闻列表
+        )
+        return [list(键) + [数量] for 键, 数量 in sorted(计数.items())]
+
+    def _读取ID索引(self) -> Dict[str, str]:
+        索引 = {}
+        try:
+            with open(self.索引路径, 'r', encoding='utf-8') as f:
+                for 行 in f:
+                    部分 = 行.rstrip('\n').split('\t')
+                    if len(部分) == 2:
+                        索引[部分[0]] = 部分[1]
+        except FileNotFoundError:
+            pass
+        return 索引
+
+    def _追加ID索引(self, 条目: List):
+        os.makedirs(self.目录, exist_ok=True)
+        with open(self.索引路径, 'a', encoding='utf-8') as f:
+            f.writelines(f"{新闻id}\t{月份}\n" for 新闻id, 月份 in 条目)
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def _月份(新闻: Dict) -> str:
+        抓取时间 = 新闻.get('crawl_time') or ''
+        return 抓取时间[:7] if len(抓取时间) >= 7 else '0000-00'
+
+    def _区间相交(self, 信息: Dict, 开始时间: Optional[str], 结束时间: Optional[str]) -> bool:
+        if 开始时间 and 信息['max_crawl_time'][:len(开始时间)] < 开始时间:
+            return False
+        if 结束时间 and 信息['min_crawl_time'][:len(结束时间)] > 结束时间:
+            return False
+        return True
@@ -0,0 +1,350 @@
+"""
+只读快照模块
+把全部新闻写成一个不可变的二进制列存文件，Web界面用 mmap 打开后按需解码单个字段，
+多个进程通过操作系统页缓存共享同一份数据，启动耗时和进程内存与历史数据量基本无关
+
+文件结构（小端/本机字节序，各段按8字节对齐）：
+    魔数 b'HRSNAP01' | 目录长度(uint64) | 目录(JSON) | 列数组... | 字符串堆
+    分类列（来源/公司/HR分类）：uint32 编码数组，字典存放在目录中，0 表示缺失
+    布尔列：uint8 数组，0/1，2 表示缺失
+    HR相关行号：uint32 升序数组
+    文本列：uint64 起点 + uint32 长度两个数组，指向字符串堆，长度 0xFFFFFFFF 表示缺失
+    JSON列：同文本列，值为JSON文本（关键词列表、未知字段）
+行按抓取时间倒序排列。
+
+生成快照：
+    python 数据存储/只读快照.py
+"""
+
+import json
+import mmap
+import os
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from 数据存储.文件锁 import 原子写入
+from 数据存储.数据库操作 import 按配置创建存储, 读取存储配置
+
+魔数 = b'HRSNAP01'
+_缺失长度 = 0xFFFFFFFF
+
+_字段 = ('id', 'title', 'url', 'source', 'company', 'publish_time', 'abstract',
+         'crawl_time', 'is_hr_related', 'hr_category', 'summary', 'keywords')
+_分类字段 = ('source', 'company', 'hr_category')
+_其他列 = '_其他'
+_不存在 = object()
+
+
+def 生成快照(新闻列表: Iterable[Dict]) -> bytes:
+    """把新闻列表编码为快照文件内容"""
+    新闻列表 = sorted(新闻列表, key=lambda x: x.get('crawl_time') or '', reverse=True)
+    行数 = len(新闻列表)
+
+    堆 = bytearray()
+    已写入 = {}  # 相同文本只在堆中存一份（如与原文摘要相同的summary）
+
+    def 写入堆(文本: str):
+        if 文本 not in 已写入:
+            数据 = 文本.encode('utf-8')
+            已写入[文本] = (len(堆), len(数据))
+            堆.extend(数据)
+        return 已写入[文本]
+
+    列定义 = {}
+    段列表 = []
+
+    def 文本列(名称: str, 值列表: List, 类型: str):
+        起点, 长度 = array('Q'), array('I')
+        for 值 in 值列表:
+            if 值 is _不存在:
+                起点.append(0)
+                长度.append(_缺失长度)
+                continue
+            if 类型 == 'json':
+                值 = json.dumps(值, ensure_ascii=False, separators=(',', ':'))
+            位置, 字节数 = 写入堆(值)
+            起点.append(位置)
+            长度.append(字节数)
+        列定义[名称] = {'kind': 类型, 'starts': len(段列表), 'lengths': len(段列表) + 1}
+        段列表.extend([起点.tobytes(), 长度.tobytes()])
+
+    for 字段名 in _字段 + (_其他列,):
+        if 字段名 == _其他列:
+            值列表 = [{k: v for k, v in n.items() if k not in _字段} or _不存在 for n in 新闻列表]
+            if any(v is not _不存在 for v in 值列表):
+                文本列(字段名, 值列表, 'json')
+            continue
+
+        # 缺失的键与值为 None 区分开：前者读取时不存在，后者按JSON列保存
+        值列表 = [n.get(字段名, _不存在) for n in 新闻列表]
+        现有值 = [v for v in 值列表 if v is not _不存在]
+
+        if 字段名 in _分类字段 and all(isinstance(v, str) for v in 现有值):
+            字典 = sorted(set(现有值))
+            编号 = {v: i + 1 for i, v in enumerate(字典)}
+            编码 = array('I', (编号[v] if v is not _不存在 else 0 for v in 值列表))
+            列定义[字段名] = {'kind': 'dict', 'codes': len(段列表), 'values': 字典}
+            段列表.append(编码.tobytes())
+        elif 字段名 == 'is_hr_related' and all(isinstance(v, bool) for v in 现有值):
+            标志 = bytes(2 if v is _不存在 else int(v) for v in 值列表)
+            列定义[字段名] = {'kind': 'bool', 'flags': len(段列表)}
+            段列表.append(标志)
+        elif all(isinstance(v, str) for v in 现有值):
+            文本列(字段名, 值列表, 'str')
+        else:
+            文本列(字段名, 值列表, 'json')
+
+    # HR相关行号预先算好，界面筛选时直接使用
+    hr行号 = array('I', (i for i, n in enumerate(新闻列表) if n.get('is_hr_related')))
+    段列表.append(hr行号.tobytes())
+    段列表.append(bytes(堆))
+
+    # 段位置相对于数据区起点（目录之后按8字节对齐处）
+    段位置 = []
+    偏移 = 0
+    for 段 in 段列表:
+        段位置.append([偏移, len(段)])
+        偏移 = _对齐(偏移 + len(段))
+
+    目录 = {'rows': 行数, 'byteorder': sys.byteorder, 'created': datetime.now().isoformat(),
+            'columns': 列定义, 'hr_rows': len(段列表) - 2, 'heap': len(段列表) - 1,
+            'sections': 段位置}
+    目录文本 = json.dumps(目录, ensure_ascii=False).encode('utf-8')
+
+    内容 = bytearray(魔数)
+    内容 += len(目录文本).to_bytes(8, 'little')
+    内容 += 目录文本
+    数据起点 = _对齐(len(内容))
+    for (位置, _), 段 in zip(段位置, 段列表):
+        内容 += bytes(数据起点 + 位置 - len(内容))
+        内容 += 段
+    return bytes(内容)
+
+
+def _对齐(偏移: int) -> int:
+    return (偏移 + 7) // 8 * 8
+
+
+class 只读快照(Sequence):
+    """mmap 打开的快照文件，按行号返回 快照记录"""
+
+    def __init__(self, 文件路径: str):
+        self.文件路径 = 文件路径
+        with open(文件路径, 'rb') as f:
+            self._映射 = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        视图 = memoryview(self._映射)
+
+        if bytes(视图[:len(魔数)]) != 魔数:
+            raise ValueError(f"不是有效的快照文件: {文件路径}")
+        目录结束 = len(魔数) + 8 + int.from_bytes(视图[len(魔数):len(魔数) + 8], 'little')
+        self.目录 = json.loads(bytes(视图[len(魔数) + 8:目录结束]))
+        if self.目录['byteorder'] != sys.byteorder:
+            raise ValueError("快照文件的字节序与本机不一致，请重新生成")
+
+        self.行数 = self.目录['rows']
+        数据起点 = _对齐(目录结束)
+        段 = [视图[数据起点 + 位置:数据起点 + 位置 + 长度] for 位置, 长度 in self.目录['sections']]
+        self._堆 = 段[self.目录['heap']]
+        self._hr行号 = 段[self.目录['hr_rows']].cast('I')
+
+        # 字段名 → (类型, 数组...)，数组是直接指向映射内存的 memoryview
+        self._列 = {}
+        for 名称, 定义 in self.目录['columns'].items():
+            if 定义['kind'] == 'dict':
+                self._列[名称] = ('dict', 段[定义['codes']].cast('I'), [None] + 定义['values'])
+            elif 定义['kind'] == 'bool':
+                self._列[名称] = ('bool', 段[定义['flags']])
+            else:
+                self._列[名称] = (定义['kind'], 段[定义['starts']].cast('Q'), 段[定义['lengths']].cast('I'))
+
+        self.字段 = tuple(名称 for 名称 in _字段 if 名称 in self._列)
+
+    def __len__(self):
+        return self.行数
+
+    def __getitem__(self, 行):
+        if isinstance(行, slice):
+            return [快照记录(self, i) for i in range(*行.indices(self.行数))]
+        if 行 < 0:
+            行 += self.行数
+        if not 0 <= 行 < self.行数:
+            raise IndexError(行)
+        return 快照记录(self, 行)
+
+    def copy(self) -> List['快照记录']:
+        """与 list.copy() 一致，便于替换原来的新闻列表"""
+        return list(self)
+
+    def 取值(self, 行: int, 字段名: str, 默认值=None):
+        """解码单个字段，缺失时返回默认值"""
+        列 = self._列.get(字段名)
+        if 列 is None:
+            if 字段名 not in _字段:
+                return self.取值(行, _其他列, {}).get(字段名, 默认值)
+            return 默认值
+
+        类型 = 列[0]
+        if 类型 == 'dict':
+            值 = 列[2][列[1][行]]
+            return 默认值 if 值 is None else 值
+        if 类型 == 'bool':
+            标志 = 列[1][行]
+            return 默认值 if 标志 == 2 else bool(标志)
+
+        长度 = 列[2][行]
+        if 长度 == _缺失长度:
+            return 默认值
+        起点 = 列[1][行]
+        文本 = str(self._堆[起点:起点 + 长度], 'utf-8')
+        return json.loads(文本) if 类型 == 'json' else 文本
+
+    def 存在(self, 行: int, 字段名: str) -> bool:
+        return self.取值(行, 字段名, _不存在) is not _不存在
+
+    def 子集(self, 仅hr相关: bool = False, 开始时间: Optional[str] = None,
+            结束时间: Optional[str] = None) -> '快照视图':
+        """按HR相关和抓取时间窗口（ISO前缀，闭区间）筛选，不解码其他字段"""
+        开始行, 结束行 = self._时间窗口(开始时间, 结束时间)
+        if 仅hr相关:
+            行号 = self._hr行号[bisect_left(self._hr行号, 开始行):bisect_left(self._hr行号, 结束行)]
+        else:
+            行号 = range(开始行, 结束行)
+        return 快照视图(self, 行号)
+
+    def _时间窗口(self, 开始时间: Optional[str], 结束时间: Optional[str]) -> Tuple[int, int]:
+        """抓取时间窗口对应的行号区间 [开始行, 结束行)"""
+        开始行, 结束行 = 0, self.行数
+        if self._列.get('crawl_time', ('',))[0] == 'str':
+            # 行按抓取时间倒序，二分查找窗口边界
+            if 结束时间:
+                开始行 = self._首个满足(lambda i: self.取值(i, 'crawl_time', '')[:len(结束时间)] <= 结束时间)
+            if 开始时间:
+                结束行 = self._首个满足(lambda i: self.取值(i, 'crawl_time', '')[:len(开始时间)] < 开始时间)
+        return 开始行, max(开始行, 结束行)
+
+    def _首个满足(self, 条件) -> int:
+        """条件随行号单调（先假后真），返回第一个为真的行号；都不满足时返回 行数"""
+        低, 高 = 0, self.行数
+        while 低 < 高:
+            中 = (低 + 高) // 2
+            if 条件(中):
+                高 = 中
+            else:
+                低 = 中 + 1
+        return 低
+
+    def 关闭(self):
+        self._列.clear()
+        self._堆 = self._hr行号 = None
+        try:
+            self._映射.close()
+        except BufferError:
+            # 仍有记录引用映射内存时，交给垃圾回收释放
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *异常):
+        self.关闭()
+
+
+
+class 快照视图(Sequence):
+    """快照的行子集，行号为 range 或指向映射内存的数组，不复制数据"""
+
+    def __init__(self, 快照: 只读快照, 行号):
+        self.快照 = 快照
+        self.行号 = 行号
+
+    def __len__(self):
+        return len(self.行号)
+
+    def __getitem__(self, 位置):
+        if isinstance(位置, slice):
+            return [快照记录(self.快照, i) for i in self.行号[位置]]
+        return 快照记录(self.快照, self.行号[位置])
+
+    def copy(self) -> List['快照记录']:
+        return list(self)
+
+    def 子集(self, 开始时间: Optional[str] = None, 结束时间: Optional[str] = None) -> '快照视图':
+        """再按抓取时间窗口（ISO前缀，闭区间）筛选，只二分查找窗口边界，不解码其他行"""
+        开始行, 结束行 = self.快照._时间窗口(开始时间, 结束时间)
+        return 快照视图(self.快照, self.行号[bisect_left(self.行号, 开始行):bisect_left(self.行号, 结束行)])
+
+
+class 快照记录(Mapping):
+    """快照中的一行，字段在访问时才从映射内存解码，行为等同于只读 dict"""
+
+    __slots__ = ('_快照', '_行')
+
+    def __init__(self, 快照: 只读快照, 行: int):
+        self._快照 = 快照
+        self._行 = 行
+
+    def __getitem__(self, 键):
+        值 = self._快照.取值(self._行, 键, _不存在)
+        if 值 is _不存在:
+            raise KeyError(键)
+        return 值
+
+    def get(self, 键, 默认值=None):
+        return self._快照.取值(self._行, 键, 默认值)
+
+    def __iter__(self):
+        for 字段名 in self._快照.字段:
+            if self._快照.存在(self._行, 字段名):
+                yield 字段名
+        yield from self._快照.取值(self._行, _其他列, {})
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __reduce__(self):
+        return (dict, (self.转字典(),))
+
+    def __repr__(self):
+        return f"快照记录({self.转字典()!r})"
+
+    def 转字典(self) -> Dict:
+        return {键: self[键] for 键 in self}
+
+
+def 发布快照(新闻列表: Iterable[Dict], 文件路径: str = "数据/快照.bin") -> int:
+    """生成快照并原子替换旧文件；已打开旧快照的进程继续读取旧内容，直到重新打开"""
+    新闻列表 = list(新闻列表)
+    原子写入(文件路径, 生成快照(新闻列表))
+    return len(新闻列表)
+
+
+def 快照路径(配置文件路径: str = "配置文件.yaml") -> Optional[str]:
+    """配置的快照文件路径（storage.snapshot_path），配置为空时表示不使用快照"""
+    return 读取存储配置(配置文件路径).get('snapshot_path', '数据/快照.bin') or None
+
+
+def 按配置发布快照(存储=None, 配置文件路径: str = "配置文件.yaml") -> Optional[str]:
+    """从存储加载全部新闻发布快照（爬虫和AI分析结束后调用），返回快照路径"""
+    路径 = 快照路径(配置文件路径)
+    if not 路径:
+        return None
+
+    存储 = 存储 or 按配置创建存储(配置文件路径)
+    条数 = 发布快照(存储.加载新闻(), 路径)
+    print(f"📸 已发布只读快照 {路径}（{条数} 条，{os.path.getsize(路径) / 1024:.0f} KB）")
+    return 路径
+
+
+def 主程序():
+    """命令行运行入口：按当前配置重新生成快照"""
+    按配置发布快照()
+
+
+if __name__ == "__main__":
+    主程序()
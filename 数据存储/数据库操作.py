@@ -1,21 +1,34 @@
 """
 数据库操作模块
-提供JSON和SQLite两种存储方式
+提供JSON、SQLite和按月分区三种存储方式
 """
 
 import json
 import sqlite3
-from typing import List, Dict
+from collections import Counter
+from typing import List, Dict, Optional, Tuple, Union
 from datetime import datetime
 
+from 数据存储.文件锁 import 存储协调器
+from 数据存储.分区存储 import 分区存储, 在时间窗口内
+
 
 class 数据存储:
-    def __init__(self, 存储类型: str = "json", 文件路径: str = "数据/新闻数据.json"):
+    def __init__(self, 存储类型: str = "json", 文件路径: str = "数据/新闻数据.json", 格式: str = "json",
+                 **分区选项):
+        """存储类型为 分区 时，文件路径是分区目录，分区选项透传给 分区存储
+
+        格式为文件的序列化格式（json/json-compact/orjson/msgpack，见 编解码.py），sqlite 存储忽略此参数
+        """
         self.存储类型 = 存储类型
         self.文件路径 = 文件路径
 
-        if 存储类型 == "sqlite":
+        if 存储类型 == "json":
+            self.协调器 = 存储协调器(文件路径, 格式=格式)
+        elif 存储类型 == "sqlite":
             self._初始化数据库()
+        elif 存储类型 == "分区":
+            self.分区 = 分区存储(文件路径, 格式=格式, **分区选项)
 
     def _初始化数据库(self):
         """初始化SQLite数据库表结构"""
@@ -35,62 +48,204 @@ class 数据存储:
                 is_hr_related INTEGER,
                 hr_category TEXT,
                 summary TEXT,
-                keywords TEXT
+                keywords TEXT,
+                label_source TEXT
             )
         """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS 新闻表_抓取时间 ON 新闻表 (crawl_time)")
+
+        # 旧数据库升级：补上 label_source 列（标注来源 rules / ai，旧数据为空）
+        列名 = {row[1] for row in cursor.execute("PRAGMA table_info(新闻表)")}
+        if 'label_source' not in 列名:
+            cursor.execute("ALTER TABLE 新闻表 ADD COLUMN label_source TEXT")
+
+        # 关键词倒排表：每个(关键词, 新闻)一行，冗余筛选字段以便按索引直接统计
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS 关键词表 (
+                keyword TEXT NOT NULL,
+                news_id TEXT NOT NULL,
+                company TEXT,
+                hr_category TEXT,
+                source TEXT,
+                crawl_day TEXT,
+                is_hr_related INTEGER,
+                PRIMARY KEY (keyword, news_id)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS 关键词表_新闻 ON 关键词表 (news_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS 关键词表_日期 ON 关键词表 (crawl_day, keyword)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS 关键词表_公司 ON 关键词表 (company, crawl_day, keyword)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS 关键词表_分类 ON 关键词表 (hr_category, crawl_day, keyword)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS 关键词表_来源 ON 关键词表 (source, crawl_day, keyword)")
+
+        # 旧数据库升级：倒排表为空但已有新闻时，从 keywords 列回填
+        cursor.execute("SELECT 1 FROM 关键词表 LIMIT 1")
+        if cursor.fetchone() is None:
+            cursor.execute("""
+                SELECT id, company, hr_category, source, crawl_time, is_hr_related, keywords
+                FROM 新闻表 WHERE keywords != ''
+            """)
+            for row in cursor.fetchall():
+                self._写入关键词(cursor, {
+                    'id': row[0],
+                    'company': row[1],
+                    'hr_category': row[2],
+                    'source': row[3],
+                    'crawl_time': row[4],
+                    'is_hr_related': row[5],
+                    'keywords': row[6].split(','),
+                })
+
+        # 汇总表：按(日期, 公司, HR分类, 来源, 是否相关)维护新闻数，与新闻写入同一事务更新
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS 统计表 (
+                crawl_day TEXT NOT NULL,
+                company TEXT NOT NULL,
+                hr_category TEXT NOT NULL,
+                source TEXT NOT NULL,
+                is_hr_related INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (crawl_day, company, hr_category, source, is_hr_related)
+            )
+        """)
+
+        cursor.execute("SELECT 1 FROM 统计表 LIMIT 1")
+        if cursor.fetchone() is None:
+            cursor.execute("""
+                INSERT INTO 统计表
+                SELECT substr(COALESCE(crawl_time, ''), 1, 10), COALESCE(company, ''),
+                       COALESCE(hr_category, ''), COALESCE(source, ''),
+                       COALESCE(is_hr_related, 0), COUNT(*)
+                FROM 新闻表
+                GROUP BY 1, 2, 3, 4, 5
+            """)
 
         conn.commit()
         conn.close()
 
-    def 保存新闻(self, 新闻列表: List[Dict]):
-        """保存新闻数据"""
+    def 保存新闻(self, 新闻列表: List[Dict]) -> int:
+        """保存新闻数据，返回新增条数"""
         if self.存储类型 == "json":
-            self._保存到json(新闻列表)
+            return self._保存到json(新闻列表)
+        elif self.存储类型 == "sqlite":
+            return self._保存到sqlite(新闻列表)
+        elif self.存储类型 == "分区":
+            return self.分区.保存新闻(新闻列表)
+
+    def 更新新闻(self, 新闻列表: List[Dict]):
+        """按ID更新已有新闻（如写回AI分析结果），不存在的新闻直接追加"""
+        if self.存储类型 == "json":
+            self._更新json(新闻列表)
         elif self.存储类型 == "sqlite":
             self._保存到sqlite(新闻列表)
+        elif self.存储类型 == "分区":
+            self.分区.更新新闻(新闻列表)
 
-    def 加载新闻(self) -> List[Dict]:
-        """加载新闻数据"""
+    def 加载新闻(self, 开始日期: Optional[str] = None, 结束日期: Optional[str] = None) -> List[Dict]:
+        """加载新闻数据，可按抓取时间窗口筛选（ISO前缀，闭区间，如 2026-02-01）"""
         if self.存储类型 == "json":
-            return self._从json加载()
+            新闻列表 = self._从json加载()
+            if 开始日期 or 结束日期:
+                新闻列表 = [n for n in 新闻列表
+                          if 在时间窗口内(n.get('crawl_time') or '', 开始日期, 结束日期)]
+            return 新闻列表
         elif self.存储类型 == "sqlite":
-            return self._从sqlite加载()
+            return self._从sqlite加载(开始日期, 结束日期)
+        elif self.存储类型 == "分区":
+            return self.分区.加载新闻(开始日期, 结束日期)
 
-    def _保存到json(self, 新闻列表: List[Dict]):
-        """保存到JSON文件"""
-        现有数据 = self._从json加载()
+    def 已存储ID(self) -> set:
+        """返回全部已存储的新闻ID；分区存储读ID索引、SQLite只查id列，不必加载全部新闻"""
+        if self.存储类型 == "sqlite":
+            conn = sqlite3.connect(self.文件路径)
+            已存储 = {row[0] for row in conn.execute("SELECT id FROM 新闻表")}
+            conn.close()
+            return 已存储
+        elif self.存储类型 == "分区":
+            return self.分区.已存储ID()
+        return {n['id'] for n in self._从json加载()}
 
-        # 合并去重
-        现有id = {n['id'] for n in 现有数据}
+    def 筛选未存储(self, 新闻列表: List[Dict]) -> List[Dict]:
+        """返回尚未存储的新闻（同一ID只保留第一条），保存前调用可得到本次实际新增的新闻"""
+        已存储 = self.已存储ID()
+        结果 = []
         for 新闻 in 新闻列表:
-            if 新闻['id'] not in 现有id:
-                现有数据.append(新闻)
+            if 新闻['id'] not in 已存储:
+                已存储.add(新闻['id'])
+                结果.append(新闻)
+        return 结果
+
+    def _保存到json(self, 新闻列表: List[Dict]) -> int:
+        """保存到JSON文件（持有写锁完成读-合并-写，避免覆盖其他进程的更新）"""
+        新增数量 = 0
+
+        def 合并(现有数据: List[Dict]) -> List[Dict]:
+            nonlocal 新增数量
 
-        # 排序
-        现有数据.sort(key=lambda x: x.get('crawl_time', ''), reverse=True)
+            # 合并去重
+            现有id = {n['id'] for n in 现有数据}
+            for 新闻 in 新闻列表:
+                if 新闻['id'] not in 现有id:
+                    现有数据.append(新闻)
+                    现有id.add(新闻['id'])
+                    新增数量 += 1
 
-        with open(self.文件路径, 'w', encoding='utf-8') as f:
-            json.dump(现有数据, f, ensure_ascii=False, indent=2)
+            # 排序
+            现有数据.sort(key=lambda x: x.get('crawl_time', ''), reverse=True)
+            return 现有数据
+
+        self.协调器.更新json(合并, 默认值=[])
+        return 新增数量
+
+    def _更新json(self, 新闻列表: List[Dict]):
+        """在写锁内重新读取最新文件再合并，保留其他进程期间新增的新闻"""
+        def 合并(现有数据: List[Dict]) -> List[Dict]:
+            位置 = {n['id']: i for i, n in enumerate(现有数据)}
+            for 新闻 in 新闻列表:
+                if 新闻['id'] in 位置:
+                    现有数据[位置[新闻['id']]].update(新闻)
+                else:
+                    位置[新闻['id']] = len(现有数据)
+                    现有数据.append(新闻)
+            return 现有数据
+
+        self.协调器.更新json(合并, 默认值=[])
 
     def _从json加载(self) -> List[Dict]:
         """从JSON文件加载"""
-        try:
-            with open(self.文件路径, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return []
+        return self.协调器.读取json(默认值=[])
 
-    def _保存到sqlite(self, 新闻列表: List[Dict]):
+    def _保存到sqlite(self, 新闻列表: List[Dict]) -> int:
         """保存到SQLite数据库"""
         conn = sqlite3.connect(self.文件路径)
         cursor = conn.cursor()
 
+        新增数量 = self._写入sqlite(cursor, 新闻列表)
+
+        conn.commit()
+        conn.close()
+        return 新增数量
+
+    def _写入sqlite(self, cursor, 新闻列表: List[Dict]) -> int:
+        """在调用方的事务内写入新闻及其索引表（由调用方负责提交），返回新增条数"""
+        新增数量 = 0
         for 新闻 in 新闻列表:
-            keywords_str = ','.join(新闻.get('keywords', []))
+            keywords_str = ','.join(新闻.get('keywords') or [])
+
+            # 覆盖已有新闻时先从汇总表扣除旧的计数
+            cursor.execute("""
+                SELECT crawl_time, company, hr_category, source, is_hr_related
+                FROM 新闻表 WHERE id = ?
+            """, (新闻['id'],))
+            旧行 = cursor.fetchone()
+            if 旧行:
+                self._累加统计(cursor, *旧行, 增量=-1)
+            else:
+                新增数量 += 1
 
             cursor.execute("""
                 INSERT OR REPLACE INTO 新闻表
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 新闻['id'],
                 新闻['title'],
@@ -103,18 +258,76 @@ class 数据存储:
                 1 if 新闻.get('is_hr_related') else 0,
                 新闻.get('hr_category', ''),
                 新闻.get('summary', ''),
-                keywords_str
+                keywords_str,
+                新闻.get('label_source')
             ))
 
-        conn.commit()
-        conn.close()
+            # 同一事务内维护关键词倒排表和汇总表
+            self._写入关键词(cursor, 新闻)
+            self._累加统计(
+                cursor,
+                新闻.get('crawl_time'),
+                新闻.get('company'),
+                新闻.get('hr_category'),
+                新闻.get('source'),
+                新闻.get('is_hr_related'),
+                增量=1
+            )
 
-    def _从sqlite加载(self) -> List[Dict]:
+        return 新增数量
+
+    def _累加统计(self, cursor, 抓取时间, 公司, 分类, 来源, 是否相关, 增量: int):
+        """更新汇总表中对应维度组合的新闻数"""
+        cursor.execute("""
+            INSERT INTO 统计表 VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (crawl_day, company, hr_category, source, is_hr_related)
+            DO UPDATE SET count = count + excluded.count
+        """, (
+            (抓取时间 or '')[:10],
+            公司 or '',
+            分类 or '',
+            来源 or '',
+            1 if 是否相关 else 0,
+            增量
+        ))
+
+    def _写入关键词(self, cursor, 新闻: Dict):
+        """重建单条新闻的关键词倒排记录"""
+        cursor.execute("DELETE FROM 关键词表 WHERE news_id = ?", (新闻['id'],))
+
+        关键词列表 = {k.strip() for k in 新闻.get('keywords') or [] if k and k.strip()}
+        if not 关键词列表:
+            return
+
+        日期 = (新闻.get('crawl_time') or '')[:10]
+        cursor.executemany("""
+            INSERT OR IGNORE INTO 关键词表 VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [(
+            关键词,
+            新闻['id'],
+            新闻.get('company', ''),
+            新闻.get('hr_category', ''),
+            新闻.get('source', ''),
+            日期,
+            1 if 新闻.get('is_hr_related') else 0
+        ) for 关键词 in 关键词列表])
+
+    def _从sqlite加载(self, 开始日期: Optional[str] = None, 结束日期: Optional[str] = None) -> List[Dict]:
         """从SQLite数据库加载"""
         conn = sqlite3.connect(self.文件路径)
         cursor = conn.cursor()
 
-        cursor.execute("SELECT * FROM 新闻表 ORDER BY crawl_time DESC")
+        条件 = []
+        参数 = []
+        if 开始日期:
+            条件.append("crawl_time >= ?")
+            参数.append(开始日期)
+        if 结束日期:
+            条件.append("substr(crawl_time, 1, ?) <= ?")
+            参数.extend([len(结束日期), 结束日期])
+        where子句 = ("WHERE " + " AND ".join(条件)) if 条件 else ""
+
+        cursor.execute(f"SELECT * FROM 新闻表 {where子句} ORDER BY crawl_time DESC", 参数)
         rows = cursor.fetchall()
 
         新闻列表 = []
@@ -133,7 +346,166 @@ class 数据存储:
                 'summary': row[10],
                 'keywords': row[11].split(',') if row[11] else []
             }
+            if row[12]:
+                新闻['label_source'] = row[12]
             新闻列表.append(新闻)
 
         conn.close()
         return 新闻列表
+
+    def 关键词统计(self, 数量: int = 10, 公司: Optional[str] = None,
+                 分类: Optional[str] = None, 来源: Optional[str] = None,
+                 开始日期: Optional[str] = None, 结束日期: Optional[str] = None,
+                 仅hr相关: bool = False) -> List[Tuple[str, int]]:
+        """返回筛选条件下出现次数最多的关键词 [(关键词, 新闻数), ...]
+
+        日期为 YYYY-MM-DD 字符串，闭区间；未指定的条件不参与筛选。
+        """
+        if self.存储类型 == "sqlite":
+            return self._sqlite关键词统计(数量, 公司, 分类, 来源, 开始日期, 结束日期, 仅hr相关)
+
+        # JSON/分区存储没有索引，只能扫描（分区存储只打开时间窗口涉及的分区）
+        计数 = Counter()
+        for 新闻 in self.加载新闻(开始日期, 结束日期):
+            if self._符合筛选(新闻, 公司, 分类, 来源, 开始日期, 结束日期, 仅hr相关):
+                计数.update({k.strip() for k in 新闻.get('keywords') or [] if k and k.strip()})
+
+        return sorted(计数.items(), key=lambda x: (-x[1], x[0]))[:数量]
+
+    def _sqlite关键词统计(self, 数量, 公司, 分类, 来源, 开始日期, 结束日期, 仅hr相关):
+        """在倒排表上按索引分组计数"""
+        where子句, 参数 = self._筛选子句(公司, 分类, 来源, 开始日期, 结束日期, 仅hr相关)
+
+        conn = sqlite3.connect(self.文件路径)
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT keyword, COUNT(*) AS 次数 FROM 关键词表
+            {where子句}
+            GROUP BY keyword
+            ORDER BY 次数 DESC, keyword
+            LIMIT ?
+        """, 参数 + [数量])
+        结果 = cursor.fetchall()
+        conn.close()
+
+        return 结果
+
+    统计维度 = ('crawl_day', 'company', 'hr_category', 'source')
+
+    def 统计计数(self, 维度: Union[str, Tuple[str, ...]] = 'crawl_day',
+                公司: Optional[str] = None, 分类: Optional[str] = None,
+                来源: Optional[str] = None, 开始日期: Optional[str] = None,
+                结束日期: Optional[str] = None, 仅hr相关: bool = False) -> Dict:
+        """按维度汇总新闻数
+
+        维度取 crawl_day / company / hr_category / source，传单个维度时结果的键是该维度的值，
+        传元组时键是对应的值元组。缺失的字段统一记为空字符串。
+        SQLite存储直接读汇总表、分区存储只读清单中的分区汇总，代价与天数（而非新闻数）成正比。
+        """
+        维度列表 = (维度,) if isinstance(维度, str) else tuple(维度)
+        for 名称 in 维度列表:
+            if 名称 not in self.统计维度:
+                raise ValueError(f"不支持的统计维度: {名称}")
+
+        if self.存储类型 == "sqlite":
+            结果 = self._sqlite统计计数(维度列表, 公司, 分类, 来源, 开始日期, 结束日期, 仅hr相关)
+        elif self.存储类型 == "分区":
+            结果 = self.分区.统计计数(维度列表, 公司, 分类, 来源, 开始日期, 结束日期, 仅hr相关)
+        else:
+            结果 = Counter()
+            for 新闻 in self.加载新闻(开始日期, 结束日期):
+                if self._符合筛选(新闻, 公司, 分类, 来源, 开始日期, 结束日期, 仅hr相关):
+                    结果[tuple(
+                        (新闻.get('crawl_time') or '')[:10] if 名称 == 'crawl_day' else (新闻.get(名称) or '')
+                        for 名称 in 维度列表
+                    )] += 1
+
+        if isinstance(维度, str):
+            return {键[0]: 数量 for 键, 数量 in 结果.items()}
+        return dict(结果)
+
+    def _sqlite统计计数(self, 维度列表, 公司, 分类, 来源, 开始日期, 结束日期, 仅hr相关):
+        """在汇总表上分组求和"""
+        where子句, 参数 = self._筛选子句(公司, 分类, 来源, 开始日期, 结束日期, 仅hr相关)
+        字段 = ", ".join(维度列表)
+
+        conn = sqlite3.connect(self.文件路径)
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT {字段}, SUM(count) FROM 统计表
+            {where子句}
+            GROUP BY {字段}
+            HAVING SUM(count) > 0
+        """, 参数)
+        结果 = {tuple(row[:-1]): row[-1] for row in cursor.fetchall()}
+        conn.close()
+
+        return 结果
+
+    def _筛选子句(self, 公司, 分类, 来源, 开始日期, 结束日期, 仅hr相关) -> Tuple[str, list]:
+        """生成倒排表/汇总表共用的 WHERE 子句"""
+        条件 = []
+        参数 = []
+        for 字段, 值 in (('company', 公司), ('hr_category', 分类), ('source', 来源)):
+            if 值:
+                条件.append(f"{字段} = ?")
+                参数.append(值)
+        if 开始日期:
+            条件.append("crawl_day >= ?")
+            参数.append(开始日期)
+        if 结束日期:
+            条件.append("crawl_day <= ?")
+            参数.append(结束日期)
+        if 仅hr相关:
+            条件.append("is_hr_related = 1")
+
+        return (("WHERE " + " AND ".join(条件)) if 条件 else ""), 参数
+
+    def _符合筛选(self, 新闻: Dict, 公司, 分类, 来源, 开始日期, 结束日期, 仅hr相关) -> bool:
+        """JSON存储的逐条筛选，语义与 _筛选子句 一致"""
+        if 公司 and 新闻.get('company') != 公司:
+            return False
+        if 分类 and 新闻.get('hr_category') != 分类:
+            return False
+        if 来源 and 新闻.get('source') != 来源:
+            return False
+        if not 在时间窗口内(新闻.get('crawl_time') or '', 开始日期, 结束日期):
+            return False
+        if 仅hr相关 and not 新闻.get('is_hr_related'):
+            return False
+        return True
+
+
+def 读取配置(配置文件路径: str = "配置文件.yaml") -> Dict:
+    """读取整个配置文件，文件不存在时返回空字典"""
+    import yaml
+
+    try:
+        with open(配置文件路径, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        return {}
+
+
+def 读取存储配置(配置文件路径: str = "配置文件.yaml") -> Dict:
+    """读取配置文件的 storage 段，文件不存在时返回空字典"""
+    return 读取配置(配置文件路径).get('storage') or {}
+
+
+def 按配置创建存储(配置文件路径: str = "配置文件.yaml") -> 数据存储:
+    """根据配置文件的 storage 段创建存储对象，未配置时使用按月分区存储"""
+    存储配置 = 读取存储配置(配置文件路径)
+    存储类型 = 存储配置.get('type', '分区')
+    格式 = 存储配置.get('codec', 'json')
+
+    if 存储类型 == "sqlite":
+        return 数据存储("sqlite", 存储配置.get('sqlite_path', '数据/新闻数据.db'))
+    if 存储类型 == "json":
+        return 数据存储("json", 存储配置.get('json_path', '数据/新闻数据.json'), 格式=格式)
+    return 数据存储(
+        "分区",
+        存储配置.get('partition_dir', '数据/分区'),
+        格式=格式,
+        旧数据路径=存储配置.get('json_path', '数据/新闻数据.json'),
+        压缩冻结分区=存储配置.get('compress_frozen', True)
+    )
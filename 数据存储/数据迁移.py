@@ -0,0 +1,198 @@
+"""
+数据迁移模块
+以流式方式把 JSON / JSONL 新闻文件导入SQLite数据库，内存占用与文件大小无关
+
+用法：
+    python 数据存储/数据迁移.py 数据/新闻数据.json 历史/*.jsonl --目标 数据/新闻数据.db
+"""
+
+import argparse
+import codecs
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Iterator, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from 数据存储.数据库操作 import 数据存储
+
+
+class 流式解析器:
+    """增量解析 JSON 数组、JSONL 或首尾相接的 JSON 对象
+
+    逐块读取文件，每解析出一个对象就产出 (对象, 该对象之后的字节偏移)，
+    偏移可用于从中断处继续解析。
+    """
+
+    空白和分隔符 = ' \t\r\n,'
+
+    def __init__(self, 文件路径: str, 起始偏移: int = 0, 块大小: int = 1 << 20):
+        self.文件路径 = 文件路径
+        self.起始偏移 = 起始偏移
+        self.块大小 = 块大小
+        self._解码器 = json.JSONDecoder()
+
+    def __iter__(self) -> Iterator[Tuple[Dict, int]]:
+        with open(self.文件路径, 'rb') as f:
+            偏移 = self.起始偏移
+            if 偏移 == 0 and f.read(3) == codecs.BOM_UTF8:
+                偏移 = 3
+            f.seek(偏移)
+
+            增量解码 = codecs.getincrementaldecoder('utf-8')()
+            缓冲 = ''
+            位置 = 0      # 当前扫描位置
+            已计 = 0      # 缓冲中已计入字节偏移的位置
+            读完 = False
+
+            while True:
+                # 跳过空白、逗号和数组括号
+                while 位置 < len(缓冲) and 缓冲[位置] in self.空白和分隔符 + '[':
+                    位置 += 1
+                if 位置 < len(缓冲) and 缓冲[位置] == ']':
+                    return
+
+                if 位置 < len(缓冲):
+                    try:
+                        对象, 结束 = self._解码器.raw_decode(缓冲, 位置)
+                    except json.JSONDecodeError:
+                        if 读完:
+                            raise
+                        结束 = None
+
+                    if 结束 is not None and (结束 < len(缓冲) or 读完):
+                        偏移 += len(缓冲[已计:结束].encode('utf-8'))
+                        已计 = 位置 = 结束
+                        yield 对象, 偏移
+                        continue
+                elif 读完:
+                    return
+
+                # 缓冲区不足以解析出完整对象：丢弃已消费部分，继续读取
+                块 = f.read(self.块大小)
+                if not 块:
+                    读完 = True
+                缓冲 = 缓冲[已计:] + 增量解码.decode(块, final=读完)
+                位置 -= 已计
+                已计 = 0
+
+
+class 迁移工具:
+    """把新闻文件分批导入SQLite，每批与进度记录在同一事务内提交"""
+
+    def __init__(self, 数据库路径: str = "数据/新闻数据.db", 批大小: int = 1000):
+        self.存储 = 数据存储("sqlite", 数据库路径)
+        self.数据库路径 = 数据库路径
+        self.批大小 = 批大小
+        self._初始化进度表()
+
+    def _初始化进度表(self):
+        """记录每个源文件已导入到的字节偏移"""
+        conn = sqlite3.connect(self.数据库路径)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS 迁移进度 (
+                source_path TEXT PRIMARY KEY,
+                file_size INTEGER,
+                byte_offset INTEGER,
+                row_count INTEGER,
+                finished INTEGER,
+                updated_at TEXT
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def 导入文件(self, 文件路径: str, 重新开始: bool = False) -> int:
+        """导入单个文件，返回本次新导入的条数"""
+        绝对路径 = os.path.abspath(文件路径)
+        文件大小 = os.path.getsize(文件路径)
+
+        conn = sqlite3.connect(self.数据库路径)
+        cursor = conn.cursor()
+
+        起始偏移, 已导入 = 0, 0
+        if not 重新开始:
+            cursor.execute(
+                "SELECT file_size, byte_offset, row_count, finished FROM 迁移进度 WHERE source_path = ?",
+                (绝对路径,)
+            )
+            进度 = cursor.fetchone()
+            # 文件大小变化说明内容被重写过，只能从头导入
+            if 进度 and 进度[0] == 文件大小:
+                if 进度[3]:
+                    print(f"⏭️  {文件路径} 已导入完成，跳过（{进度[2]} 条）")
+                    conn.close()
+                    return 0
+                起始偏移, 已导入 = 进度[1], 进度[2]
+                print(f"↩️  从第 {已导入} 条（字节 {起始偏移}）继续导入 {文件路径}")
+
+        print(f"开始导入 {文件路径} ({文件大小 / 1024 / 1024:.1f} MB)")
+
+        开始时间 = time.monotonic()
+        本次导入 = 0
+        跳过 = 0
+        批次 = []
+        偏移 = 起始偏移
+
+        for 新闻, 偏移 in 流式解析器(文件路径, 起始偏移):
+            if not isinstance(新闻, dict) or not 新闻.get('id') or not 新闻.get('title'):
+                跳过 += 1
+                continue
+
+            批次.append(新闻)
+            if len(批次) >= self.批大小:
+                本次导入 += self._提交批次(cursor, 批次, 绝对路径, 文件大小, 偏移, 已导入 + 本次导入 + len(批次), False)
+                conn.commit()
+                批次 = []
+                self._报告进度(本次导入, 开始时间, 偏移, 文件大小)
+
+        本次导入 += self._提交批次(cursor, 批次, 绝对路径, 文件大小, 偏移, 已导入 + 本次导入 + len(批次), True)
+        conn.commit()
+        conn.close()
+
+        耗时 = time.monotonic() - 开始时间
+        print(f"✅ {文件路径} 导入完成：本次 {本次导入} 条，跳过无效记录 {跳过} 条，"
+              f"耗时 {耗时:.1f} 秒，平均 {本次导入 / 耗时 if 耗时 > 0 else 0:.0f} 条/秒")
+
+        return 本次导入
+
+    def _提交批次(self, cursor, 批次, 源路径, 文件大小, 偏移, 累计条数, 完成) -> int:
+        """写入一批新闻并更新进度（由调用方提交事务）"""
+        self.存储._写入sqlite(cursor, 批次)
+        cursor.execute("""
+            INSERT OR REPLACE INTO 迁移进度 VALUES (?, ?, ?, ?, ?, ?)
+        """, (源路径, 文件大小, 偏移, 累计条数, 1 if 完成 else 0, datetime.now().isoformat()))
+        return len(批次)
+
+    def _报告进度(self, 条数: int, 开始时间: float, 偏移: int, 文件大小: int):
+        耗时 = time.monotonic() - 开始时间
+        速度 = 条数 / 耗时 if 耗时 > 0 else 0
+        百分比 = 偏移 / 文件大小 * 100 if 文件大小 else 100
+        print(f"  已导入 {条数} 条 | {速度:.0f} 条/秒 | {百分比:.1f}%")
+
+
+def 主程序():
+    """命令行运行入口"""
+    解析器 = argparse.ArgumentParser(description="把 JSON/JSONL 新闻文件流式导入SQLite")
+    解析器.add_argument('源文件', nargs='+', help="JSON数组或JSONL文件，可指定多个")
+    解析器.add_argument('--目标', default="数据/新闻数据.db", help="SQLite数据库路径")
+    解析器.add_argument('--批大小', type=int, default=1000, help="每个事务写入的条数")
+    解析器.add_argument('--重新开始', action='store_true', help="忽略已有进度，从头导入")
+    参数 = 解析器.parse_args()
+
+    工具 = 迁移工具(参数.目标, 参数.批大小)
+
+    总数 = 0
+    for 文件路径 in 参数.源文件:
+        总数 += 工具.导入文件(文件路径, 参数.重新开始)
+
+    print(f"\n✅ 全部完成！共导入 {总数} 条新闻到 {参数.目标}")
+    print("在配置文件.yaml中设置 storage.type 为 sqlite 即可切换到数据库存储")
+
+
+if __name__ == "__main__":
+    主程序()
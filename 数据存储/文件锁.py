@@ -0,0 +1,141 @@
+"""
+存储协调模块
+为爬虫、AI分析和Web界面共享的数据文件提供咨询式文件锁和原子写入
+"""
+
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Callable
+
+from 数据存储.编解码 import 编码, 解码
+
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl，退化为 msvcrt 独占锁
+    fcntl = None
+    import msvcrt
+
+
+class 存储协调器:
+    """单写多读的文件协调器
+
+    读者持有共享锁，写者持有独占锁；写入先落到同目录临时文件再原子替换，
+    读者永远看不到写了一半的文件。
+    """
+
+    def __init__(self, 文件路径: str, 超时秒数: float = 60.0, 格式: str = 'json'):
+        self.文件路径 = 文件路径
+        self.锁路径 = 文件路径 + '.lock'
+        self.超时秒数 = 超时秒数
+        self.格式 = 格式
+
+    @contextmanager
+    def 读锁(self):
+        """获取共享锁（多个读者可同时持有）"""
+        with self._加锁(独占=False):
+            yield
+
+    @contextmanager
+    def 写锁(self):
+        """获取独占锁（同一时刻只有一个写者）"""
+        with self._加锁(独占=True):
+            yield
+
+    @contextmanager
+    def _加锁(self, 独占: bool):
+        目录 = os.path.dirname(self.锁路径)
+        if 目录:
+            os.makedirs(目录, exist_ok=True)
+
+        锁文件 = open(self.锁路径, 'a+')
+        try:
+            self._等待加锁(锁文件, 独占)
+            yield
+        finally:
+            self._解锁(锁文件)
+            锁文件.close()
+
+    def _等待加锁(self, 锁文件, 独占: bool):
+        """非阻塞轮询加锁，超时抛出 TimeoutError"""
+        截止时间 = time.monotonic() + self.超时秒数
+
+        while True:
+            try:
+                if fcntl:
+                    模式 = fcntl.LOCK_EX if 独占 else fcntl.LOCK_SH
+                    fcntl.flock(锁文件.fileno(), 模式 | fcntl.LOCK_NB)
+                else:
+                    锁文件.seek(0)
+                    msvcrt.locking(锁文件.fileno(), msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                if time.monotonic() >= 截止时间:
+                    raise TimeoutError(f"等待文件锁超时: {self.锁路径}")
+                time.sleep(0.05)
+
+    def _解锁(self, 锁文件):
+        try:
+            if fcntl:
+                fcntl.flock(锁文件.fileno(), fcntl.LOCK_UN)
+            else:
+                锁文件.seek(0)
+                msvcrt.locking(锁文件.fileno(), msvcrt.LK_UNLCK, 1)
+        except OSError:
+            pass
+
+    def 读取json(self, 默认值: Any = None) -> Any:
+        """在共享锁下读取数据文件（自动识别格式），文件不存在时返回默认值"""
+        with self.读锁():
+            return self.锁内读取(默认值)
+
+    def 写入json(self, 数据: Any):
+        """在独占锁下按 self.格式 原子写入数据文件"""
+        with self.写锁():
+            self.锁内写入(数据)
+
+    def 更新json(self, 更新函数: Callable[[Any], Any], 默认值: Any = None) -> Any:
+        """读-改-写：整个过程持有独占锁，避免并发运行互相覆盖
+
+        更新函数接收当前数据，返回要写回的新数据。
+        """
+        with self.写锁():
+            新数据 = 更新函数(self.锁内读取(默认值))
+            self.锁内写入(新数据)
+            return 新数据
+
+    def 锁内读取(self, 默认值: Any = None) -> Any:
+        """读取数据文件，调用方需已持有 读锁 或 写锁（用于在一次加锁内读写多个文件）"""
+        try:
+            with open(self.文件路径, 'rb') as f:
+                return 解码(f.read())
+        except FileNotFoundError:
+            return 默认值
+
+    def 锁内写入(self, 数据: Any):
+        """序列化后原子替换数据文件，调用方需已持有 写锁"""
+        原子写入(self.文件路径, 编码(数据, self.格式))
+
+
+def 原子写入(文件路径: str, 内容: bytes):
+    """写入同目录临时文件，fsync 后用 os.replace 原子替换"""
+    目录 = os.path.dirname(文件路径) or '.'
+    os.makedirs(目录, exist_ok=True)
+
+    fd, 临时路径 = tempfile.mkstemp(
+        dir=目录,
+        prefix='.' + os.path.basename(文件路径) + '.',
+        suffix='.tmp'
+    )
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(内容)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(临时路径, 0o644)
+        os.replace(临时路径, 文件路径)
+    except BaseException:
+        if os.path.exists(临时路径):
+            os.remove(临时路径)
+        raise
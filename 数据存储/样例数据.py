@@ -0,0 +1,30 @@
+"""
+样例数据模块
+以 数据/新闻数据.json 为模板合成任意条数的新闻，供各存储模块的性能对比使用
+"""
+
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+样例路径 = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '数据', '新闻数据.json')
+
+
+def 合成新闻(条数: int, 种子: int = 0) -> List[Dict]:
+    """随机复制样例新闻，改写ID、标题和抓取时间（分布在2025年全年）"""
+    with open(样例路径, 'r', encoding='utf-8') as f:
+        样例 = json.load(f)
+
+    随机 = random.Random(种子)
+    起点 = datetime(2025, 1, 1)
+    合成 = []
+    for i in range(条数):
+        新闻 = dict(随机.choice(样例))
+        新闻['id'] = f"{i:032x}"
+        新闻['title'] = f"{新闻['title']} #{i}"
+        新闻['crawl_time'] = (起点 + timedelta(seconds=随机.randrange(365 * 86400),
+                                                microseconds=随机.randrange(1_000_000))).isoformat()
+        合成.append(新闻)
+    return 合成
@@ -0,0 +1,178 @@
+"""
+紧凑新闻记录模块
+用 __slots__ 对象代替每条新闻一个 dict，分类字段驻留、时间预解析为整数，
+同时实现只读 Mapping 接口，现有按 新闻['title'] / 新闻.get() 访问的渲染代码无需修改
+
+内存对比：
+    python 数据存储/紧凑记录.py 100000
+"""
+
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
+
+_纪元 = datetime(1970, 1, 1)
+_缺失 = object()
+
+# 取值集合很小、在所有新闻间大量重复的字段，统一驻留
+_驻留字段 = ('source', 'company', 'hr_category')
+
+
+def _时间转整数(时间文本):
+    """ISO时间 → 纪元以来的微秒数；无法无损还原的原样返回"""
+    if not isinstance(时间文本, str):
+        return 时间文本
+    try:
+        时间 = datetime.fromisoformat(时间文本)
+    except ValueError:
+        return 时间文本
+    if 时间.tzinfo is not None:
+        return 时间文本
+
+    差值 = 时间 - _纪元
+    微秒 = (差值.days * 86400 + 差值.seconds) * 1_000_000 + 差值.microseconds
+    if _整数转时间(微秒) != 时间文本:
+        return 时间文本
+    return 微秒
+
+
+def _整数转时间(值):
+    if isinstance(值, int) and not isinstance(值, bool):
+        return (_纪元 + timedelta(microseconds=值)).isoformat()
+    return 值
+
+
+class 新闻记录(Mapping):
+    """单条新闻的紧凑表示，行为等同于只读 dict"""
+
+    字段 = ('id', 'title', 'url', 'source', 'company', 'publish_time', 'abstract',
+            'crawl_time', 'is_hr_related', 'hr_category', 'summary', 'keywords')
+
+    __slots__ = 字段 + ('_其他',)
+
+    def __init__(self, *值):
+        for 字段名, 字段值 in zip(self.字段 + ('_其他',), 值):
+            object.__setattr__(self, 字段名, 字段值)
+
+    @classmethod
+    def 从字典(cls, 新闻: Dict) -> '新闻记录':
+        """由普通新闻 dict 构造，缺失的键保持缺失，额外的键原样保留"""
+        值 = []
+        for 字段名 in cls.字段:
+            字段值 = 新闻.get(字段名, _缺失)
+            if 字段值 is _缺失:
+                pass
+            elif 字段名 in _驻留字段 and isinstance(字段值, str):
+                字段值 = sys.intern(字段值)
+            elif 字段名 in ('crawl_time', 'publish_time'):
+                字段值 = _时间转整数(字段值)
+            elif 字段名 == 'summary' and isinstance(字段值, str) and 字段值 == 新闻.get('abstract'):
+                # RSS源的摘要常与原文摘要完全相同，共用同一个字符串对象
+                字段值 = 值[cls.字段.index('abstract')]
+            elif 字段名 == 'keywords' and isinstance(字段值, list):
+                字段值 = tuple(sys.intern(k) if isinstance(k, str) else k for k in 字段值)
+            值.append(字段值)
+
+        其他 = {k: v for k, v in 新闻.items() if k not in cls.字段} or None
+        return cls(*值, 其他)
+
+    def __getitem__(self, 键):
+        if 键 in self.字段:
+            值 = getattr(self, 键)
+            if 值 is _缺失:
+                raise KeyError(键)
+            if 键 in ('crawl_time', 'publish_time'):
+                return _整数转时间(值)
+            if 键 == 'keywords':
+                return list(值) if isinstance(值, tuple) else 值
+            return 值
+        if self._其他 and 键 in self._其他:
+            return self._其他[键]
+        raise KeyError(键)
+
+    def __iter__(self):
+        for 字段名 in self.字段:
+            if getattr(self, 字段名) is not _缺失:
+                yield 字段名
+        if self._其他:
+            yield from self._其他
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __setattr__(self, 名称, 值):
+        raise AttributeError("新闻记录是只读的，请使用 转字典() 后修改")
+
+    def __reduce__(self):
+        # st.cache_data 会 pickle 返回值，反序列化时重新走 从字典 以保证字段驻留
+        return (新闻记录.从字典, (self.转字典(),))
+
+    def __repr__(self):
+        return f"新闻记录({self.转字典()!r})"
+
+    @property
+    def 抓取时间戳(self) -> int:
+        """抓取时间（秒级纪元时间戳，按本地时间解释），用于快速比较"""
+        return self._时间戳(self.crawl_time)
+
+    @property
+    def 发布时间戳(self) -> int:
+        """发布时间（秒级纪元时间戳），无法解析时为0"""
+        return self._时间戳(self.publish_time)
+
+    @staticmethod
+    def _时间戳(值) -> int:
+        if isinstance(值, int) and not isinstance(值, bool):
+            return 值 // 1_000_000
+        值 = _时间转整数(_整数转时间(值))
+        if isinstance(值, int):
+            return 值 // 1_000_000
+        return 0
+
+    def 转字典(self) -> Dict:
+        """还原为普通 dict（例如需要修改或序列化时）"""
+        return {键: self[键] for 键 in self}
+
+
+def 压缩新闻列表(新闻列表: Iterable[Dict]) -> List[新闻记录]:
+    """把 dict 列表转换为紧凑记录列表"""
+    return [新闻 if isinstance(新闻, 新闻记录) else 新闻记录.从字典(新闻) for 新闻 in 新闻列表]
+
+
+def 内存对比(条数: int = 100000):
+    """合成指定条数的新闻，对比 dict 列表与紧凑记录列表的常驻内存"""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from 数据存储.样例数据 import 合成新闻
+
+    文本 = json.dumps(合成新闻(条数), ensure_ascii=False)
+
+    # 与 加载数据() 一致：json.load 得到的 dict 列表
+    gc.collect()
+    tracemalloc.start()
+    字典列表 = json.loads(文本)
+    字典内存 = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del 字典列表
+    gc.collect()
+    tracemalloc.start()
+    记录列表 = 压缩新闻列表(json.loads(文本))
+    gc.collect()
+    紧凑内存 = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"{条数} 条新闻常驻内存：")
+    print(f"  dict 列表:     {字典内存 / 1024 / 1024:.1f} MB（{字典内存 / 条数:.0f} 字节/条）")
+    print(f"  紧凑记录列表:  {紧凑内存 / 1024 / 1024:.1f} MB（{紧凑内存 / 条数:.0f} 字节/条）")
+    print(f"  节省 {(1 - 紧凑内存 / 字典内存) * 100:.0f}%")
+
+    return 记录列表
+
+
+if __name__ == "__main__":
+    内存对比(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,160 @@
+"""
+编解码模块
+新闻数据文件的序列化格式：标准JSON、紧凑JSON、orjson（已安装时）、msgpack（已安装时）
+
+除默认的 json 格式外，文件开头带有格式头 b'\\x00HRN1:<格式名>\\n'，读取时自动识别；
+无格式头的文件按JSON解析，因此旧数据文件无需转换。
+
+性能对比：
+    python 数据存储/编解码.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+格式头前缀 = b'\x00HRN1:'
+
+
+class 编解码器:
+    """序列化格式基类"""
+
+    名称 = ''
+    扩展名 = '.json'
+    带格式头 = True
+
+    def 编码(self, 数据: Any) -> bytes:
+        raise NotImplementedError
+
+    def 解码(self, 内容: bytes) -> Any:
+        raise NotImplementedError
+
+
+class 标准JSON(编解码器):
+    """缩进JSON，可读、便于git diff，不带格式头"""
+
+    名称 = 'json'
+    带格式头 = False
+
+    def 编码(self, 数据: Any) -> bytes:
+        return json.dumps(数据, ensure_ascii=False, indent=2).encode('utf-8')
+
+    def 解码(self, 内容: bytes) -> Any:
+        # 任何JSON都可以用更快的orjson解析
+        if orjson:
+            return orjson.loads(内容)
+        return json.loads(内容.decode('utf-8-sig'))
+
+
+class 紧凑JSON(标准JSON):
+    """无缩进无多余空格的JSON"""
+
+    名称 = 'json-compact'
+    带格式头 = True
+
+    def 编码(self, 数据: Any) -> bytes:
+        return json.dumps(数据, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class OrJSON(标准JSON):
+    """orjson：C实现的快速JSON库，输出紧凑UTF-8 JSON"""
+
+    名称 = 'orjson'
+    带格式头 = True
+
+    def 编码(self, 数据: Any) -> bytes:
+        return orjson.dumps(数据)
+
+
+class MsgPack(编解码器):
+    """msgpack：二进制格式，体积更小"""
+
+    名称 = 'msgpack'
+    扩展名 = '.msgpack'
+    带格式头 = True
+
+    def 编码(self, 数据: Any) -> bytes:
+        return msgpack.packb(数据, use_bin_type=True)
+
+    def 解码(self, 内容: bytes) -> Any:
+        return msgpack.unpackb(内容, raw=False)
+
+
+_注册表: Dict[str, 编解码器] = {c.名称: c for c in (标准JSON(), 紧凑JSON())}
+if orjson:
+    _注册表['orjson'] = OrJSON()
+if msgpack:
+    _注册表['msgpack'] = MsgPack()
+
+
+def 可用格式() -> List[str]:
+    """当前环境可用的格式名"""
+    return list(_注册表)
+
+
+def 获取编解码器(名称: str) -> 编解码器:
+    if 名称 not in _注册表:
+        raise ValueError(f"不支持或未安装的数据格式: {名称}（可用: {', '.join(_注册表)}）")
+    return _注册表[名称]
+
+
+def 编码(数据: Any, 格式: str = 'json') -> bytes:
+    """序列化数据，非默认格式在开头写入格式头"""
+    编解码 = 获取编解码器(格式)
+    内容 = 编解码.编码(数据)
+    if 编解码.带格式头:
+        return 格式头前缀 + 编解码.名称.encode('ascii') + b'\n' + 内容
+    return 内容
+
+
+def 解码(内容: bytes) -> Any:
+    """根据格式头自动选择解码器，无格式头时按JSON解析"""
+    if 内容.startswith(格式头前缀):
+        换行 = 内容.index(b'\n', len(格式头前缀))
+        名称 = 内容[len(格式头前缀):换行].decode('ascii')
+        return 获取编解码器(名称).解码(内容[换行 + 1:])
+    return _注册表['json'].解码(内容)
+
+
+def 性能对比(条数列表=(1000, 10000, 100000)):
+    """对比各格式在不同数据量下的保存/加载耗时和文件大小"""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from 数据存储.样例数据 import 合成新闻
+
+    print(f"{'条数':>8} {'格式':<14} {'保存(ms)':>10} {'加载(ms)':>10} {'大小(KB)':>10}")
+    with tempfile.TemporaryDirectory() as 临时目录:
+        for 条数 in 条数列表:
+            数据 = 合成新闻(条数)
+            for 名称 in 可用格式():
+                路径 = os.path.join(临时目录, f"{条数}.{名称}")
+
+                开始 = time.perf_counter()
+                with open(路径, 'wb') as f:
+                    f.write(编码(数据, 名称))
+                保存耗时 = time.perf_counter() - 开始
+
+                开始 = time.perf_counter()
+                with open(路径, 'rb') as f:
+                    还原 = 解码(f.read())
+                加载耗时 = time.perf_counter() - 开始
+
+                assert 还原 == 数据
+                print(f"{条数:>8} {名称:<14} {保存耗时 * 1000:>10.1f} {加载耗时 * 1000:>10.1f} "
+                      f"{os.path.getsize(路径) / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    性能对比()
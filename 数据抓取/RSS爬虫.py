@@ -6,11 +6,21 @@ RSS新闻抓取模块
 import feedparser
 import requests
 import time
-import json
+import os
+import sys
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional
 import re
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from 数据存储.数据库操作 import 按配置创建存储, 读取配置
+from 数据存储.只读快照 import 按配置发布快照
+from 数据抓取.文章标识 import 生成ID, 按配置创建标识
+from AI分析.关键词规则 import HR关键词, 公司关键词, 规则分类器
+from AI分析.关键词提取 import 按配置创建提取器
+from AI分析.抽取摘要 import 抽取摘要器
+
 
 class RSS爬虫:
     """RSS爬虫类"""
@@ -22,28 +32,18 @@ class RSS爬虫:
         }
         self.RSS源列表 = self._获取RSS源列表()
 
-        # 监控的公司关键词
-        self.公司关键词 = {
-            '特斯拉': ['特斯拉', 'Tesla', '马斯克'],
-            '小米汽车': ['小米汽车', '小米SU7', '雷军造车', '小米新车'],
-            '问界': ['问界', 'AITO', '华为汽车', '余承东'],
-            '小鹏汽车': ['小鹏', 'XPENG', '何小鹏'],
-            '蔚来汽车': ['蔚来', 'NIO', '李斌'],
-            '理想汽车': ['理想', '理想汽车', '李想'],
-            '比亚迪': ['比亚迪', 'BYD', '王传福']
-        }
+        # 监控的公司关键词（与关键词提取共用，见 AI分析/关键词规则.py）
+        self.公司关键词 = 公司关键词
 
-        # HR相关关键词
-        self.HR关键词 = [
-            '招聘', '人才', 'offer', '校招', '社招', '猎聘', '内推', '入职',
-            '薪资', '工资', '涨薪', '年终奖', '股票', '期权', '股权激励', '持股', '分红',
-            '培训', '晋升', '发展', '学习', '企业大学', '成长',
-            '组织架构', '裁员', '优化', '调整', '重组', '人事变动', '人员流动',
-            '企业文化', '价值观', '团建', '离职', '员工',
-            '职位', '岗位', '人力资源', 'HR', '人事', '团队', '管理者',
-            '薪酬', '福利', '待遇', '奖金', '激励',
-            '首席人才官', 'CHO', '高管', '管理人员', 'CEO', 'CTO', 'COO'
-        ]
+        # 本地TF-IDF关键词提取，文档频率表在保存新闻时增量更新
+        self.关键词提取器 = 按配置创建提取器()
+        # 抽取式摘要：摘要较长时按关键词密度和句子位置选句，不再简单截断
+        self.摘要器 = 抽取摘要器(self.关键词提取器)
+
+        # HR相关关键词（与AI分析共用，见 AI分析/关键词规则.py）
+        self.HR关键词 = HR关键词
+        # 规则分类，配置文件中 hr_categories 的关键词和分类一并生效；规则回填使用同一分类器
+        self.规则分类器 = 规则分类器.按配置创建(读取配置())
 
     def _获取RSS源列表(self) -> List[Dict]:
         """获取RSS源列表"""
@@ -126,24 +126,33 @@ class RSS爬虫:
         return 所有文章
 
     def _抓取单个RSS(self, RSS源: Dict, 最大文章数: int) -> List[Dict]:
-        """抓取单个RSS源"""
-        文章列表 = []
-
+        """抓取单个RSS源（下载与解析分开，流式管道中两者在不同阶段并行）"""
+        内容 = self.获取RSS内容(RSS源)
+        if 内容 is None:
+            return []
+        return self.解析RSS内容(内容, RSS源, 最大文章数)
+
+    def 获取RSS内容(self, RSS源: Dict) -> Optional[bytes]:
+        """下载RSS源，失败时返回 None"""
         try:
-            # 设置超时时间
-            feedparser.USER_AGENT = self.请求头['User-Agent']
+            响应 = requests.get(RSS源['url'], headers=self.请求头, timeout=10)
+            if 响应.status_code != 200:
+                print(f"  ❌ 无法获取RSS: HTTP {响应.status_code}")
+                return None
+            return 响应.content
 
-            # 解析RSS
-            feed = feedparser.parse(RSS源['url'])
+        except requests.exceptions.Timeout:
+            print(f"  ⏱️  请求超时")
+        except requests.exceptions.RequestException as e:
+            print(f"  ❌ 请求失败: {e}")
+        return None
 
-            if feed.bozo:
-                # RSS解析出错，尝试用requests获取内容后解析
-                响应 = requests.get(RSS源['url'], headers=self.请求头, timeout=10)
-                if 响应.status_code == 200:
-                    feed = feedparser.parse(响应.content)
-                else:
-                    print(f"  ❌ 无法获取RSS: HTTP {响应.status_code}")
-                    return 文章列表
+    def 解析RSS内容(self, 内容: bytes, RSS源: Dict, 最大文章数: int) -> List[Dict]:
+        """解析已下载的RSS内容"""
+        文章列表 = []
+
+        try:
+            feed = feedparser.parse(内容)
 
             if not feed.entries:
                 print(f"  ⚠️ RSS源无内容或格式错误")
@@ -157,10 +166,6 @@ class RSS爬虫:
 
             print(f"  ✅ 成功解析 {len(文章列表)} 条文章")
 
-        except requests.exceptions.Timeout:
-            print(f"  ⏱️  请求超时")
-        except requests.exceptions.RequestException as e:
-            print(f"  ❌ 请求失败: {e}")
         except Exception as e:
             print(f"  ❌ 解析失败: {e}")
 
@@ -188,7 +193,7 @@ class RSS爬虫:
             发布时间 = self._解析时间(entry)
 
             # 生成ID
-            文章ID = self._生成ID(链接 or 标题)
+            文章ID = self._生成ID(链接, 标题)
 
             return {
                 'id': 文章ID,
@@ -201,7 +206,7 @@ class RSS爬虫:
                 'crawl_time': datetime.now().isoformat(),
                 'is_hr_related': False,  # 后续会判断
                 'hr_category': None,
-                'summary': 摘要[:300] if 摘要 else '',
+                'summary': self.摘要器.摘要(标题, 摘要) if 摘要 else '',
                 'keywords': []
             }
         except Exception as e:
@@ -227,15 +232,15 @@ class RSS爬虫:
         # 最后返回当前时间
         return datetime.now().isoformat()
 
-    def _生成ID(self, 内容: str) -> str:
-        """生成唯一ID"""
-        import hashlib
-        return hashlib.md5(内容.encode('utf-8')).hexdigest()
+    def _生成ID(self, 链接: str, 标题: str = '') -> str:
+        """生成规范文章ID（与其他爬虫一致，见 文章标识.py）"""
+        return 生成ID(链接, 标题)
 
     def 识别公司(self, 新闻: Dict) -> str:
         """识别新闻所属公司"""
         标题 = 新闻['title'].lower()
-        摘要 = 新闻.get('summary', '').lower()
+        # summary 是抽取的句子，可能不包含 abstract 开头的内容，两者都参与匹配
+        摘要 = f"{新闻.get('abstract') or ''} {新闻.get('summary') or ''}".lower()
         内容 = 标题 + 摘要
 
         for 公司名, 关键词列表 in self.公司关键词.items():
@@ -252,63 +257,19 @@ class RSS爬虫:
         return '其他'
 
     def 判断HR相关(self, 新闻: Dict) -> tuple:
-        """判断新闻是否与HR相关，并返回分类"""
-        标题 = 新闻['title'].lower()
-        摘要 = 新闻.get('summary', '').lower()
-        内容 = 标题 + 摘要
-
-        # 检查是否包含HR关键词
-        相关性得分 = 0
-        匹配的关键词 = []
-
-        for 关键词 in self.HR关键词:
-            if 关键词.lower() in 标题:
-                相关性得分 += 3  # 标题中出现，权重高
-                匹配的关键词.append(关键词)
-            elif 关键词.lower() in 摘要:
-                相关性得分 += 1  # 摘要中出现，权重低
-                匹配的关键词.append(关键词)
-
-        # 判断是否相关（至少命中2个关键词或标题中有1个）
-        是否相关 = 相关性得分 >= 2 or any(k.lower() in 标题 for k in self.HR关键词)
-
-        # 检查是否是纯AI/技术报道而非HR相关
-        # 如果标题包含"AI"、"技术"、"算法"等，但没有明确的HR关键词，则不相关
-        高频技术词 = ['ai', '算法', '模型', '大模型', '技术', '架构', '系统', '开发', '代码', '编程']
-        技术词匹配 = sum(1 for 词 in 高频技术词 if 词 in 标题.lower())
-        if 技术词匹配 >= 2 and 相关性得分 < 3:
-            是否相关 = False
-
-        # 分类
-        分类 = self._确定HR分类(内容, 匹配的关键词)
+        """判断新闻是否与HR相关，并返回分类（规则见 AI分析/关键词规则.py 的 规则分类器）"""
+        # summary 是抽取的句子，可能不包含 abstract 开头的内容，两者都参与匹配
+        摘要 = f"{新闻.get('abstract') or ''} {新闻.get('summary') or ''}"
+        是否相关, 分类, 匹配的关键词 = self.规则分类器.分类(新闻['title'], 摘要)
 
         # 更新新闻信息
         新闻['is_hr_related'] = 是否相关
-        新闻['hr_category'] = 分类 if 是否相关 else None
-        新闻['keywords'] = 匹配的关键词[:5]  # 最多5个关键词
+        新闻['hr_category'] = 分类
+        新闻['label_source'] = 'rules'
+        新闻['keywords'] = self.关键词提取器.提取(新闻['title'], 新闻.get('abstract', '')) or 匹配的关键词[:5]
 
         return 是否相关, 分类
 
-    def _确定HR分类(self, 内容: str, 匹配关键词: List[str]) -> str:
-        """确定HR分类"""
-        分类规则 = {
-            '招聘与人才': ['招聘', '人才', 'offer', '校招', '社招', '猎聘', 'offer'],
-            '薪酬福利': ['薪资', '工资', '涨薪', '年终奖', '股票', '期权', '股权激励', '持股'],
-            '培训发展': ['培训', '晋升', '发展', '学习', '企业大学', '成长'],
-            '组织变革': ['组织架构', '裁员', '优化', '调整', '重组', '人事变动'],
-            '企业文化': ['企业文化', '价值观', '团建'],
-            '行业报告': ['报告', '研究', '数据', '趋势', '白皮书', '指数'],
-            '高管动态': ['CEO', 'CTO', 'CHO', '首席', '高管', '任命', '离职']
-        }
-
-        # 按关键词匹配分类
-        for 分类名, 关键词列表 in 分类规则.items():
-            for 关键词 in 匹配关键词:
-                if 关键词 in 关键词列表:
-                    return 分类名
-
-        return '其他'
-
     def 处理所有新闻(self, 新闻列表: List[Dict]) -> List[Dict]:
         """处理所有新闻：识别公司、判断HR相关性"""
         print("\n开始分析新闻内容...")
@@ -349,42 +310,19 @@ class RSS爬虫:
 
         return 去重后列表
 
-    def 保存到文件(self, 新闻列表: List[Dict], 文件路径: str = "数据/新闻数据.json"):
-        """保存到JSON文件"""
-        import os
-
-        # 确保目录存在
-        os.makedirs(os.path.dirname(文件路径), exist_ok=True)
-
-        # 加载现有数据
-        现有数据 = []
-        try:
-            with open(文件路径, 'r', encoding='utf-8') as f:
-                现有数据 = json.load(f)
-        except FileNotFoundError:
-            pass
-
-        # 合并并去重
-        所有id = {新闻['id'] for 新闻 in 现有数据}
-        新增数量 = 0
-
-        for 新闻 in 新闻列表:
-            if 新闻['id'] not in 所有id:
-                现有数据.append(新闻)
-                所有id.add(新闻['id'])
-                新增数量 += 1
-
-        # 按抓取时间倒序排序，只保留最近500条
-        现有数据.sort(key=lambda x: x['crawl_time'], reverse=True)
-        if len(现有数据) > 500:
-            现有数据 = 现有数据[:500]
+    def 保存到文件(self, 新闻列表: List[Dict], 存储=None):
+        """保存到存储（默认按配置，未配置时为按月分区存储，保留全部历史）"""
+        存储 = 存储 or 按配置创建存储()
 
-        # 保存
-        with open(文件路径, 'w', encoding='utf-8') as f:
-            json.dump(现有数据, f, ensure_ascii=False, indent=2)
+        # 订阅源每天返回大量已入库的文章，只有新增的计入文档频率表
+        新文章 = 存储.筛选未存储(新闻列表)
+        # 存储内部持有写锁完成读-合并-写，与AI分析、其他爬虫并发运行时不会互相覆盖
+        新增数量 = 存储.保存新闻(新闻列表)
+        if 新增数量:
+            self.关键词提取器.更新文档频率(新文章)
 
-        print(f"\n✅ 数据已保存到 {文件路径}")
-        print(f"   新增 {新增数量} 条新闻，总计 {len(现有数据)} 条")
+        print(f"\n✅ 数据已保存到 {存储.文件路径}")
+        print(f"   新增 {新增数量} 条新闻")
 
         return 新增数量
 
@@ -396,14 +334,18 @@ def 主程序():
     # 1. 从RSS源抓取
     原始新闻 = 爬虫.抓取所有RSS(最大文章数=20)
 
-    # 2. 去重
+    # 2. 去重：先按标题，再按规范ID去掉其他爬虫已经抓过的文章
     去重后新闻 = 爬虫.去重(原始新闻)
+    标识 = 按配置创建标识()
+    去重后新闻 = 标识.排除已存储(标识.去重(去重后新闻))
 
     # 3. 分析内容（识别公司、判断HR相关性）
     HR新闻 = 爬虫.处理所有新闻(去重后新闻)
 
-    # 4. 保存
+    # 4. 保存，并为Web界面发布只读快照
     新增数量 = 爬虫.保存到文件(HR新闻)
+    if 新增数量:
+        按配置发布快照()
 
     # 5. 输出统计
     print(f"\n{'='*60}")
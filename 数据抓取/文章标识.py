@@ -0,0 +1,153 @@
+"""
+文章标识模块
+为所有爬虫生成统一的文章ID：先规范化URL（去跟踪参数、统一域名写法），再用 blake2b 哈希，
+同一篇文章无论来自RSS还是网页爬虫都得到相同ID
+
+旧版ID（RSS爬虫的链接md5、新闻爬虫的标题md5前16位）记录在别名表中，映射到规范ID，
+已存储的数据无需改写。
+
+登记已有数据的别名：
+    python 数据抓取/文章标识.py
+"""
+
+import hashlib
+import os
+import re
+import sys
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from 数据存储.文件锁 import 存储协调器
+from 数据存储.数据库操作 import 按配置创建存储, 读取存储配置
+
+# 不影响文章内容、只用于来源追踪的查询参数
+跟踪参数 = {'f', 'from', 'fr', 'spm', 'src', 'source', 'ref', 'referer', 'share', 'share_token',
+            'scene', 'isappinstalled', 'wechat_source'}
+跟踪参数前缀 = ('utm_', 'spm_', 'share_')
+
+
+def 规范化URL(链接: str) -> str:
+    """去掉跟踪参数和锚点，小写域名并去掉 www.，协议统一为 https，去掉末尾斜杠"""
+    链接 = (链接 or '').strip()
+    if not 链接:
+        return ''
+
+    部分 = urlsplit(链接)
+    if not 部分.netloc:
+        return 链接
+
+    主机 = (部分.hostname or '').lower()
+    if 主机.startswith('www.'):
+        主机 = 主机[4:]
+    if 部分.port and 部分.port not in (80, 443):
+        主机 = f"{主机}:{部分.port}"
+
+    参数 = [(键, 值) for 键, 值 in parse_qsl(部分.query, keep_blank_values=True)
+            if 键.lower() not in 跟踪参数 and not 键.lower().startswith(跟踪参数前缀)]
+    路径 = re.sub(r'/{2,}', '/', 部分.path).rstrip('/')
+
+    return urlunsplit(('https', 主机, 路径, urlencode(sorted(参数)), ''))
+
+
+def 规范化标题(标题: str) -> str:
+    """与 RSS爬虫.去重 一致：小写，去掉空白和标点"""
+    标题 = re.sub(r'\s+', '', (标题 or '').lower())
+    return re.sub(r'[^\w\u4e00-\u9fff]', '', 标题)
+
+
+def 生成ID(链接: str, 标题: str = '') -> str:
+    """规范ID：有链接时取规范化URL的哈希，否则取规范化标题的哈希"""
+    if 链接 and urlsplit(链接.strip()).netloc:
+        内容 = 'url:' + 规范化URL(链接)
+    else:
+        内容 = 'title:' + 规范化标题(标题 or 链接)
+    return hashlib.blake2b(内容.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class 文章标识:
+    """规范ID与别名表
+
+    别名表文件格式：{"version": 1, "aliases": {旧ID: 规范ID}}
+    """
+
+    def __init__(self, 别名路径: str = "数据/ID别名.json"):
+        self.别名路径 = 别名路径
+        self.协调器 = 存储协调器(别名路径)
+        self._别名: Optional[Dict[str, str]] = None
+
+    @property
+    def 别名(self) -> Dict[str, str]:
+        if self._别名 is None:
+            self._别名 = self.协调器.读取json({'version': 1, 'aliases': {}})['aliases']
+        return self._别名
+
+    def 解析(self, 文章ID: str) -> str:
+        """把旧ID映射为规范ID，规范ID原样返回"""
+        return self.别名.get(文章ID, 文章ID)
+
+    def 新闻规范ID(self, 新闻: Dict) -> str:
+        """已存储新闻的规范ID：优先查别名表，否则由链接和标题重新计算"""
+        if 新闻['id'] in self.别名:
+            return self.别名[新闻['id']]
+        return 生成ID(新闻.get('url', ''), 新闻.get('title', ''))
+
+    def 登记别名(self, 新闻列表: Iterable[Dict]) -> int:
+        """为使用旧ID存储的新闻登记 旧ID → 规范ID，返回新登记的数量"""
+        新别名 = {}
+        for 新闻 in 新闻列表:
+            规范 = 生成ID(新闻.get('url', ''), 新闻.get('title', ''))
+            if 新闻['id'] != 规范:
+                新别名[新闻['id']] = 规范
+
+        def 合并(数据):
+            数据['aliases'].update(新别名)
+            return 数据
+
+        if not 新别名 and os.path.exists(self.别名路径):
+            return 0
+        已有 = set(self.别名)
+        self._别名 = self.协调器.更新json(合并, {'version': 1, 'aliases': {}})['aliases']
+        return len(set(新别名) - 已有)
+
+    def 排除已存储(self, 新闻列表: List[Dict]) -> List[Dict]:
+        """去掉以旧ID存储过的文章（以规范ID存储的由存储层按ID去重）"""
+        已存储 = set(self.别名.values())
+        return [n for n in 新闻列表 if n['id'] not in 已存储]
+
+    def 去重(self, 新闻列表: List[Dict]) -> List[Dict]:
+        """按规范ID去重，保留每篇文章第一次出现的记录"""
+        已见 = set()
+        结果 = []
+        for 新闻 in 新闻列表:
+            规范 = self.新闻规范ID(新闻)
+            if 规范 not in 已见:
+                已见.add(规范)
+                结果.append(新闻)
+        return 结果
+
+
+def 按配置创建标识(配置文件路径: str = "配置文件.yaml", 存储=None) -> 文章标识:
+    """按 storage.alias_path 创建；别名表不存在时先为已存储的新闻登记一次"""
+    标识 = 文章标识(读取存储配置(配置文件路径).get('alias_path', '数据/ID别名.json'))
+    if not os.path.exists(标识.别名路径):
+        新增 = 标识.登记别名((存储 or 按配置创建存储(配置文件路径)).加载新闻())
+        print(f"🔖 已为已存储的新闻登记 {新增} 个旧ID别名")
+    return 标识
+
+
+def 主程序():
+    """命令行运行入口：为已存储的新闻登记别名"""
+    标识 = 文章标识(读取存储配置().get('alias_path', '数据/ID别名.json'))
+    新闻列表 = 按配置创建存储().加载新闻()
+    新增 = 标识.登记别名(新闻列表)
+
+    print(f"✅ 已检查 {len(新闻列表)} 条新闻，新登记 {新增} 个旧ID别名（共 {len(标识.别名)} 个）")
+    重复 = len(新闻列表) - len(标识.去重(新闻列表))
+    if 重复:
+        print(f"   其中 {重复} 条与其他新闻是同一篇文章，AI分析时将只分析一次")
+
+
+if __name__ == "__main__":
+    主程序()
@@ -7,17 +7,26 @@ import requests
 from bs4 import BeautifulSoup
 import time
 import yaml
-import json
+import os
+import sys
 from datetime import datetime, timedelta
 from typing import List, Dict
 import re
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from 数据存储.数据库操作 import 数据存储, 按配置创建存储
+from 数据存储.只读快照 import 按配置发布快照
+from 数据抓取.文章标识 import 生成ID, 按配置创建标识
+from AI分析.关键词提取 import 按配置创建提取器
+
 
 class 新闻爬虫:
     def __init__(self, 配置文件路径: str = "配置文件.yaml"):
         """初始化爬虫"""
         with open(配置文件路径, 'r', encoding='utf-8') as f:
             self.配置 = yaml.safe_load(f)
+        self.配置文件路径 = 配置文件路径
 
         self.爬虫配置 = self.配置['crawler']
         self.公司列表 = [c for c in self.配置['companies'] if c['enabled']]
@@ -72,10 +81,12 @@ class 新闻爬虫:
                         if not 标题元素:
                             continue
 
+                        标题 = 标题元素.text.strip()
+                        链接 = 'https://www.36kr.com' + 标题元素.get('href', '')
                         新闻 = {
-                            'id': self._生成id(标题元素.text.strip()),
-                            'title': 标题元素.text.strip(),
-                            'url': 'https://www.36kr.com' + 标题元素.get('href', ''),
+                            'id': self._生成id(标题, 链接),
+                            'title': 标题,
+                            'url': 链接,
                             'source': '36氪',
                             'company': 公司名,
                             'publish_time': self._提取时间(文章),
@@ -116,10 +127,12 @@ class 新闻爬虫:
                         if not 标题元素:
                             continue
 
+                        标题 = 标题元素.text.strip()
+                        链接 = 标题元素.get('href', '')
                         新闻 = {
-                            'id': self._生成id(标题元素.text.strip()),
-                            'title': 标题元素.text.strip(),
-                            'url': 标题元素.get('href', ''),
+                            'id': self._生成id(标题, 链接),
+                            'title': 标题,
+                            'url': 链接,
                             'source': '虎嗅网',
                             'company': 公司名,
                             'publish_time': self._提取时间(文章),
@@ -207,10 +220,9 @@ class 新闻爬虫:
         except Exception:
             return True  # 如果无法解析时间，则保留
 
-    def _生成id(self, 标题: str) -> str:
-        """根据标题生成唯一ID"""
-        import hashlib
-        return hashlib.md5(标题.encode('utf-8')).hexdigest()[:16]
+    def _生成id(self, 标题: str, 链接: str = '') -> str:
+        """生成规范文章ID（与RSS爬虫一致，见 文章标识.py）"""
+        return 生成ID(链接, 标题)
 
     def _去重(self, 新闻列表: List[Dict]) -> List[Dict]:
         """根据ID去重"""
@@ -226,43 +238,38 @@ class 新闻爬虫:
         return 去重后列表
 
     def 保存到文件(self, 新闻列表: List[Dict], 文件路径: str = None):
-        """保存到JSON文件"""
-        if not 文件路径:
-            文件路径 = self.配置['storage']['json_path']
-
-        # 加载现有数据
-        现有数据 = []
-        try:
-            with open(文件路径, 'r', encoding='utf-8') as f:
-                现有数据 = json.load(f)
-        except FileNotFoundError:
-            pass
-
-        # 合并并去重
-        所有id = {新闻['id'] for 新闻 in 现有数据}
-        新增数量 = 0
+        """保存新闻：指定文件路径时写入该JSON文件，否则按配置文件的 storage 段保存"""
+        if 文件路径:
+            存储 = 数据存储("json", 文件路径)
+        else:
+            存储 = 按配置创建存储(self.配置文件路径)
 
-        for 新闻 in 新闻列表:
-            if 新闻['id'] not in 所有id:
-                现有数据.append(新闻)
-                新增数量 += 1
+        # 在保存之前创建：文档频率表不存在时由已存储的新闻重建
+        提取器 = 按配置创建提取器(self.配置文件路径, 存储)
 
-        # 按时间倒序排序
-        现有数据.sort(key=lambda x: x['crawl_time'], reverse=True)
+        新文章 = 存储.筛选未存储(新闻列表)
+        # 存储内部持有写锁完成读-合并-写，避免覆盖并发运行的AI分析结果
+        新增数量 = 存储.保存新闻(新闻列表)
+        if 新增数量:
+            # 只有新入库的新闻计入关键词提取的文档频率表，已存储的不重复计数
+            提取器.更新文档频率(新文章)
 
-        # 保存
-        with open(文件路径, 'w', encoding='utf-8') as f:
-            json.dump(现有数据, f, ensure_ascii=False, indent=2)
+        print(f"\n数据已保存到 {存储.文件路径}")
+        print(f"新增 {新增数量} 条新闻")
 
-        print(f"\n数据已保存到 {文件路径}")
-        print(f"新增 {新增数量} 条新闻，总计 {len(现有数据)} 条")
+        return 新增数量
 
 
 def 主程序():
     """命令行运行入口"""
     爬虫 = 新闻爬虫()
     新闻列表 = 爬虫.抓取新闻()
-    爬虫.保存到文件(新闻列表)
+
+    # 去掉RSS爬虫已经抓过的文章
+    新闻列表 = 按配置创建标识(爬虫.配置文件路径).排除已存储(新闻列表)
+
+    if 爬虫.保存到文件(新闻列表):
+        按配置发布快照(配置文件路径=爬虫.配置文件路径)
 
     print("\n✅ 新闻抓取完成！")
 
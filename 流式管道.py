@@ -0,0 +1,260 @@
+"""
+流式处理管道
+抓取 → 解析 → 关键词分类 → AI分析 → 写入存储 在同一进程内以有界队列相连，各阶段并行运行：
+文章一抓到就往下游流动，每批写入后立即发布只读快照，不必等整轮抓取结束再分析
+
+使用方法：
+    python 流式管道.py
+    python 流式管道.py --不分析            # 只抓取和关键词分类（没有API Key时）
+    python 流式管道.py --队列长度 50 --抓取并发 8
+    python 流式管道.py --摘要模式 llm      # 摘要由模型改写（默认按 ai_service.summary.mode，通常为本地抽取）
+"""
+
+import argparse
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from 数据抓取.RSS爬虫 import RSS爬虫
+from 数据抓取.文章标识 import 按配置创建标识
+from 数据存储.数据库操作 import 按配置创建存储
+from 数据存储.只读快照 import 按配置发布快照
+
+# 队列中的结束标记，上游阶段全部完成后放入
+_结束 = object()
+
+
+class 流式管道:
+    """各阶段之间是有界队列：下游处理不过来时上游的 put 阻塞（背压），内存占用不随抓取量增长"""
+
+    def __init__(self, 爬虫: RSS爬虫, 分析器=None, 存储=None, 队列长度: int = 100, 抓取并发: int = 4,
+                 写入批大小: int = 20, 写入间隔秒数: float = 5.0, 快照间隔秒数: float = 10.0):
+        self.爬虫 = 爬虫
+        self.分析器 = 分析器
+        self.存储 = 存储 or 按配置创建存储()
+        self.标识 = 按配置创建标识(存储=self.存储)
+        self.抓取并发 = 抓取并发
+        self.写入批大小 = 写入批大小
+        self.写入间隔秒数 = 写入间隔秒数
+        self.快照间隔秒数 = 快照间隔秒数
+
+        self.原始队列 = queue.Queue(队列长度)
+        self.文章队列 = queue.Queue(队列长度)
+        self.分析队列 = queue.Queue(队列长度)
+        self.写入队列 = queue.Queue(队列长度)
+
+        self._锁 = threading.Lock()
+        self.统计 = {'抓取源': 0, '解析': 0, '重复': 0, 'HR相关': 0, '分析': 0, '新增': 0}
+        self._入库延迟: List[float] = []
+        # 抓取时刻，用于统计从抓取到入库的延迟
+        self._抓取时刻: Dict[str, float] = {}
+        # 第一个出错阶段的异常，运行() 结束时重新抛出
+        self._错误: Optional[Exception] = None
+        # 已经取到结束标记的队列
+        self._已取完 = set()
+
+    def _计数(self, 项: str, 数量: int = 1):
+        with self._锁:
+            self.统计[项] += 数量
+
+    def _取出(self, 队列: queue.Queue, **参数):
+        项 = 队列.get(**参数)
+        if 项 is _结束:
+            self._已取完.add(队列)
+        return 项
+
+    def _运行阶段(self, 名称: str, 阶段函数, 输入队列: Optional[queue.Queue], 输出队列: Optional[queue.Queue],
+                 *参数):
+        """无论阶段是否出错都向下游放入结束标记；出错时记录第一个异常，并继续取走输入队列直到结束标记，
+        上游的 put 不会因为没人消费而永远阻塞"""
+        try:
+            阶段函数(*参数)
+        except Exception as e:
+            with self._锁:
+                self._错误 = self._错误 or e
+            print(f"❌ {名称}阶段出错: {e}")
+            while 输入队列 is not None and 输入队列 not in self._已取完:
+                self._取出(输入队列)
+        finally:
+            if 输出队列 is not None:
+                输出队列.put(_结束)
+
+    # ---------- 各阶段 ----------
+
+    def _抓取阶段(self):
+        """多个源并发下载，下载完一个就交给解析阶段"""
+        def 下载(RSS源):
+            if self._错误:
+                return
+            内容 = self.爬虫.获取RSS内容(RSS源)
+            if 内容 is not None:
+                self.原始队列.put((RSS源, 内容, time.monotonic()))
+                self._计数('抓取源')
+
+        源列表 = [源 for 源 in self.爬虫.RSS源列表 if 源.get('enabled', True)]
+        with ThreadPoolExecutor(max_workers=max(1, self.抓取并发)) as 线程池:
+            list(线程池.map(下载, 源列表))
+
+    def _解析阶段(self, 最大文章数: int):
+        """解析条目，按规范ID去掉本轮重复和已存储的文章"""
+        已存储 = self.存储.已存储ID() | set(self.标识.别名.values())
+        已见 = set()
+
+        while (项 := self._取出(self.原始队列)) is not _结束:
+            if self._错误:
+                continue
+            RSS源, 内容, 抓取时刻 = 项
+            for 文章 in self.爬虫.解析RSS内容(内容, RSS源, 最大文章数):
+                self._计数('解析')
+                规范ID = self.标识.新闻规范ID(文章)
+                if 规范ID in 已见 or 文章['id'] in 已存储 or 规范ID in 已存储:
+                    self._计数('重复')
+                    continue
+                已见.add(规范ID)
+                self._抓取时刻[文章['id']] = 抓取时刻
+                self.文章队列.put(文章)
+
+    def _关键词阶段(self):
+        """识别公司、按关键词规则判断HR相关，不相关的文章在这里丢弃"""
+        下游 = self.分析队列 if self.分析器 else self.写入队列
+        while (文章 := self._取出(self.文章队列)) is not _结束:
+            if self._错误:
+                continue
+            文章['company'] = self.爬虫.识别公司(文章)
+            是否相关, _ = self.爬虫.判断HR相关(文章)
+            if 是否相关:
+                self._计数('HR相关')
+                下游.put(文章)
+            else:
+                self._抓取时刻.pop(文章['id'], None)
+
+    def _分析阶段(self):
+        """取出队列中已有的全部文章（至少一条）作为一批交给 AI分析器，不等待凑满"""
+        结束 = False
+        while not 结束:
+            批次 = [self._取出(self.分析队列)]
+            while len(批次) < self.写入批大小:
+                try:
+                    批次.append(self._取出(self.分析队列, block=False))
+                except queue.Empty:
+                    break
+            if 批次[-1] is _结束:
+                批次.pop()
+                结束 = True
+            if 批次 and not self._错误:
+                try:
+                    self.分析器.批量分析(批次, 输出统计=False)
+                    self._计数('分析', len(批次))
+                except Exception as e:
+                    # 分析失败的文章保留关键词规则的结果照常入库
+                    print(f"⚠️ AI分析出错，{len(批次)} 条文章使用关键词分类结果: {e}")
+                for 文章 in 批次:
+                    self.写入队列.put(文章)
+
+    def _写入阶段(self):
+        """攒够 写入批大小 条或距第一条等待超过 写入间隔秒数 时写入一次；快照最多每 快照间隔秒数 发布一次"""
+        缓冲: List[Dict] = []
+        首条时刻: Optional[float] = None
+        上次快照 = 0.0
+        待发布 = False
+        结束 = False
+
+        while not 结束:
+            超时 = None if 首条时刻 is None else max(0.0, 首条时刻 + self.写入间隔秒数 - time.monotonic())
+            try:
+                项 = self._取出(self.写入队列, timeout=超时)
+                if 项 is _结束:
+                    结束 = True
+                else:
+                    缓冲.append(项)
+                    首条时刻 = 首条时刻 or time.monotonic()
+            except queue.Empty:
+                pass
+
+            到期 = 首条时刻 is not None and time.monotonic() - 首条时刻 >= self.写入间隔秒数
+            if 缓冲 and (len(缓冲) >= self.写入批大小 or 到期 or 结束):
+                新增 = self.存储.保存新闻(缓冲)
+                self._计数('新增', 新增)
+                if 新增:
+                    self.爬虫.关键词提取器.更新文档频率(缓冲)
+                现在 = time.monotonic()
+                with self._锁:
+                    self._入库延迟.extend(现在 - self._抓取时刻.pop(n['id'], 现在) for n in 缓冲)
+                print(f"💾 写入 {len(缓冲)} 条（新增 {新增} 条）")
+                待发布 = 待发布 or 新增 > 0
+                缓冲, 首条时刻 = [], None
+
+            if 待发布 and (结束 or time.monotonic() - 上次快照 >= self.快照间隔秒数):
+                按配置发布快照(self.存储)
+                上次快照, 待发布 = time.monotonic(), False
+
+    # ---------- 运行 ----------
+
+    def 运行(self, 最大文章数: int = 20) -> Dict:
+        """启动全部阶段并等待完成，返回各阶段计数；任一阶段出错时其余阶段收尾退出，再抛出该异常"""
+        开始 = time.monotonic()
+        关键词下游 = self.分析队列 if self.分析器 else self.写入队列
+        阶段参数 = [
+            ('抓取', self._抓取阶段, None, self.原始队列),
+            ('解析', self._解析阶段, self.原始队列, self.文章队列, 最大文章数),
+            ('关键词分类', self._关键词阶段, self.文章队列, 关键词下游),
+            ('写入', self._写入阶段, self.写入队列, None),
+        ]
+        if self.分析器:
+            阶段参数.append(('AI分析', self._分析阶段, self.分析队列, self.写入队列))
+
+        阶段 = [threading.Thread(target=self._运行阶段, args=参数, name=参数[0], daemon=True) for 参数 in 阶段参数]
+        for 线程 in 阶段:
+            线程.start()
+        for 线程 in 阶段:
+            线程.join()
+
+        if self._错误:
+            raise self._错误
+
+        if self.分析器:
+            self.分析器.输出运行统计()
+
+        统计 = dict(self.统计)
+        延迟 = sorted(self._入库延迟)
+        统计['耗时'] = time.monotonic() - 开始
+        统计['入库延迟中位数'] = 延迟[len(延迟) // 2] if 延迟 else 0.0
+        统计['入库延迟最大值'] = 延迟[-1] if 延迟 else 0.0
+        return 统计
+
+
+def 主程序():
+    """命令行运行入口"""
+    解析器 = argparse.ArgumentParser(description="流式抓取、分析并写入存储")
+    解析器.add_argument('--不分析', action='store_true', help="不调用AI，只用关键词规则分类")
+    解析器.add_argument('--最大文章数', type=int, default=20, help="每个RSS源最多取多少条")
+    解析器.add_argument('--队列长度', type=int, default=100)
+    解析器.add_argument('--抓取并发', type=int, default=4)
+    解析器.add_argument('--写入批大小', type=int, default=20)
+    解析器.add_argument('--摘要模式', choices=['local', 'llm'], help="覆盖配置中的 ai_service.summary.mode")
+    参数 = 解析器.parse_args()
+
+    分析器 = None
+    if not 参数.不分析:
+        from AI分析.内容分类 import AI分析器
+        分析器 = AI分析器()
+        if 参数.摘要模式:
+            分析器.摘要模式 = 参数.摘要模式
+
+    管道 = 流式管道(RSS爬虫(), 分析器, 队列长度=参数.队列长度, 抓取并发=参数.抓取并发, 写入批大小=参数.写入批大小)
+    统计 = 管道.运行(参数.最大文章数)
+
+    print(f"\n{'='*60}")
+    print(f"流式处理完成（{统计['耗时']:.1f} 秒）：")
+    print(f"  - 成功抓取的源: {统计['抓取源']} 个")
+    print(f"  - 解析文章: {统计['解析']} 条（重复 {统计['重复']} 条）")
+    print(f"  - HR相关: {统计['HR相关']} 条，AI分析 {统计['分析']} 条")
+    print(f"  - 新增保存: {统计['新增']} 条")
+    print(f"  - 抓取到入库延迟: 中位数 {统计['入库延迟中位数']:.1f} 秒，最大 {统计['入库延迟最大值']:.1f} 秒")
+    print(f"{'='*60}")
+
+
+if __name__ == "__main__":
+    主程序()